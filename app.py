@@ -7,6 +7,8 @@ GRADIO 6.0 COMPATIBLE VERSION
 
 import gradio as gr
 import logging
+import uvicorn
+from fastapi import FastAPI
 import os
 import urllib.parse
 import json
@@ -19,11 +21,22 @@ from PIL import Image, ImageDraw, ImageFont, ImageFilter
 # Import our modules
 from src import config
 from src import astronomy_api
+from src import geolocation
+from src import gradio_queue
 from src import story_generator
 from src import image_fetcher
-from src.mcp_server import select_celestial, get_story_prompt, generate_image_prompt
-
-logging.basicConfig(level=logging.INFO)
+from src import http_client
+from src import logging_setup
+from src import metrics
+from src import object_catalogue
+from src import pipeline
+from src import profiling
+from src import timing
+from src.deadline import Deadline
+from src.progress import ProgressChannel, stage_summary, STARTED, OK, WARNING, ERROR
+from src.mcp_server import select_celestial, select_celestial_async, get_story_prompt, generate_image_prompt
+
+logging_setup.configure_logging()
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -912,154 +925,252 @@ def generate_story_flow_with_logs(location: str, language: str):
     """
     Main story generation workflow with streaming MCP activity logs.
     Yields progress updates for UI display.
+
+    Synchronous entry point: drives generate_story_flow_async on the shared
+    pipeline event loop and yields the same updates.
     """
-    from datetime import datetime as dt
+    deadline = Deadline.after(config.STORY_DEADLINE_SECONDS)
+    tags = {"location": location, "language": language}
+    with profiling.maybe_profile("story_flow", tags=tags) as context:
+        yield from http_client.iterate_sync(generate_story_flow_async(location, language, deadline=deadline), context)
+
+
+async def generate_story_flow_async(
+    location: str,
+    language: str,
+    client_ip: Optional[str] = None,
+    deadline: Optional[Deadline] = None
+):
+    """
+    Async story generation workflow (runs on the pipeline event loop).
+    Waiting on geolocation, astronomy APIs, Gemini and image sources does not
+    hold a thread, so one process can serve many concurrent stories.
+    Yields progress updates for UI display.
 
-    def make_log(icon: str, message: str) -> str:
-        timestamp = dt.now().strftime("%H:%M:%S")
-        return f"{timestamp} {icon} {message}"
+    client_ip (from geolocation.client_ip) locates the user when the location
+    cannot be parsed; without it the fallback locates the server.
 
-    logs = []
+    Every upstream call shares deadline (default: STORY_DEADLINE_SECONDS from
+    now); stages that run out of time use their fallbacks.
+    """
+    if deadline is None:
+        deadline = Deadline.after(config.STORY_DEADLINE_SECONDS)
+    progress = ProgressChannel()
+    flow_span = timing.Span("flow.total")
+    metrics.STORIES_IN_FLIGHT.inc()
 
     try:
         # Step 1: Parse location
-        logs.append(make_log("🔍", f"Parsing location input: '{location}'"))
-        yield {"logs": "\n".join(logs), "complete": False, "result": None}
+        progress.start("location", "🔍", f"Parsing location input: '{location}'")
+        yield {"events": progress.drain(), "complete": False, "result": None}
 
-        lat, lon, city_name = astronomy_api.parse_location_input(location)
+        with timing.span("flow.parse_location") as location_span:
+            lat, lon, city_name = astronomy_api.parse_location_input(location)
 
         if lat is None or lon is None:
-            logs.append(make_log("⚠️", "Location parsing failed, trying auto-geolocation..."))
-            yield {"logs": "\n".join(logs), "complete": False, "result": None}
+            progress.emit("location", WARNING, "⚠️",
+                          f"Location parsing failed ({location_span.describe()}), trying auto-geolocation...",
+                          location_span.wall_ms)
+            progress.start("geolocation", "🛰️", "Locating you from your IP address...")
+            yield {"events": progress.drain(), "complete": False, "result": None}
 
-            geo_data = astronomy_api.get_user_location_from_ip()
+            with timing.span("flow.geolocation") as geo_span:
+                geo_data = await astronomy_api.get_user_location_from_ip_async(client_ip)
 
             if geo_data["error"]:
-                logs.append(make_log("❌", f"Geolocation failed: {geo_data['error']}"))
-                yield {"logs": "\n".join(logs), "complete": False, "result": None, "error": True}
+                progress.emit("geolocation", ERROR, "❌",
+                              f"Geolocation failed: {geo_data.get('message')} ({geo_span.describe()})", geo_span.wall_ms)
+                yield {"events": progress.drain(), "complete": False, "result": None, "error": True}
                 return
 
             lat = geo_data["latitude"]
             lon = geo_data["longitude"]
-            city_name = f"{geo_data['city']}, {geo_data['country']}"
-            logs.append(make_log("✅", f"Auto-located: {city_name}"))
-            yield {"logs": "\n".join(logs), "complete": False, "result": None}
+            city_name = geo_data["display_name"]
+            progress.emit("geolocation", OK, "✅", f"Auto-located: {city_name} ({geo_span.describe()})", geo_span.wall_ms)
+            yield {"events": progress.drain(), "complete": False, "result": None}
 
-        logs.append(make_log("🌍", f"Coordinates: {lat:.1f}°N, {lon:.1f}°E"))
-        logs.append(make_log("📍", f"Location: {city_name}"))
-        yield {"logs": "\n".join(logs), "complete": False, "result": None}
+        progress.emit("location", OK, "🌍", f"Coordinates: {lat:.1f}°N, {lon:.1f}°E", location_span.wall_ms)
+        progress.emit("location", OK, "📍", f"Location: {city_name} ({location_span.describe()})")
+        yield {"events": progress.drain(), "complete": False, "result": None}
 
         # Step 2: MCP Tool - select_celestial
         today = datetime.now().strftime("%Y-%m-%d")
-        logs.append(make_log("🔧", f"MCP Tool: select_celestial(lat={lat:.1f}, lon={lon:.1f}, date={today})"))
-        yield {"logs": "\n".join(logs), "complete": False, "result": None}
+        progress.start("select_celestial", "🔧", f"MCP Tool: select_celestial(lat={lat:.1f}, lon={lon:.1f}, date={today})")
+        yield {"events": progress.drain(), "complete": False, "result": None}
 
-        celestial_object = select_celestial(lat, lon, today)
+        with timing.span("flow.select_celestial") as select_span:
+            celestial_object = await select_celestial_async(
+                lat, lon, today, deadline.child(config.SELECT_CELESTIAL_BUDGET)
+            )
 
         object_name = celestial_object["object_name"]
         object_type = celestial_object["type"]
         magnitude = celestial_object.get("magnitude", "N/A")
-        logs.append(make_log("⭐", f"MCP Response: {object_name} ({object_type}, magnitude {magnitude})"))
-        yield {"logs": "\n".join(logs), "complete": False, "result": None}
-
-        # Step 3: Generate story with Gemini
-        scientific_facts = celestial_object.get("description", "A beautiful celestial object")
-        logs.append(make_log("🤖", f"Calling Gemini 2.5 Flash API (language: {language})..."))
-        yield {"logs": "\n".join(logs), "complete": False, "result": None}
-
-        story_result = story_generator.generate_story(
-            object_name=object_name,
-            object_type=object_type,
-            location=city_name,
-            scientific_facts=scientific_facts,
-            language=language
-        )
+        progress.emit("select_celestial", OK, "⭐",
+                      f"MCP Response: {object_name} ({object_type}, magnitude {magnitude}) in {select_span.describe()}",
+                      select_span.wall_ms)
+        yield {"events": progress.drain(), "complete": False, "result": None}
+
+        # Steps 3-5 are independent once the object is known: run them as a
+        # small DAG so the image search overlaps the Gemini call
+        scientific_facts = (object_catalogue.get_scientific_facts(object_name)
+                            or celestial_object.get("description", "A beautiful celestial object"))
+        if config.MULTI_LANGUAGE_STORIES:
+            # One call for every language: later language switches are instant
+            story_languages = [language] + [lang for lang in config.SUPPORTED_LANGUAGES if lang != language]
+        else:
+            story_languages = [language]
+
+        async def story_stage(_):
+            if config.MULTI_LANGUAGE_STORIES:
+                return await story_generator.generate_story_all_languages_async(
+                    object_name=object_name,
+                    object_type=object_type,
+                    location=city_name,
+                    scientific_facts=scientific_facts,
+                    languages=story_languages,
+                    deadline=deadline
+                )
+            return {
+                language: await story_generator.generate_story_async(
+                    object_name=object_name,
+                    object_type=object_type,
+                    location=city_name,
+                    scientific_facts=scientific_facts,
+                    language=language,
+                    deadline=deadline
+                )
+            }
+
+        async def image_stage(_):
+            return await image_fetcher.get_image_for_object_async(object_name, celestial_object, deadline)
 
-        if not story_result["success"]:
-            logs.append(make_log("❌", f"Story generation failed: {story_result.get('error')}"))
-            yield {"logs": "\n".join(logs), "complete": False, "result": None, "error": True}
-            return
+        async def fun_facts_stage(_):
+            return {
+                lang: story_generator.generate_fun_facts(object_name, object_type, lang)
+                for lang in story_languages
+            }
+
+        async def render_stage(inputs):
+            # Format output with enhanced styling (HTML), one version per generated language
+            stories = inputs["story"]
+            return {
+                story_lang: (
+                    render_story_html(lang_story, inputs["fun_facts"][story_lang], city_name, lat, lon, story_lang),
+                    story_generator.format_story_for_sharing(lang_story, object_name, city_name),
+                )
+                for story_lang, lang_story in stories.items()
+            }
 
-        story_len = len(story_result.get("story", ""))
-        logs.append(make_log("📖", f"Story generated successfully ({story_len} characters)"))
-        yield {"logs": "\n".join(logs), "complete": False, "result": None}
+        progress.emit("story", STARTED, "🤖", f"Calling Gemini 2.5 Flash API (language: {language})...")
+        progress.emit("image", STARTED, "🖼️", f"Fetching image for {object_name}...")
+        yield {"events": progress.drain(), "complete": False, "result": None}
+
+        stage_results = {}
+        async for stage in pipeline.run_stages({
+            "story": (story_stage, []),
+            "image": (image_stage, []),
+            "fun_facts": (fun_facts_stage, []),
+            "render": (render_stage, ["story", "fun_facts"]),
+        }):
+            if stage.error is not None:
+                raise stage.error
+            stage_results[stage.name] = stage.value
+            elapsed_ms = stage.elapsed * 1000
+
+            if stage.name == "story":
+                story_result = stage.value[language]
+                if not story_result["success"]:
+                    progress.emit("story", ERROR, "❌", f"Story generation failed: {story_result.get('error')}", elapsed_ms)
+                    yield {"events": progress.drain(), "complete": False, "result": None, "error": True}
+                    return
+                story_len = len(story_result.get("story", ""))
+                progress.emit("story", OK, "📖",
+                              f"Story generated successfully ({story_len} characters, {stage.elapsed:.1f}s)", elapsed_ms)
+            elif stage.name == "image":
+                if stage.value["source"] == "fallback":
+                    progress.emit("image", WARNING, "⚠️",
+                                  f"Using fallback image (APIs unavailable, {stage.elapsed:.1f}s)", elapsed_ms)
+                else:
+                    progress.emit("image", OK, "✅",
+                                  f"Image fetched from {stage.value['source']} ({stage.elapsed:.1f}s)", elapsed_ms)
+            elif stage.name == "fun_facts":
+                progress.emit("fun_facts", OK, "💡", f"Fun facts ready ({elapsed_ms:.0f}ms)", elapsed_ms)
+            else:
+                progress.emit("render", OK, "🎨", f"Story formatted ({elapsed_ms:.0f}ms)", elapsed_ms)
+            yield {"events": progress.drain(), "complete": False, "result": None}
 
-        # Step 4: Fetch image
-        logs.append(make_log("🖼️", f"Fetching image for {object_name}..."))
-        yield {"logs": "\n".join(logs), "complete": False, "result": None}
+        image_url = stage_results["image"]["url"]
+        versions = stage_results["render"]
+        story_html, share_text = versions[language]
 
-        image_result = image_fetcher.get_image_for_object(object_name, celestial_object)
-        image_url = image_result["url"]
-        image_source = image_result['source']
+        flow_span.finish()
+        progress.emit("flow", OK, "✅", f"Story generation complete! ({flow_span.describe()})", flow_span.wall_ms)
+        yield {
+            "events": progress.drain(),
+            "complete": True,
+            "result": (story_html, image_url, share_text),
+            "versions": versions,
+            "error": False
+        }
+
+    except Exception as e:
+        logger.error("Error in story generation: %s", e, exc_info=True)
+        progress.emit("flow", ERROR, "❌", f"Error: {str(e)}")
+        yield {
+            "events": progress.drain(),
+            "complete": False,
+            "result": None,
+            "error": True
+        }
+    finally:
+        metrics.STORIES_IN_FLIGHT.dec()
 
-        if image_source == "fallback":
-            logs.append(make_log("⚠️", "Using fallback image (APIs unavailable)"))
-        else:
-            logs.append(make_log("✅", f"Image fetched from {image_source}"))
-        yield {"logs": "\n".join(logs), "complete": False, "result": None}
 
-        # Step 5: Format output with enhanced styling (HTML)
-        from datetime import datetime as dt
-        story_html = story_generator.format_story_for_display(story_result, language)
+@timing.timed()
+def render_story_html(story_result: Dict, fun_facts: List[str], city_name: str,
+                      lat: float, lon: float, language: str) -> str:
+    """Build the story HTML: location banner, story + haiku, fun facts and info bar."""
+    from datetime import datetime as dt
+    story_html = story_generator.format_story_for_display(story_result, language)
 
-        # Get translations for current language
-        trans = TRANSLATIONS.get(language, TRANSLATIONS["en"])
+    # Get translations for current language
+    trans = TRANSLATIONS.get(language, TRANSLATIONS["en"])
 
-        # Location display as HTML
-        location_html = f"""
+    # Location display as HTML
+    location_html = f"""
 <div style='background: linear-gradient(135deg, #1a202c 0%, #2d3748 100%); padding: 16px 24px; border-radius: 8px; margin-bottom: 20px; border-left: 4px solid #fbbf24;'>
     <p style='margin: 0; color: #fbbf24; font-size: 1.1em;'>📍 {trans['tonight_sky_from']} <strong>{city_name}</strong> <span style='color: #a0aec0;'>({lat:.1f} N, {lon:.1f} W)</span></p>
 </div>
 """
 
-        # Generate fun facts section as HTML
-        fun_facts = story_generator.generate_fun_facts(object_name, object_type, language)
-        did_you_know_title = {
-            "en": "💡 Did You Know?",
-            "it": "💡 Lo Sapevi?",
-            "fr": "💡 Le Saviez-Vous?",
-            "es": "💡 ¿Sabías?"
-        }.get(language, "💡 Did You Know?")
+    # Generate fun facts section as HTML
+    did_you_know_title = {
+        "en": "💡 Did You Know?",
+        "it": "💡 Lo Sapevi?",
+        "fr": "💡 Le Saviez-Vous?",
+        "es": "💡 ¿Sabías?"
+    }.get(language, "💡 Did You Know?")
 
-        fun_facts_html = f"""
+    fun_facts_html = f"""
 <hr style='margin: 30px 0; border: none; border-top: 1px solid #4a5568;'>
 <h3 style='color: #fbbf24; font-size: 1.5em; margin-bottom: 16px;'>{did_you_know_title}</h3>
 """
-        for fact in fun_facts:
-            fun_facts_html += f"<p style='font-size: 1em; line-height: 1.6; margin-bottom: 12px; color: #e2e8f0;'>✨ {fact}</p>\n"
+    for fact in fun_facts:
+        fun_facts_html += f"<p style='font-size: 1em; line-height: 1.6; margin-bottom: 12px; color: #e2e8f0;'>✨ {fact}</p>\n"
 
-        # Create info bar as HTML
-        timestamp = dt.now().strftime("%m/%d/%Y, %I:%M:%S %p")
-        lang_name = {"en": "English", "it": "Italiano", "fr": "Français", "es": "Español"}.get(language, language)
-        info_bar = f"""
+    # Create info bar as HTML
+    timestamp = dt.now().strftime("%m/%d/%Y, %I:%M:%S %p")
+    lang_name = {"en": "English", "it": "Italiano", "fr": "Français", "es": "Español"}.get(language, language)
+    info_bar = f"""
 <hr style='margin: 30px 0; border: none; border-top: 1px solid #4a5568;'>
 <div style='background: linear-gradient(135deg, #1e3a5f 0%, #2d1b4e 100%); padding: 12px 20px; border-radius: 8px; margin-top: 20px; font-size: 0.9em; color: #a0aec0;'>
 📍 <strong>{trans['info_location']}:</strong> {city_name} | 🌐 <strong>{trans['info_language']}:</strong> {lang_name} | 📅 <strong>{trans['info_generated']}:</strong> {timestamp}
 </div>
 """
 
-        # Combine all HTML sections
-        story_html = f"{location_html}\n{story_html}\n{fun_facts_html}\n{info_bar}"
-
-        share_text = story_generator.format_story_for_sharing(story_result, object_name, city_name)
-
-        logs.append(make_log("✅", "Story generation complete!"))
-        yield {
-            "logs": "\n".join(logs),
-            "complete": True,
-            "result": (story_html, image_url, share_text),
-            "error": False
-        }
-
-    except Exception as e:
-        logger.error(f"Error in story generation: {e}", exc_info=True)
-        logs.append(make_log("❌", f"Error: {str(e)}"))
-        yield {
-            "logs": "\n".join(logs),
-            "complete": False,
-            "result": None,
-            "error": True
-        }
+    # Combine all HTML sections
+    return f"{location_html}\n{story_html}\n{fun_facts_html}\n{info_bar}"
 
 
 def generate_story_flow(location: str, language: str) -> Tuple[str, Optional[str], str]:
@@ -1179,7 +1290,7 @@ def save_story(story_markdown: str, image_url: Optional[str], share_text: str,
     html_path = generate_saved_story_html(1, updated_stories, language)
     if html_path:
         updated_stories[0]["html_path"] = html_path
-        logger.info(f"✓ HTML generated immediately: {html_path}")
+        logger.info("✓ HTML generated immediately: %s", html_path)
 
     message = f"💖 Story saved! You now have {len(updated_stories)} saved stories."
     logger.info(message)
@@ -1216,7 +1327,7 @@ def generate_saved_story_html(story_index: int, saved_stories: List[Dict], langu
     Returns: HTML file path for download
     """
     if story_index < 1 or story_index > len(saved_stories):
-        logger.error(f"Invalid story index: {story_index}")
+        logger.error("Invalid story index: %s", story_index)
         return None
 
     try:
@@ -1372,11 +1483,11 @@ def generate_saved_story_html(story_index: int, saved_stories: List[Dict], langu
             f.write(html_content)
             html_path = f.name
 
-        logger.info(f"✓ Saved Story HTML generated: {html_path}")
+        logger.info("✓ Saved Story HTML generated: %s", html_path)
         return html_path
 
     except Exception as e:
-        logger.error(f"Error generating story HTML: {e}")
+        logger.error("Error generating story HTML: %s", e)
         return None
 
 
@@ -1471,7 +1582,7 @@ def create_postcard(story_html: str, image_url: Optional[str], location: str,
         html_path = generate_dream_canvas_html(1, updated_postcards, language)
         if html_path:
             updated_postcards[0]["pdf_path"] = html_path  # Store as pdf_path for compatibility
-            logger.info(f"✓ HTML generated immediately: {html_path}")
+            logger.info("✓ HTML generated immediately: %s", html_path)
 
         # Create HTML preview (instant, no blocking) - TRADOTTO
         lang_flags = {"en": "🇺🇸", "it": "🇮🇹", "fr": "🇫🇷", "es": "🇪🇸"}
@@ -1522,7 +1633,7 @@ def create_postcard(story_html: str, image_url: Optional[str], location: str,
         return updated_postcards, preview_html, message
 
     except Exception as e:
-        logger.error(f"Error creating postcard: {e}")
+        logger.error("Error creating postcard: %s", e)
         return postcards, None, f"❌ Error creating postcard: {str(e)}"
 
 
@@ -1564,7 +1675,7 @@ def generate_dream_canvas_html(postcard_index: int, postcards: List[Dict], langu
     - Returns: HTML file path for download
     """
     if postcard_index < 1 or postcard_index > len(postcards):
-        logger.error(f"Invalid postcard index: {postcard_index}")
+        logger.error("Invalid postcard index: %s", postcard_index)
         return None
 
     try:
@@ -1623,7 +1734,7 @@ def generate_dream_canvas_html(postcard_index: int, postcards: List[Dict], langu
             # Extract text from <p> tags
             haiku_lines = re.findall(r'<p[^>]*>(.*?)</p>', haiku_content)
             haiku_html_lines = '<br>'.join([line.strip() for line in haiku_lines if line.strip()])
-            logger.info(f"✓ Haiku extracted: {len(haiku_lines)} lines")
+            logger.info("✓ Haiku extracted: %s lines", len(haiku_lines))
         else:
             logger.warning("✗ Haiku not found in story HTML")
 
@@ -1759,11 +1870,11 @@ def generate_dream_canvas_html(postcard_index: int, postcards: List[Dict], langu
         temp_file.write(html_content)
         temp_file.close()
 
-        logger.info(f"✓ Dream Canvas HTML generated: {temp_file.name}")
+        logger.info("✓ Dream Canvas HTML generated: %s", temp_file.name)
         return temp_file.name
 
     except Exception as e:
-        logger.error(f"✗ Error generating Dream Canvas PDF: {e}")
+        logger.error("✗ Error generating Dream Canvas PDF: %s", e)
         return None
 
 
@@ -1843,6 +1954,7 @@ def build_ui():
         current_story = gr.State("")
         current_image = gr.State(None)
         current_location = gr.State("")
+        story_versions_state = gr.State({})  # {lang: (story_html, share_text)}
         saved_stories_state = gr.State([])
         postcards_state = gr.State([])
 
@@ -2021,7 +2133,7 @@ def build_ui():
             </div>
         """)
         
-        def change_language(lang_code):
+        def change_language(lang_code, story_versions):
             trans = TRANSLATIONS[lang_code]
             waiting_html = f"""
                 <div class='waiting-container'>
@@ -2069,10 +2181,17 @@ def build_ui():
                 canvas_header_html,
                 trans["delete_all_stories"],
                 trans["delete_all_canvas"],
-            ]
+            ] + switch_story_version(lang_code, story_versions)
+
+        def switch_story_version(lang_code, story_versions):
+            """Show the already generated story in the new language, if any"""
+            if lang_code not in (story_versions or {}):
+                return [gr.update(), gr.update()]
+            story_html, _share_text = story_versions[lang_code]
+            return [story_html, story_html]
         
-        def generate_and_display(location, lang):
-            """Generator function that streams MCP activity logs and story generation"""
+        async def generate_and_display(location, lang, request: gr.Request = None):
+            """Async generator that streams MCP activity logs and story generation"""
             trans = TRANSLATIONS[lang]
 
             # Validation
@@ -2092,67 +2211,84 @@ def build_ui():
                     "",
                     "",
                     None,
-                    location
+                    location,
+                    {}
                 ]
                 return
 
-            # Stream progress updates
-            for update in generate_story_flow_with_logs(location, lang):
-                logs_text = update["logs"]
-
-                if update.get("error"):
-                    # Error occurred
-                    error_html = f"""
-                        <div class='waiting-container'>
-                            <div class='waiting-icon'>❌</div>
-                            <div class='waiting-title'>Generation Failed</div>
-                        </div>
-                    """
-                    yield [
-                        logs_text,
-                        error_html,
-                        gr.update(open=False),
-                        None,
-                        "",
-                        "",
-                        None,
-                        location
-                    ]
-                    return
-
-                elif update["complete"]:
-                    # Generation complete - show story
-                    story_md, image_url, share_text = update["result"]
-                    yield [
-                        logs_text,
-                        "",  # Clear waiting message
-                        gr.update(open=True),
-                        image_url,
-                        story_md,
-                        story_md,
-                        image_url,
-                        location
-                    ]
-                    return
-
-                else:
-                    # Still processing - update log only
-                    waiting_html = f"""
-                        <div class='waiting-container'>
-                            <div class='waiting-icon'>⏳</div>
-                            <div class='waiting-title'>{trans['generating_story']}</div>
-                        </div>
-                    """
-                    yield [
-                        logs_text,
-                        waiting_html,
-                        gr.update(open=False),
-                        None,
-                        "",
-                        "",
-                        None,
-                        location
-                    ]
+            # Stream progress updates. The log only ever grows at the end, and
+            # Gradio sends string appends to the browser as diffs, so each
+            # update ships just the new lines. When the flow ends, the
+            # structured events are appended as a per-stage status/time summary
+            logs_text = ""
+            events = []
+            profile = profiling.maybe_profile("story_flow", request, {"location": location, "language": lang})
+            with profile as context:
+                flow = generate_story_flow_async(location, lang, geolocation.client_ip(request))
+                async for update in http_client.iterate_on_loop(flow, context):
+                    events.extend(update["events"])
+                    new_lines = "\n".join(event.line for event in update["events"])
+                    if new_lines:
+                        logs_text = f"{logs_text}\n{new_lines}" if logs_text else new_lines
+                    if update.get("error") or update["complete"]:
+                        logs_text = f"{logs_text}\n\n📊 Stage summary:\n{stage_summary(events)}"
+
+                    if update.get("error"):
+                        # Error occurred
+                        error_html = f"""
+                            <div class='waiting-container'>
+                                <div class='waiting-icon'>❌</div>
+                                <div class='waiting-title'>Generation Failed</div>
+                            </div>
+                        """
+                        yield [
+                            logs_text,
+                            error_html,
+                            gr.update(open=False),
+                            None,
+                            "",
+                            "",
+                            None,
+                            location,
+                            {}
+                        ]
+                        return
+
+                    elif update["complete"]:
+                        # Generation complete - show story
+                        story_md, image_url, share_text = update["result"]
+                        yield [
+                            logs_text,
+                            "",  # Clear waiting message
+                            gr.update(open=True),
+                            image_url,
+                            story_md,
+                            story_md,
+                            image_url,
+                            location,
+                            update.get("versions", {})
+                        ]
+                        return
+
+                    else:
+                        # Still processing - update log only
+                        waiting_html = f"""
+                            <div class='waiting-container'>
+                                <div class='waiting-icon'>⏳</div>
+                                <div class='waiting-title'>{trans['generating_story']}</div>
+                            </div>
+                        """
+                        yield [
+                            logs_text,
+                            waiting_html,
+                            gr.update(open=False),
+                            None,
+                            "",
+                            "",
+                            None,
+                            location,
+                            gr.update()
+                        ]
         
         def update_story_slots(stories, lang):
             """Update all 10 story slots with current data"""
@@ -2325,17 +2461,30 @@ def build_ui():
             current_language, subtitle_display, subsubtitle_display, location_label_md, location_input,
             generate_btn, save_btn, postcard_btn, preview_md, dictionary_display, about_display,
             footer_display, saved_header, canvas_header, delete_all_stories_btn, delete_all_postcards_btn,
+            story_display, current_story,
         ]
         
-        lang_en.click(fn=lambda: change_language("en"), outputs=lang_outputs)
-        lang_it.click(fn=lambda: change_language("it"), outputs=lang_outputs)
-        lang_fr.click(fn=lambda: change_language("fr"), outputs=lang_outputs)
-        lang_es.click(fn=lambda: change_language("es"), outputs=lang_outputs)
+        # Only the events benchmarks/bench_queue.py drives are named API
+        # endpoints; delete and download handlers stay off the API
+        # (api_visibility="private": Gradio 6 no longer honours api_name=False)
+        # Every handler except generate_story is sync and holds a thread, so
+        # they share one concurrency group (see config.GRADIO_MAX_THREADS)
+        lang_en.click(fn=lambda versions: change_language("en", versions), inputs=[story_versions_state], outputs=lang_outputs, api_name="set_language_en",
+                      concurrency_id=gradio_queue.SYNC_HANDLERS)
+        lang_it.click(fn=lambda versions: change_language("it", versions), inputs=[story_versions_state], outputs=lang_outputs, api_name="set_language_it",
+                      concurrency_id=gradio_queue.SYNC_HANDLERS)
+        lang_fr.click(fn=lambda versions: change_language("fr", versions), inputs=[story_versions_state], outputs=lang_outputs, api_name="set_language_fr",
+                      concurrency_id=gradio_queue.SYNC_HANDLERS)
+        lang_es.click(fn=lambda versions: change_language("es", versions), inputs=[story_versions_state], outputs=lang_outputs, api_name="set_language_es",
+                      concurrency_id=gradio_queue.SYNC_HANDLERS)
 
         generate_btn.click(
             fn=generate_and_display,
             inputs=[location_input, current_language],
-            outputs=[activity_log, preview_md, story_accordion, story_image, story_display, current_story, current_image, current_location]
+            outputs=[activity_log, preview_md, story_accordion, story_image, story_display, current_story, current_image, current_location, story_versions_state],
+            api_name="generate_story",
+            # Async handler: waiting stories do not hold worker threads
+            concurrency_limit=config.STORY_CONCURRENCY_LIMIT
         )
         
         # Build outputs lists for story slots
@@ -2347,7 +2496,9 @@ def build_ui():
         save_btn.click(
             fn=save_current_story,
             inputs=[current_story, current_image, current_location, current_language, saved_stories_state],
-            outputs=[saved_stories_state] + story_slot_outputs + [status_msg]
+            outputs=[saved_stories_state] + story_slot_outputs + [status_msg],
+            api_name="save_story",
+            concurrency_id=gradio_queue.SYNC_HANDLERS
         )
 
         # Build outputs lists for canvas slots
@@ -2359,7 +2510,9 @@ def build_ui():
         postcard_btn.click(
             fn=create_postcard_handler,
             inputs=[current_story, current_image, current_location, current_language, postcards_state],
-            outputs=[postcards_state] + canvas_slot_outputs + [postcard_preview, status_msg, save_btn]
+            outputs=[postcards_state] + canvas_slot_outputs + [postcard_preview, status_msg, save_btn],
+            api_name="create_dream_canvas",
+            concurrency_id=gradio_queue.SYNC_HANDLERS
         )
 
         # Connect individual ❌ delete buttons for Saved Stories
@@ -2367,13 +2520,17 @@ def build_ui():
             story_delete_btns[i].click(
                 fn=lambda saved, lang, idx=i+1: delete_story_handler(idx, saved, lang),
                 inputs=[saved_stories_state, current_language],
-                outputs=[saved_stories_state] + story_slot_outputs + [delete_stories_msg]
+                outputs=[saved_stories_state] + story_slot_outputs + [delete_stories_msg],
+                api_visibility="private",
+                concurrency_id=gradio_queue.SYNC_HANDLERS
             )
 
         delete_all_stories_btn.click(
             fn=delete_all_stories_handler,
             inputs=[saved_stories_state, current_language],
-            outputs=[saved_stories_state] + story_slot_outputs + [delete_stories_msg]
+            outputs=[saved_stories_state] + story_slot_outputs + [delete_stories_msg],
+            api_visibility="private",
+            concurrency_id=gradio_queue.SYNC_HANDLERS
         )
 
         # Download handlers - return HTML/PDF path directly
@@ -2388,10 +2545,10 @@ def build_ui():
 
             html_path = saved_stories[idx].get("html_path")
             if html_path:
-                logger.info(f"✓ Returning Story HTML for download: {html_path}")
+                logger.info("✓ Returning Story HTML for download: %s", html_path)
                 return html_path
             else:
-                logger.warning(f"✗ No HTML found for story #{story_num}")
+                logger.warning("✗ No HTML found for story #%s", story_num)
                 return None
 
         def download_canvas_handler(canvas_num, postcards):
@@ -2405,22 +2562,26 @@ def build_ui():
 
             pdf_path = postcards[idx].get("pdf_path")
             if pdf_path:
-                logger.info(f"✓ Returning PDF for download: {pdf_path}")
+                logger.info("✓ Returning PDF for download: %s", pdf_path)
                 return pdf_path
             else:
-                logger.warning(f"✗ No PDF found for canvas #{canvas_num}")
+                logger.warning("✗ No PDF found for canvas #%s", canvas_num)
                 return None
 
         download_story_btn.click(
             fn=download_story_handler,
             inputs=[download_story_num, saved_stories_state],
-            outputs=[download_story_file]
+            outputs=[download_story_file],
+            api_visibility="private",
+            concurrency_id=gradio_queue.SYNC_HANDLERS
         )
 
         download_canvas_btn.click(
             fn=download_canvas_handler,
             inputs=[download_canvas_num, postcards_state],
-            outputs=[download_canvas_file]
+            outputs=[download_canvas_file],
+            api_visibility="private",
+            concurrency_id=gradio_queue.SYNC_HANDLERS
         )
 
         # Connect individual ❌ delete buttons for Dream Canvas
@@ -2428,13 +2589,17 @@ def build_ui():
             canvas_delete_btns[i].click(
                 fn=lambda postcards, lang, idx=i+1: delete_postcard_handler(idx, postcards, lang),
                 inputs=[postcards_state, current_language],
-                outputs=[postcards_state] + canvas_slot_outputs + [delete_postcards_msg]
+                outputs=[postcards_state] + canvas_slot_outputs + [delete_postcards_msg],
+                api_visibility="private",
+                concurrency_id=gradio_queue.SYNC_HANDLERS
             )
 
         delete_all_postcards_btn.click(
             fn=delete_all_postcards_handler,
             inputs=[postcards_state, current_language],
-            outputs=[postcards_state] + canvas_slot_outputs + [delete_postcards_msg]
+            outputs=[postcards_state] + canvas_slot_outputs + [delete_postcards_msg],
+            api_visibility="private",
+            concurrency_id=gradio_queue.SYNC_HANDLERS
         )
 
     return app
@@ -2446,14 +2611,13 @@ if __name__ == "__main__":
     print("🌌 ZEN-IT-STORY - GRADIO 6.0 COMPATIBLE")
     print("="*60)
     print("Access at: http://localhost:7860")
+    print("Metrics at: http://localhost:7860/metrics")
     print("="*60 + "\n")
-    app = build_ui()
-    app.queue(default_concurrency_limit=10)
-    app.launch(
-        share=False,
-        server_name="0.0.0.0",
-        server_port=7860,
-        css=CUSTOM_CSS,
-        show_error=True,
-        max_threads=40
-    )
+    demo = gradio_queue.enable_queue(build_ui())
+    metrics.track_queue(demo)
+
+    # Serve Gradio from a FastAPI app so /metrics sits alongside it
+    server = FastAPI()
+    metrics.add_metrics_route(server)
+    server = gr.mount_gradio_app(server, demo, path="/", css=CUSTOM_CSS, show_error=True)
+    uvicorn.run(server, host="0.0.0.0", port=7860)
@@ -0,0 +1,345 @@
+"""
+Hot Path Micro-Benchmarks
+Stable, repeatable timings for the CPU-bound hot paths, compared against a
+stored JSON baseline so regressions are caught before deploy. Timings are
+normalized by a fixed calibration workload interleaved with every repeat, so
+the baseline survives a faster, slower or busier machine, and the check
+allows for each case's measured noise
+
+Run from the repository root:
+    python -m benchmarks.bench_hot_paths                    # print timings
+    python -m benchmarks.bench_hot_paths --save-baseline    # record the baseline
+    python -m benchmarks.bench_hot_paths --check            # exit 1 on regression
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from unittest import mock
+
+import app
+from benchmarks.fake_upstreams import canned_story_markdown
+from src import config
+from src import logging_setup
+from src import story_generator
+from src.astronomy_api import parse_location_input
+from src.mcp_server import get_visible_stars_skyfield
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "hot_paths.json")
+
+DEFAULT_THRESHOLD = 0.25  # Fail when 25% slower than the baseline (relative to calibration)
+NOISE_FACTOR = 2.0  # Plus this many times the case's measured noise...
+MAX_NOISE = 0.15  # ...capped, so a noisy case cannot hide a real slowdown
+CONFIRM_ROUNDS = 2  # A suspected regression must reproduce in this many re-runs
+REPEAT = 15
+COLD_REPEAT = 3
+TARGET_REPEAT_SECONDS = 0.05  # Calls per repeat are calibrated to roughly this long
+
+LOCATION_MISSES = ["Atlantis", "Gotham City", "Springfield, Nowhere", "zzzz", "91.0, 200.0", "Middle Earth"]
+SKYFIELD_ARGS = (41.9028, 12.4964, "2025-01-15")
+SKYFIELD_FILES = ("de421.bsp", "hip_main.dat")
+
+
+# ============================================================================
+# BENCHMARK CASES
+# ============================================================================
+
+def _story_fixtures() -> Dict[str, Tuple[str, Dict, str]]:
+    """Per language: (Markdown story, parsed story, display HTML)."""
+    fixtures = {}
+    for language in config.SUPPORTED_LANGUAGES:
+        markdown = canned_story_markdown("Vega", language)
+        parsed = story_generator.parse_story(markdown, language)
+        fixtures[language] = (markdown, parsed, story_generator.format_story_for_display(parsed, language))
+    return fixtures
+
+
+class _MemoryFile(io.StringIO):
+    """Stand-in for the HTML generators' temp files: disk I/O is not what we time."""
+    name = os.path.join(tempfile.gettempdir(), "bench_hot_paths.html")
+
+
+@contextmanager
+def _in_memory_tempfiles() -> Iterator[None]:
+    with mock.patch.object(tempfile, "NamedTemporaryFile", lambda *args, **kwargs: _MemoryFile()):
+        yield
+
+
+_CALIBRATION_TEXT = " ".join(f"Star{i} shines over city {i % 97}, magnitude {i / 7:.2f}." for i in range(200))
+_CALIBRATION_PATTERN = re.compile(r"magnitude (\d+\.\d+)")
+
+
+def calibration_workload() -> int:
+    """Fixed pure-Python work (split, dict, regex, join) the hot paths are measured against."""
+    counts: Dict[str, int] = {}
+    for word in _CALIBRATION_TEXT.split():
+        key = word.strip(".,").lower()
+        counts[key] = counts.get(key, 0) + 1
+    magnitudes = _CALIBRATION_PATTERN.findall(_CALIBRATION_TEXT)
+    return len("|".join(sorted(counts))) + len(magnitudes)
+
+
+def build_cases() -> Dict[str, Callable[[], object]]:
+    """Name -> zero-argument callable to time."""
+    cases: Dict[str, Callable[[], object]] = {}
+
+    city_names = list(config.CITIES)
+    cases["parse_location_input.all_cities"] = lambda: [parse_location_input(name) for name in city_names]
+    cases["parse_location_input.misses"] = lambda: [parse_location_input(name) for name in LOCATION_MISSES]
+
+    for language, (markdown, parsed, story_html) in _story_fixtures().items():
+        entry = {
+            "story": story_html, "story_html": story_html, "location": "Rome, Italy", "language": language,
+            "title": parsed["title"], "timestamp": "2025-01-15 21:00:00", "image_url": "https://example.org/vega.jpg",
+        }
+        cases[f"safety_filter.{language}"] = lambda text=markdown: story_generator.safety_filter(text)
+        cases[f"parse_story.{language}"] = lambda text=markdown, lang=language: story_generator.parse_story(text, lang)
+        cases[f"format_story_for_display.{language}"] = (
+            lambda story=parsed, lang=language: story_generator.format_story_for_display(story, lang)
+        )
+        # Run under _in_memory_tempfiles: the HTML is built, not written to disk
+        cases[f"generate_saved_story_html.{language}"] = (
+            lambda entries=[entry], lang=language: app.generate_saved_story_html(1, entries, lang)
+        )
+        cases[f"generate_dream_canvas_html.{language}"] = (
+            lambda entries=[entry], lang=language: app.generate_dream_canvas_html(1, entries, lang)
+        )
+
+    if all(os.path.exists(path) for path in SKYFIELD_FILES):
+        get_visible_stars_skyfield(*SKYFIELD_ARGS)  # First call loads the files: that is the cold case
+        cases["skyfield.visible_stars.warm"] = lambda: get_visible_stars_skyfield(*SKYFIELD_ARGS)
+    return cases
+
+
+def skyfield_cold_ms() -> Optional[float]:
+    """First get_visible_stars_skyfield call in a fresh interpreter (None without the data files)."""
+    if not all(os.path.exists(path) for path in SKYFIELD_FILES):
+        return None
+    code = (
+        "import time; from src.mcp_server import get_visible_stars_skyfield as f; "
+        f"t = time.perf_counter(); f(*{SKYFIELD_ARGS!r}); print((time.perf_counter() - t) * 1000)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+# ============================================================================
+# TIMING AND BASELINES
+# ============================================================================
+
+def _calls_per_repeat(timer: timeit.Timer) -> int:
+    number, elapsed = timer.autorange()
+    return max(1, int(number * TARGET_REPEAT_SECONDS / max(elapsed, 1e-9)))
+
+
+_calibration_timer = timeit.Timer(calibration_workload)
+_calibration_number: Optional[int] = None
+
+
+def _calibration_us() -> float:
+    """Per-call time of one calibration repeat."""
+    global _calibration_number
+    if _calibration_number is None:
+        calibration_workload()
+        _calibration_number = _calls_per_repeat(_calibration_timer)
+    return _calibration_timer.timeit(_calibration_number) / _calibration_number * 1e6
+
+
+def _summary(runs_us: List[float], ratios: List[float], number: int) -> Dict[str, float]:
+    """
+    Figures from paired repeats: each case repeat ran right after a
+    calibration repeat, and ratios holds case time / calibration time per pair.
+
+    "relative" (the compared figure) is the median ratio: clock speed changes
+    cancel within a pair and a preempted repeat spoils one pair at most.
+    "noise" is the interquartile range of the ratios relative to the median.
+    """
+    ratios = sorted(ratios)
+    relative = statistics.median(ratios)
+    quartiles = statistics.quantiles(ratios, n=4) if len(ratios) > 1 else [relative] * 3
+    return {
+        "per_call_us": round(min(runs_us), 2),
+        "median_us": round(statistics.median(runs_us), 2),
+        "relative": round(relative, 4),
+        "noise": round((quartiles[2] - quartiles[0]) / relative, 4) if relative else 0.0,
+        "number": number,
+    }
+
+
+def time_case(fn: Callable[[], object]) -> Dict[str, float]:
+    """
+    Time fn with timeit in REPEAT repeats, each paired with a calibration repeat.
+
+    Returns:
+        Dict with per_call_us (best repeat), median_us, relative, noise (see
+        _summary) and number
+    """
+    fn()  # Warm-up (imports, regex compilation, caches)
+    timer = timeit.Timer(fn)
+    number = _calls_per_repeat(timer)
+    runs_us, ratios = [], []
+    for _ in range(REPEAT):
+        calibration_us = _calibration_us()
+        run_us = timer.timeit(number) / number * 1e6
+        runs_us.append(run_us)
+        ratios.append(run_us / calibration_us)
+    return _summary(runs_us, ratios, number)
+
+
+def time_skyfield_cold() -> Optional[Dict[str, float]]:
+    """Cold Skyfield case: COLD_REPEAT fresh interpreters, each paired with a calibration repeat."""
+    runs_us, ratios = [], []
+    for _ in range(COLD_REPEAT):
+        calibration_us = _calibration_us()
+        cold_ms = skyfield_cold_ms()
+        if cold_ms is None:
+            return None
+        runs_us.append(cold_ms * 1000)
+        ratios.append(cold_ms * 1000 / calibration_us)
+    return _summary(runs_us, ratios, 1)
+
+
+def run_benchmark(name_filter: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """Time every case (optionally only names containing name_filter)."""
+    results = {}
+    with _in_memory_tempfiles():
+        for name, fn in build_cases().items():
+            if name_filter and name_filter not in name:
+                continue
+            results[name] = time_case(fn)
+            print(f"{name:45} {results[name]['per_call_us']:12.1f} µs/call "
+                  f"{results[name]['relative']:9.3f}x calibration (noise {results[name]['noise']:.1%})",
+                  file=sys.stderr)
+
+    if not name_filter or name_filter in "skyfield.visible_stars.cold":
+        cold = time_skyfield_cold()
+        if cold is not None:
+            results["skyfield.visible_stars.cold"] = cold
+            print(f"{'skyfield.visible_stars.cold':45} {cold['per_call_us']:12.1f} µs/call", file=sys.stderr)
+        else:
+            print(f"Skipping Skyfield cases: {', '.join(SKYFIELD_FILES)} not in {os.getcwd()}", file=sys.stderr)
+    return results
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, Dict[str, float]]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(results: Dict[str, Dict[str, float]], path: str = BASELINE_PATH) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "results": results,
+        }, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def find_regressions(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[str]:
+    """
+    Compare calibration-relative timings with the baseline.
+
+    A case regresses when it is slower than baseline * (1 + threshold +
+    NOISE_FACTOR * noise), noise being the larger of the baseline's and the
+    current run's spread for that case, capped at MAX_NOISE. Transient spikes
+    past that are filtered by confirm_regressions.
+
+    Args:
+        results: Current timings from run_benchmark
+        baseline: Baseline timings
+        threshold: Allowed slowdown as a fraction (0.25 = 25% slower)
+
+    Returns:
+        {case name: message} for every case past its allowance
+    """
+    regressions = {}
+    for name, current in sorted(results.items()):
+        reference = baseline.get(name)
+        if not reference or "relative" not in reference:
+            continue
+        ratio = current["relative"] / reference["relative"]
+        noise = min(MAX_NOISE, max(current.get("noise", 0.0), reference.get("noise", 0.0)))
+        allowed = 1 + threshold + NOISE_FACTOR * noise
+        if ratio > allowed:
+            regressions[name] = (
+                f"{name}: {current['per_call_us']:.1f} µs vs baseline {reference['per_call_us']:.1f} µs "
+                f"({ratio:.2f}x after calibration, allowed {allowed:.2f}x)"
+            )
+    return regressions
+
+
+def confirm_regressions(
+    regressions: Dict[str, str],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD
+) -> Dict[str, str]:
+    """Re-time suspected regressions CONFIRM_ROUNDS times; keep those that regress every time."""
+    cases = build_cases()
+    for _ in range(CONFIRM_ROUNDS):
+        if not regressions:
+            break
+        with _in_memory_tempfiles():
+            rerun = {name: time_case(cases[name]) for name in regressions if name in cases}
+        confirmed = find_regressions(rerun, baseline, threshold)
+        # Cases that cannot be re-run here (Skyfield cold) stay as measured
+        regressions = {name: confirmed.get(name, message) if name in rerun else message
+                       for name, message in regressions.items()
+                       if name in confirmed or name not in rerun}
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hot path micro-benchmarks")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Write results to {BASELINE_PATH}")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a case regressed past the threshold")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown vs baseline (fraction, default 0.25)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    # Log lines would be timed along with the code under test
+    logging_setup.configure_logging(level="ERROR", force=True)
+
+    results = run_benchmark(args.filter)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+    if args.check:
+        baseline = load_baseline(args.baseline)
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print(f"Re-checking {len(regressions)} suspected regression(s)", file=sys.stderr)
+            regressions = confirm_regressions(regressions, baseline, args.threshold)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions.values()), file=sys.stderr)
+            sys.exit(1)
+        print(f"No regressions (threshold {args.threshold:.0%} + {NOISE_FACTOR:g}x noise)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+End-to-End Load Benchmark
+Drives the story flow, select_celestial and fetch_image against local fake
+upstreams (benchmarks.fake_upstreams) at fixed concurrency levels, and
+prints throughput and p50/p95/p99 latency as JSON to diff between commits
+
+Run from the repository root:
+    python -m benchmarks.bench_load --profile realistic --concurrency 1,10,50 --requests 100 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import app
+from benchmarks.fake_upstreams import PROFILES, fake_upstreams
+from src import config
+from src import http_client
+from src import image_fetcher
+from src import logging_setup
+from src import mcp_server
+
+# Inputs are cycled so caches and curated shortcuts see a realistic mix
+LOCATIONS = ["Rome, Italy", "Paris, France", "New York, USA", "Sydney, Australia", "Tokyo, Japan"]
+LANGUAGES = list(config.SUPPORTED_LANGUAGES)
+COORDINATES = [(41.90, 12.50), (48.86, 2.35), (40.71, -74.01), (-33.87, 151.21), (35.68, 139.69)]
+IMAGE_OBJECTS = [
+    ("Jupiter", "planet", 83.6, 22.0),
+    ("Vega", "star", 279.23, 38.78),
+    ("Saturn", "planet", 345.1, -7.5),
+    ("Betelgeuse", "star", 88.79, 7.41),
+    ("Andromeda Galaxy", "galaxy", None, None),
+]
+
+
+# ============================================================================
+# SCENARIOS
+# ============================================================================
+# Each scenario takes the request index and returns True on success.
+
+def _flow(i: int) -> bool:
+    last = None
+    for last in app.generate_story_flow_with_logs(LOCATIONS[i % len(LOCATIONS)], LANGUAGES[i % len(LANGUAGES)]):
+        pass
+    return bool(last and last.get("complete"))
+
+
+async def _flow_async(i: int) -> bool:
+    last = None
+    async for last in app.generate_story_flow_async(LOCATIONS[i % len(LOCATIONS)], LANGUAGES[i % len(LANGUAGES)]):
+        pass
+    return bool(last and last.get("complete"))
+
+
+def _select_celestial(i: int) -> bool:
+    latitude, longitude = COORDINATES[i % len(COORDINATES)]
+    return bool(mcp_server.select_celestial(latitude, longitude).get("object_name"))
+
+
+def _fetch_image(i: int) -> bool:
+    name, object_type, ra, dec = IMAGE_OBJECTS[i % len(IMAGE_OBJECTS)]
+    return image_fetcher.fetch_image(name, object_type, ra, dec)["source"] != "fallback"
+
+
+SYNC_SCENARIOS: Dict[str, Callable[[int], bool]] = {
+    "flow": _flow,
+    "select_celestial": _select_celestial,
+    "fetch_image": _fetch_image,
+}
+ASYNC_SCENARIOS: Dict[str, Callable[[int], Any]] = {
+    "flow_async": _flow_async,
+}
+
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _summarize(latencies: List[float], errors: int, duration: float, concurrency: int) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    requests = len(latencies)
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(requests / duration, 2) if duration else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 1),
+        "p95_ms": round(_percentile(latencies, 95), 1),
+        "p99_ms": round(_percentile(latencies, 99), 1),
+        "max_ms": round(latencies[-1], 1) if latencies else 0.0,
+    }
+
+
+def run_sync_scenario(fn: Callable[[int], bool], concurrency: int, requests: int) -> Dict[str, Any]:
+    """Call fn requests times from concurrency threads."""
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            ok = fn(i)
+        except Exception:
+            ok = False
+        with lock:
+            latencies.append((time.perf_counter() - start) * 1000)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    return _summarize(latencies, errors, time.perf_counter() - start, concurrency)
+
+
+def run_async_scenario(fn: Callable[[int], Any], concurrency: int, requests: int) -> Dict[str, Any]:
+    """Await fn requests times with at most concurrency in flight, on the pipeline loop."""
+    latencies: List[float] = []
+    errors = 0
+
+    async def drive() -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i: int) -> None:
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    ok = await fn(i)
+                except Exception:
+                    ok = False
+                latencies.append((time.perf_counter() - start) * 1000)
+                if not ok:
+                    errors += 1
+
+        await asyncio.gather(*(one(i) for i in range(requests)))
+
+    start = time.perf_counter()
+    http_client.run_sync(drive())
+    return _summarize(latencies, errors, time.perf_counter() - start, concurrency)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmark(
+    profile: str = "fast",
+    concurrency_levels: List[int] = (1, 10),
+    requests: int = 20,
+    scenarios: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Run every scenario at every concurrency level against the fake upstreams.
+
+    Args:
+        profile: Name of a latency/error profile in fake_upstreams.PROFILES
+        concurrency_levels: Concurrent callers per run
+        requests: Calls per run
+        scenarios: Scenario names to run (default: all)
+
+    Returns:
+        Machine-readable results (commit, profile, per-scenario runs)
+    """
+    selected = scenarios or list(SYNC_SCENARIOS) + list(ASYNC_SCENARIOS)
+    results: Dict[str, List[Dict[str, Any]]] = {}
+
+    with fake_upstreams(PROFILES[profile]):
+        for name in selected:
+            results[name] = []
+            for concurrency in concurrency_levels:
+                if name in SYNC_SCENARIOS:
+                    run = run_sync_scenario(SYNC_SCENARIOS[name], concurrency, requests)
+                else:
+                    run = run_async_scenario(ASYNC_SCENARIOS[name], concurrency, requests)
+                results[name].append(run)
+                print(f"{name:18} c={concurrency:<4} {run['throughput_rps']:8.2f} req/s  "
+                      f"p50 {run['p50_ms']:8.1f}ms  p95 {run['p95_ms']:8.1f}ms  "
+                      f"p99 {run['p99_ms']:8.1f}ms  errors {run['errors']}", file=sys.stderr)
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "profile": profile,
+        "requests_per_run": requests,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline end-to-end load benchmark")
+    parser.add_argument("--profile", default="fast", choices=sorted(PROFILES))
+    parser.add_argument("--concurrency", default="1,10", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=20, help="Calls per scenario and concurrency level")
+    parser.add_argument("--scenario", action="append", choices=list(SYNC_SCENARIOS) + list(ASYNC_SCENARIOS),
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    # Per-request INFO logs would dominate the output and the CPU profile
+    logging_setup.configure_logging(level="WARNING", force=True)
+
+    report = run_benchmark(
+        profile=args.profile,
+        concurrency_levels=[int(level) for level in args.concurrency.split(",")],
+        requests=args.requests,
+        scenarios=args.scenario,
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Gradio Queue Load Generator
+Launches build_ui() locally (upstreams replaced by benchmarks.fake_upstreams),
+replays a bedtime traffic curve through the Gradio HTTP/queue API with
+gradio_client, and reports queue wait, processing time and error rate per
+endpoint for each queue sizing, to pick GRADIO_MAX_THREADS,
+QUEUE_DEFAULT_CONCURRENCY_LIMIT and STORY_CONCURRENCY_LIMIT from data
+
+Run from the repository root:
+    python -m benchmarks.bench_queue --duration 120 --peak-rps 4 \\
+        --setting story=40,default=10,threads=50 --setting story=200,default=20,threads=220 \\
+        --output queue.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from gradio_client import Client
+from gradio_client.utils import Status
+
+from benchmarks.bench_load import _git_commit, _percentile
+from benchmarks.fake_upstreams import PROFILES
+
+# Weighted traffic mix (city, weight) and (language, weight)
+CITY_MIX = [
+    ("Roma, Italia", 12), ("Milano, Italia", 8), ("Paris, France", 10), ("London, UK", 10),
+    ("New York, USA", 12), ("Madrid, España", 6), ("Barcelona, España", 4), ("Tokyo, Japan", 6),
+    ("Sydney, Australia", 4), ("Buenos Aires, Argentina", 3), ("Roma", 3), ("Nueva York", 2),
+]
+LANGUAGE_MIX = [("it", 35), ("en", 35), ("es", 15), ("fr", 15)]
+
+# Share of sessions that save the story / make a Dream Canvas afterwards
+SAVE_PROBABILITY = 0.4
+CANVAS_PROBABILITY = 0.2
+
+POLL_SECONDS = 0.01
+RUNNING_CODES = (Status.PROCESSING, Status.ITERATING, Status.PROGRESS)
+
+# Setting keys -> environment variables read by src/config.py
+SETTING_ENV = {
+    "story": "STORY_CONCURRENCY_LIMIT",
+    "default": "QUEUE_DEFAULT_CONCURRENCY_LIMIT",
+    "threads": "GRADIO_MAX_THREADS",
+    "max_size": "QUEUE_MAX_SIZE",
+}
+
+
+# ============================================================================
+# TRAFFIC MODEL
+# ============================================================================
+
+def bedtime_curve(fraction: float) -> float:
+    """
+    Relative request rate over the evening (19:00-22:00 mapped to 0..1).
+
+    Bell-shaped around the 20:30 peak, never below 10% of the peak.
+    """
+    return max(0.1, math.exp(-0.5 * ((fraction - 0.5) / 0.18) ** 2))
+
+
+def arrival_times(duration: float, peak_rps: float, seed: int) -> List[float]:
+    """Session start offsets (seconds) from a Poisson process following bedtime_curve (thinning)."""
+    rng = random.Random(seed)
+    times, t = [], 0.0
+    while True:
+        t += rng.expovariate(peak_rps)
+        if t >= duration:
+            return times
+        if rng.random() < bedtime_curve(t / duration):
+            times.append(t)
+
+
+def _weighted(rng: random.Random, mix: List[Tuple[str, int]]) -> str:
+    return rng.choices([value for value, _ in mix], weights=[weight for _, weight in mix])[0]
+
+
+# ============================================================================
+# LOAD GENERATOR
+# ============================================================================
+
+class _Recorder:
+    """Thread-safe per-endpoint call records: (queue wait s, processing s, error)."""
+
+    def __init__(self):
+        self.calls: Dict[str, List[Tuple[float, float, bool]]] = {}
+        self.lock = threading.Lock()
+
+    def add(self, api_name: str, queue_wait: float, processing: float, error: bool) -> None:
+        with self.lock:
+            self.calls.setdefault(api_name, []).append((queue_wait, processing, error))
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        endpoints = {}
+        for api_name, calls in sorted(self.calls.items()):
+            waits = sorted(wait * 1000 for wait, _, _ in calls)
+            processing = sorted(proc * 1000 for _, proc, _ in calls)
+            errors = sum(1 for _, _, error in calls if error)
+            endpoints[api_name] = {
+                "calls": len(calls),
+                "errors": errors,
+                "error_rate": round(errors / len(calls), 4),
+                **{f"queue_wait_p{q}_ms": round(_percentile(waits, q), 1) for q in (50, 95, 99)},
+                **{f"processing_p{q}_ms": round(_percentile(processing, q), 1) for q in (50, 95, 99)},
+            }
+        return endpoints
+
+
+def _timed_call(client: Client, recorder: _Recorder, api_name: str, *args) -> bool:
+    """Submit one event and split its latency into queue wait and processing."""
+    submitted = time.perf_counter()
+    job = client.submit(*args, api_name=api_name)
+    started = None
+    while not job.done():
+        if started is None and job.status().code in RUNNING_CODES:
+            started = time.perf_counter()
+        time.sleep(POLL_SECONDS)
+    finished = time.perf_counter()
+    started = started or finished
+    error = job.exception() is not None
+    recorder.add(api_name, started - submitted, finished - started, error)
+    return not error
+
+
+def _session(url: str, local: threading.local, recorder: _Recorder, seed: int) -> None:
+    """One visitor: pick a language, generate a story, maybe save it and make a canvas."""
+    rng = random.Random(seed)
+    if not hasattr(local, "client"):
+        local.client = Client(url, verbose=False, download_files=False)
+    else:
+        local.client.reset_session()  # New session hash = fresh gr.State
+    client = local.client
+
+    language = _weighted(rng, LANGUAGE_MIX)
+    if language != "en":
+        _timed_call(client, recorder, f"/set_language_{language}")
+    if not _timed_call(client, recorder, "/generate_story", _weighted(rng, CITY_MIX)):
+        return
+    if rng.random() < SAVE_PROBABILITY:
+        _timed_call(client, recorder, "/save_story")
+    if rng.random() < CANVAS_PROBABILITY:
+        _timed_call(client, recorder, "/create_dream_canvas")
+
+
+def run_traffic(url: str, duration: float, peak_rps: float, seed: int, max_sessions: int) -> Dict[str, Any]:
+    """Replay the bedtime curve against url and summarize every endpoint."""
+    recorder = _Recorder()
+    local = threading.local()
+    offsets = arrival_times(duration, peak_rps, seed)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_sessions) as pool:
+        for i, offset in enumerate(offsets):
+            time.sleep(max(0.0, offset - (time.perf_counter() - start)))
+            pool.submit(_session, url, local, recorder, seed + i)
+    return {
+        "sessions": len(offsets),
+        "wall_s": round(time.perf_counter() - start, 1),
+        "endpoints": recorder.summary(),
+    }
+
+
+# ============================================================================
+# SERVER UNDER TEST
+# ============================================================================
+
+def parse_setting(spec: str) -> Dict[str, str]:
+    """"story=200,default=10,threads=210" -> environment variables for src/config.py."""
+    env = {}
+    for item in spec.split(","):
+        key, _, value = item.partition("=")
+        if key.strip() not in SETTING_ENV:
+            raise ValueError(f"Unknown setting '{key}' (expected one of: {', '.join(SETTING_ENV)})")
+        env[SETTING_ENV[key.strip()]] = value.strip()
+    return env
+
+
+def _route_gradio_downloads() -> None:
+    """
+    Let Gradio fetch result image URLs from the fake upstreams.
+
+    gr.Image downloads URL values server-side through an SSRF guard that
+    rejects loopback addresses, so fetch through the host overrides instead.
+    """
+    import httpx
+    from pathlib import Path
+    from gradio import processing_utils
+    from gradio_client import utils as client_utils
+    from src import http_client
+
+    async def download(url: str, cache_dir: str) -> str:
+        temp_dir = Path(cache_dir) / processing_utils.hash_url(url)
+        temp_dir.mkdir(exist_ok=True, parents=True)
+        filename = client_utils.strip_invalid_filename_characters(Path(url.split("?")[0].rstrip("/")).name) or "file"
+        path = temp_dir / filename
+        if not path.exists():
+            async with httpx.AsyncClient(follow_redirects=True) as client:
+                response = await client.get(http_client.resolve_url(url))
+            path.write_bytes(response.content)
+        return str(path.resolve())
+
+    processing_utils.async_ssrf_protected_download = download
+
+
+def serve(port: int, profile: str) -> None:
+    """Run build_ui() with the configured queue sizing and fake upstreams until killed."""
+    import app
+    from benchmarks.fake_upstreams import fake_upstreams
+    from src import config
+    from src import gradio_queue
+    from src import logging_setup
+
+    logging_setup.configure_logging(level="WARNING", force=True)
+    _route_gradio_downloads()
+    with fake_upstreams(PROFILES[profile]):
+        demo = gradio_queue.enable_queue(app.build_ui())
+        demo.launch(
+            server_name="127.0.0.1", server_port=port, quiet=True,
+            max_threads=config.GRADIO_MAX_THREADS, prevent_thread_lock=True
+        )
+        demo.block_thread()
+
+
+def _start_server(port: int, profile: str, env: Dict[str, str]) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_queue", "--serve", str(port), "--profile", profile],
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}/"
+    deadline = time.time() + 180
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            urllib.request.urlopen(url + "config", timeout=2)
+            return process
+        except OSError:
+            time.sleep(0.5)
+    process.kill()
+    raise RuntimeError("Server did not start within 180s")
+
+
+def run_benchmark(
+    settings: List[str],
+    duration: float = 60,
+    peak_rps: float = 2,
+    profile: str = "realistic",
+    port: int = 7899,
+    seed: int = 42,
+    max_sessions: int = 500
+) -> Dict[str, Any]:
+    """
+    Replay the same traffic against one freshly launched server per queue setting.
+
+    Args:
+        settings: Queue sizings, e.g. "story=200,default=10,threads=210"
+        duration: Length of the compressed evening in seconds
+        peak_rps: Session arrival rate at the 20:30 peak
+        profile: Fake upstream latency/error profile
+        port: Local port for the server under test
+        seed: Seed for arrivals, cities, languages and actions (same traffic per setting)
+        max_sessions: Maximum concurrent simulated visitors
+
+    Returns:
+        Machine-readable results, one entry per setting
+    """
+    runs = []
+    for spec in settings:
+        env = parse_setting(spec)
+        print(f"Setting {spec}: starting server...", file=sys.stderr)
+        process = _start_server(port, profile, env)
+        try:
+            result = run_traffic(f"http://127.0.0.1:{port}/", duration, peak_rps, seed, max_sessions)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+        runs.append({"setting": spec, "env": env, **result})
+        for api_name, stats in result["endpoints"].items():
+            print(f"  {api_name:24} calls {stats['calls']:5}  wait p95 {stats['queue_wait_p95_ms']:8.1f}ms  "
+                  f"proc p95 {stats['processing_p95_ms']:8.1f}ms  errors {stats['error_rate']:.1%}", file=sys.stderr)
+
+    return {
+        "commit": _git_commit(),
+        "profile": profile,
+        "duration_s": duration,
+        "peak_rps": peak_rps,
+        "seed": seed,
+        "runs": runs,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gradio queue load generator")
+    parser.add_argument("--setting", action="append",
+                        help="Queue sizing to test, e.g. story=200,default=10,threads=210 (repeatable)")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds for the compressed 19:00-22:00 evening")
+    parser.add_argument("--peak-rps", type=float, default=2, help="New sessions per second at the peak")
+    parser.add_argument("--profile", default="realistic", choices=sorted(PROFILES))
+    parser.add_argument("--port", type=int, default=7899)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-sessions", type=int, default=500)
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.profile)
+        return
+
+    report = run_benchmark(
+        settings=args.setting or ["story=200,default=10,threads=210"],
+        duration=args.duration,
+        peak_rps=args.peak_rps,
+        profile=args.profile,
+        port=args.port,
+        seed=args.seed,
+        max_sessions=args.max_sessions,
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Safety Filter Micro-Benchmark
+Compares the legacy per-word regex loop with the precompiled single-pass matcher
+
+Run from the repository root:
+    python -m benchmarks.bench_safety_filter
+"""
+
+import re
+import timeit
+
+from src import config
+from src import story_generator
+
+
+def legacy_safety_filter(text: str) -> bool:
+    """Previous implementation: one regex build + search per unsafe word."""
+    text_lower = text.lower()
+    for unsafe_word in config.UNSAFE_WORDS:
+        pattern = r'\b' + re.escape(unsafe_word) + r'\b'
+        if re.search(pattern, text_lower):
+            return False
+    return True
+
+
+def _sample_stories() -> dict:
+    """Realistic story texts: the fallback stories, in all four languages."""
+    return {
+        language: story_generator.get_fallback_story("Vega", language)["full_text"]
+        for language in config.SUPPORTED_LANGUAGES
+    }
+
+
+def run_benchmark(number: int = 500, repeat: int = 3) -> None:
+    """Time both implementations on every sample story and print the speedup."""
+    print("\n" + "=" * 80)
+    print("Safety Filter Benchmark")
+    print("=" * 80 + "\n")
+
+    for language, text in _sample_stories().items():
+        # Same verdict is a precondition for comparing timings
+        assert legacy_safety_filter(text) == story_generator.safety_filter(text)
+
+        legacy = min(timeit.repeat(lambda: legacy_safety_filter(text), number=number, repeat=repeat))
+        compiled = min(timeit.repeat(lambda: story_generator.safety_filter(text), number=number, repeat=repeat))
+
+        legacy_us = legacy / number * 1e6
+        compiled_us = compiled / number * 1e6
+        print(f"{language} ({len(text)} chars)")
+        print(f"  legacy loop:      {legacy_us:8.1f} µs/story")
+        print(f"  compiled matcher: {compiled_us:8.1f} µs/story")
+        print(f"  speedup:          {legacy_us / compiled_us:8.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
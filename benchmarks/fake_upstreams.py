@@ -0,0 +1,310 @@
+"""
+Fake Upstreams - Local stand-ins for every external service
+One threaded HTTP server per upstream (Visible Planets, Arcsecond, Hubble,
+SDSS, SkyView, Wikimedia, APOD, ipapi.co, image CDNs) plus a fake Gemini model,
+each with its own latency and error profile. While active, http_client
+sends upstream requests to the local servers, so benchmarks run offline.
+
+Example:
+    >>> with fake_upstreams(PROFILES["realistic"]):
+    ...     select_celestial(48.85, 2.35)
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src import config
+from src import http_client
+from src import story_generator
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Latency and error behaviour of one fake upstream."""
+    latency_ms: float = 20.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+
+    def delay(self) -> float:
+        """Seconds to wait before answering one request."""
+        return max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+    def fails(self) -> bool:
+        return random.random() < self.error_rate
+
+
+# ============================================================================
+# CANNED RESPONSES
+# ============================================================================
+
+# 1x1 transparent GIF, served wherever an image is expected
+_GIF = (b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00"
+        b"\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;")
+
+# (status, content type, body)
+Response = Tuple[int, str, bytes]
+
+
+def _json(data) -> Response:
+    return 200, "application/json", json.dumps(data).encode()
+
+
+def _image() -> Response:
+    return 200, "image/gif", _GIF
+
+
+def _visible_planets(path: str, query: Dict[str, List[str]]) -> Response:
+    return _json({"data": [
+        {"name": "Jupiter", "rightAscension": 83.6, "declination": 22.0, "magnitude": -2.4,
+         "constellation": "Taurus", "aboveHorizon": True, "altitude": 42.0, "azimuth": 120.0},
+        {"name": "Saturn", "rightAscension": 345.1, "declination": -7.5, "magnitude": 0.9,
+         "constellation": "Aquarius", "aboveHorizon": True, "altitude": 18.0, "azimuth": 210.0},
+        {"name": "Mars", "rightAscension": 140.2, "declination": 17.3, "magnitude": 1.1,
+         "constellation": "Cancer", "aboveHorizon": False, "altitude": -5.0, "azimuth": 60.0},
+    ]})
+
+
+def _arcsecond(path: str, query: Dict[str, List[str]]) -> Response:
+    name = path.rstrip("/").rsplit("/", 1)[-1]
+    return _json({"name": name, "coordinates": {"right_ascension": 279.23, "declination": 38.78},
+                  "object_types": ["Star"], "aliases": [name]})
+
+
+def _hubble(path: str, query: Dict[str, List[str]]) -> Response:
+    name = query.get("name", ["object"])[0]
+    return _json([{"description": f"{name} captured by Hubble",
+                   "image_files": [{"file_url": f"https://stsci-opo.org/STScI-{name}.png"}]}])
+
+
+def _wikimedia(path: str, query: Dict[str, List[str]]) -> Response:
+    if query.get("list") == ["search"]:
+        term = query.get("srsearch", ["object"])[0].split()[0]
+        return _json({"query": {"search": [{"title": f"File:{term}.jpg"}]}})
+    title = query.get("titles", ["File:object.jpg"])[0]
+    return _json({"query": {"pages": {"1": {"title": title, "imageinfo": [
+        {"url": f"https://upload.wikimedia.org/wikipedia/commons/{title[5:]}"}]}}}})
+
+
+def _apod(path: str, query: Dict[str, List[str]]) -> Response:
+    return _json([{"media_type": "image", "title": "A starry night",
+                   "url": "https://apod.nasa.gov/apod/image/starfield.jpg"}])
+
+
+def _ipapi(path: str, query: Dict[str, List[str]]) -> Response:
+    return _json({"city": "Paris", "country_name": "France", "latitude": 48.8566,
+                  "longitude": 2.3522, "timezone": "Europe/Paris"})
+
+
+# Upstream name -> (hosts served, handler)
+UPSTREAMS: Dict[str, Tuple[Tuple[str, ...], Callable[[str, Dict[str, List[str]]], Response]]] = {
+    "visible_planets": (("api.visibleplanets.dev",), _visible_planets),
+    "arcsecond": (("api.arcsecond.io",), _arcsecond),
+    "hubble": (("hubblesite.org",), _hubble),
+    "sdss": (("skyserver.sdss.org",), lambda path, query: _image()),
+    "skyview": (("skyview.gsfc.nasa.gov",), lambda path, query: _image()),
+    "wikimedia": (("commons.wikimedia.org",), _wikimedia),
+    "apod": (("api.nasa.gov",), _apod),
+    "ipapi": (("ipapi.co",), _ipapi),
+    # Image files behind the URLs above (curated HEAD checks, UI downloads)
+    "image_cdn": (
+        ("upload.wikimedia.org", "stsci-opo.org", "apod.nasa.gov", "images.unsplash.com"),
+        lambda path, query: _image()
+    ),
+}
+
+
+# ============================================================================
+# LATENCY / ERROR PROFILES
+# ============================================================================
+
+def _profile_set(default: Profile, **overrides: Profile) -> Dict[str, Profile]:
+    return {name: overrides.get(name, default) for name in list(UPSTREAMS) + ["gemini"]}
+
+
+PROFILES: Dict[str, Dict[str, Profile]] = {
+    # Near-zero latency: measures our own overhead
+    "fast": _profile_set(Profile(latency_ms=1)),
+    # Rough production latencies (Gemini dominates)
+    "realistic": _profile_set(
+        Profile(latency_ms=150, jitter_ms=50),
+        visible_planets=Profile(latency_ms=400, jitter_ms=150),
+        arcsecond=Profile(latency_ms=250, jitter_ms=100),
+        ipapi=Profile(latency_ms=100, jitter_ms=30),
+        gemini=Profile(latency_ms=2500, jitter_ms=800),
+    ),
+    # Realistic latencies with 20% upstream errors
+    "flaky": _profile_set(
+        Profile(latency_ms=150, jitter_ms=50, error_rate=0.2),
+        visible_planets=Profile(latency_ms=400, jitter_ms=150, error_rate=0.2),
+        gemini=Profile(latency_ms=2500, jitter_ms=800, error_rate=0.1),
+    ),
+}
+
+
+# ============================================================================
+# FAKE HTTP SERVERS
+# ============================================================================
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answers every request with the upstream's canned response after its profile delay."""
+
+    upstream: Callable[[str, Dict[str, List[str]]], Response]
+    profile: Profile
+
+    def _respond(self, include_body: bool) -> None:
+        time.sleep(self.profile.delay())
+        if self.profile.fails():
+            status, content_type, body = self.profile.error_status, "application/json", b'{"error": "fake"}'
+        else:
+            parts = urlsplit(self.path)
+            status, content_type, body = self.upstream(parts.path, parse_qs(parts.query))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        self._respond(include_body=True)
+
+    def do_HEAD(self) -> None:
+        self._respond(include_body=False)
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # Keep benchmark output clean
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Accept backlog for high-concurrency runs
+
+
+def _start_server(upstream: Callable, profile: Profile) -> ThreadingHTTPServer:
+    handler = type("Handler", (_Handler,), {"upstream": staticmethod(upstream), "profile": profile})
+    server = _Server(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, name="fake-upstream", daemon=True).start()
+    return server
+
+
+# ============================================================================
+# FAKE GEMINI
+# ============================================================================
+
+def canned_story_markdown(object_name: str, language: str) -> str:
+    """A realistic Markdown story in the format the story prompt asks for."""
+    story = story_generator.get_fallback_story(object_name, language)
+    return f"# {story['title']}\n\n{story['story']}\n\n### {story['haiku_title']}\n{story['haiku']}\n"
+
+
+class _FakeChunk:
+    def __init__(self, text: str, final: bool):
+        self.text = text
+        self.usage_metadata = _FakeUsage() if final else None
+
+
+class _FakeUsage:
+    prompt_token_count = 600
+    candidates_token_count = 450
+
+
+class FakeGeminiModel:
+    """Stand-in for genai.GenerativeModel that returns canned stories after the profile delay."""
+
+    CHUNKS = 8
+
+    def __init__(self, profile: Profile):
+        self.profile = profile
+
+    def _response_text(self, prompt: str) -> str:
+        if "=== LANGUAGE:" in prompt:
+            return "\n".join(
+                f"=== LANGUAGE: {lang} ===\n{canned_story_markdown('Vega', lang)}"
+                for lang in config.SUPPORTED_LANGUAGES
+            )
+        language = next(
+            (code for code, name in config.SUPPORTED_LANGUAGES.items() if f"TARGET LANGUAGE: {name}" in prompt),
+            "en"
+        )
+        return canned_story_markdown("Vega", language)
+
+    def _chunks(self, prompt: str) -> List[_FakeChunk]:
+        if self.profile.fails():
+            raise RuntimeError(f"fake Gemini error ({self.profile.error_status})")
+        text = self._response_text(prompt)
+        size = len(text) // self.CHUNKS + 1
+        pieces = [text[i:i + size] for i in range(0, len(text), size)]
+        return [_FakeChunk(piece, i == len(pieces) - 1) for i, piece in enumerate(pieces)]
+
+    def generate_content(self, prompt: str, stream: bool = False, request_options: Optional[Dict] = None):
+        delay = self.profile.delay()
+        chunks = self._chunks(prompt)
+        if not stream:
+            time.sleep(delay)
+            return _FakeChunk("".join(c.text for c in chunks), True)
+
+        def iterate():
+            for chunk in chunks:
+                time.sleep(delay / len(chunks))
+                yield chunk
+        return iterate()
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, request_options: Optional[Dict] = None):
+        delay = self.profile.delay()
+        chunks = self._chunks(prompt)
+        if not stream:
+            await asyncio.sleep(delay)
+            return _FakeChunk("".join(c.text for c in chunks), True)
+
+        async def iterate():
+            for chunk in chunks:
+                await asyncio.sleep(delay / len(chunks))
+                yield chunk
+        return iterate()
+
+
+# ============================================================================
+# ACTIVATION
+# ============================================================================
+
+@contextmanager
+def fake_upstreams(profiles: Optional[Dict[str, Profile]] = None) -> Iterator[Dict[str, str]]:
+    """
+    Serve every upstream locally and route http_client and Gemini to the fakes.
+
+    Args:
+        profiles: Upstream name (plus "gemini") -> Profile; missing ones use Profile()
+
+    Yields:
+        Dict mapping upstream host to the local base URL serving it
+    """
+    profiles = profiles or PROFILES["fast"]
+    servers = []
+    overrides = {}
+    for name, (hosts, handler) in UPSTREAMS.items():
+        server = _start_server(handler, profiles.get(name, Profile()))
+        servers.append(server)
+        for host in hosts:
+            overrides[host] = f"http://127.0.0.1:{server.server_address[1]}"
+
+    gemini = FakeGeminiModel(profiles.get("gemini", Profile()))
+    original_create_model = story_generator._create_model
+    previous_overrides = http_client.set_host_overrides(overrides)
+    story_generator._create_model = lambda: gemini
+    try:
+        yield overrides
+    finally:
+        story_generator._create_model = original_create_model
+        http_client.set_host_overrides(previous_overrides)
+        for server in servers:
+            server.shutdown()
+            server.server_close()
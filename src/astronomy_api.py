@@ -8,15 +8,20 @@ import logging
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
-from urllib.parse import quote
 
 import requests
 
+from src import gazetteer
+from src import geolocation
+from src import http_client
+from src import location_index
+from src import metadata_service
+from src import metrics
+from src import timing
+from src.deadline import Deadline, DeadlineExceeded, NO_DEADLINE
+from src.logging_setup import log_sampled
 from src.config import (
-    ARCSECOND_API_KEY,
-    CITIES,
     FALLBACK_IMAGE_URL,
-    GEOLOC_API_URL,
     ICONIC_PLANETS,
     IMAGE_SOURCES,
     SCORING_WEIGHTS,
@@ -26,10 +31,6 @@ from src.config import (
 # LOGGING SETUP
 # ============================================================================
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -39,24 +40,29 @@ logger = logging.getLogger(__name__)
 _cache: Dict[str, Tuple[Any, float]] = {}
 CACHE_TTL = 3600
 
-def _get_cache_key(*args) -> str:
-    key_str = "_".join(str(arg) for arg in args)
-    return hashlib.md5(key_str.encode()).hexdigest()
+def _get_cache_key(namespace: str, *args) -> str:
+    key_str = "_".join(str(arg) for arg in (namespace,) + args)
+    return f"{namespace}:{hashlib.md5(key_str.encode()).hexdigest()}"
 
 def _get_from_cache(cache_key: str) -> Optional[Any]:
+    namespace = cache_key.split(":", 1)[0]
     if cache_key in _cache:
         value, timestamp = _cache[cache_key]
         if time.time() - timestamp < CACHE_TTL:
-            logger.info(f"Cache hit: {cache_key}")
+            log_sampled(logger, logging.DEBUG, "cache.hit", "Cache hit: %s", cache_key)
+            metrics.CACHE_REQUESTS.labels(namespace=namespace, result="hit").inc()
             return value
         else:
             del _cache[cache_key]
-            logger.info(f"Cache expired: {cache_key}")
+            log_sampled(logger, logging.DEBUG, "cache.expired", "Cache expired: %s", cache_key)
+            metrics.CACHE_REQUESTS.labels(namespace=namespace, result="expired").inc()
+            return None
+    metrics.CACHE_REQUESTS.labels(namespace=namespace, result="miss").inc()
     return None
 
 def _set_to_cache(cache_key: str, value: Any) -> None:
     _cache[cache_key] = (value, time.time())
-    logger.info(f"Cache set: {cache_key}")
+    log_sampled(logger, logging.DEBUG, "cache.set", "Cache set: %s", cache_key)
 
 # ============================================================================
 # HTTP HELPERS
@@ -67,30 +73,28 @@ def _make_request(
     params: Optional[Dict] = None,
     headers: Optional[Dict] = None,
     timeout: int = 30,
-    retry: bool = True
+    deadline: Deadline = NO_DEADLINE
 ) -> Optional[requests.Response]:
+    """GET url (retried per src/retry.py by http_client); None if it still fails or the deadline passed."""
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=timeout)
+        response = http_client.get(url, params=params, headers=headers, timeout=timeout, deadline=deadline)
         response.raise_for_status()
         return response
     except requests.exceptions.Timeout:
-        logger.error(f"Timeout requesting {url}")
-        if retry:
-            logger.info(f"Retrying {url}...")
-            return _make_request(url, params, headers, timeout, retry=False)
+        logger.error("Timeout requesting %s", url)
         return None
     except requests.exceptions.RequestException as e:
-        logger.error(f"Request failed for {url}: {e}")
-        if retry:
-            logger.info(f"Retrying {url}...")
-            time.sleep(1)
-            return _make_request(url, params, headers, timeout, retry=False)
+        logger.error("Request failed for %s: %s", url, e)
+        return None
+    except DeadlineExceeded:
+        logger.warning("Deadline reached before requesting %s", url)
         return None
 
 # ============================================================================
 # LOCATION PARSING - CRITICAL FUNCTIONS
 # ============================================================================
 
+@timing.timed()
 def parse_location_input(location: str) -> Tuple[Optional[float], Optional[float], str]:
     """Parse location input string into coordinates and city name."""
     if not location or not location.strip():
@@ -98,86 +102,50 @@ def parse_location_input(location: str) -> Tuple[Optional[float], Optional[float
     
     location = location.strip()
     
-    if location in CITIES:
-        lat, lon = CITIES[location]
-        logger.info(f"Exact match: {location} -> ({lat}, {lon})")
-        return lat, lon, location
-    
-    location_lower = location.lower()
-    for city_name, (lat, lon) in CITIES.items():
-        if city_name.lower() == location_lower:
-            logger.info(f"Case-insensitive match: {location} -> {city_name}")
-            return lat, lon, city_name
-    
-    for city_name, (lat, lon) in CITIES.items():
-        city_part = city_name.split(",")[0].strip().lower()
-        if location_lower == city_part or city_part in location_lower or location_lower in city_part:
-            logger.info(f"Partial match: {location} -> {city_name}")
-            return lat, lon, city_name
-    
+    # Coordinates first: digits must never be typo-corrected into a city name
     try:
         parts = location.replace(" ", "").split(",")
         if len(parts) == 2:
             lat = float(parts[0])
             lon = float(parts[1])
             if -90 <= lat <= 90 and -180 <= lon <= 180:
-                logger.info(f"Coordinates parsed: ({lat}, {lon})")
-                return lat, lon, f"Location ({lat:.2f}, {lon:.2f})"
+                logger.info("Coordinates parsed: (%s, %s)", lat, lon)
+                return lat, lon, location_index.describe_coordinates(lat, lon)
     except (ValueError, IndexError):
         pass
     
-    logger.warning(f"Could not parse location: {location}")
+    # Curated table first; the gazetteer only wins over weak curated matches
+    match = location_index.best_match(location)
+    if match is None or match.kind not in ("exact", "city"):
+        place = gazetteer.best_match(location)
+        if place is not None and (match is None or place.score > match.score):
+            match = place
+    if match:
+        logger.info("Location match (%s, score %.2f): %s -> %s", match.kind, match.score, location, match.name)
+        return match.latitude, match.longitude, match.name
+    
+    logger.warning("Could not parse location: %s", location)
     return None, None, ""
 
 
-def get_user_location_from_ip() -> Dict[str, Any]:
-    """Get user location from IP address."""
-    try:
-        response = _make_request(GEOLOC_API_URL, timeout=3)
-        
-        if response is None:
-            return {
-                "error": True,
-                "message": "Geolocation service unavailable",
-                "latitude": None,
-                "longitude": None,
-                "city": None,
-                "country": None
-            }
-        
-        data = response.json()
-        latitude = data.get("latitude")
-        longitude = data.get("longitude")
-        
-        if latitude is None or longitude is None:
-            return {
-                "error": True,
-                "message": "Could not determine coordinates",
-                "latitude": None,
-                "longitude": None,
-                "city": None,
-                "country": None
-            }
-        
-        return {
-            "error": False,
-            "latitude": latitude,
-            "longitude": longitude,
-            "city": data.get("city", "Unknown"),
-            "country": data.get("country_name", data.get("country_code", "Unknown")),
-            "timezone": data.get("timezone")
-        }
-        
-    except Exception as e:
-        logger.error(f"IP geolocation failed: {e}")
-        return {
-            "error": True,
-            "message": str(e),
-            "latitude": None,
-            "longitude": None,
-            "city": None,
-            "country": None
-        }
+@timing.timed("astronomy_api.ip_geolocation")
+def get_user_location_from_ip(ip: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get the user's location from their IP address.
+
+    Args:
+        ip: Client IP (see geolocation.client_ip); None locates the server
+
+    Returns:
+        Location dict with error flag, coordinates, city and display_name
+    """
+    return geolocation.locate(ip)
+
+
+@timing.timed("astronomy_api.ip_geolocation")
+async def get_user_location_from_ip_async(ip: Optional[str] = None) -> Dict[str, Any]:
+    """Async version of get_user_location_from_ip (shared async HTTP client)."""
+    return await geolocation.locate_async(ip)
 
 
 def format_location_display(city_name: str, lat: float, lon: float, language: str = "en") -> str:
@@ -201,6 +169,7 @@ def format_location_display(city_name: str, lat: float, lon: float, language: st
 # VISIBLE PLANETS API
 # ============================================================================
 
+@timing.timed()
 def get_visible_planets(
     latitude: float,
     longitude: float,
@@ -217,7 +186,7 @@ def get_visible_planets(
     if date:
         params["date"] = date
 
-    logger.info(f"Fetching visible planets for lat={latitude}, lon={longitude}, date={date}")
+    logger.info("Fetching visible planets for lat=%s, lon=%s, date=%s", latitude, longitude, date)
     response = _make_request(url, params=params)
 
     if response is None:
@@ -232,11 +201,11 @@ def get_visible_planets(
                 planets.append(planet_info)
 
         _set_to_cache(cache_key, planets)
-        logger.info(f"Found {len(planets)} planets")
+        logger.info("Found %s planets", len(planets))
         return planets
 
     except (ValueError, KeyError) as e:
-        logger.error(f"Failed to parse visible planets response: {e}")
+        logger.error("Failed to parse visible planets response: %s", e)
         return None
 
 
@@ -244,46 +213,10 @@ def get_visible_planets(
 # ARCSECOND API
 # ============================================================================
 
-def get_object_metadata(object_name: str) -> Optional[Dict[str, Any]]:
-    """Get astronomical object metadata from Arcsecond.io."""
-    cache_key = _get_cache_key("arcsecond", object_name.lower())
-    cached = _get_from_cache(cache_key)
-    if cached is not None:
-        return cached
-
-    name_variations = [object_name, object_name.upper(), object_name.lower(), object_name.capitalize()]
-    headers = {}
-    if ARCSECOND_API_KEY:
-        headers["Authorization"] = f"Token {ARCSECOND_API_KEY}"
-
-    for name_variant in name_variations:
-        url = f"https://api.arcsecond.io/objects/{quote(name_variant)}/"
-        logger.info(f"Fetching metadata for {name_variant} from Arcsecond")
-
-        response = _make_request(url, headers=headers)
-
-        if response is not None:
-            try:
-                data = response.json()
-                metadata = {
-                    "name": data.get("name", object_name),
-                    "ra": data.get("coordinates", {}).get("rightascension"),
-                    "dec": data.get("coordinates", {}).get("declination"),
-                    "distance": data.get("distance"),
-                    "object_type": data.get("type", "unknown"),
-                    "magnitude": data.get("magnitude"),
-                    "constellation": data.get("constellation"),
-                    "facts": data
-                }
-                _set_to_cache(cache_key, metadata)
-                logger.info(f"Successfully fetched metadata for {object_name}")
-                return metadata
-            except (ValueError, KeyError) as e:
-                logger.error(f"Failed to parse Arcsecond response for {name_variant}: {e}")
-                continue
-
-    logger.warning(f"Could not find object {object_name} on Arcsecond")
-    return None
+@timing.timed()
+def get_object_metadata(object_name: str, deadline: Deadline = NO_DEADLINE) -> Optional[Dict[str, Any]]:
+    """Get astronomical object metadata from Arcsecond.io (cached, see src/metadata_service.py)."""
+    return metadata_service.lookup(object_name, deadline)
 
 
 # ============================================================================
@@ -295,7 +228,7 @@ def _search_hubble_heritage(object_name: str) -> Optional[str]:
     try:
         url = IMAGE_SOURCES["hubble"]
         params = {"page": "all", "collection_name": object_name}
-        logger.info(f"Searching Hubble Heritage for {object_name}")
+        logger.info("Searching Hubble Heritage for %s", object_name)
         response = _make_request(url, params=params, timeout=120)
 
         if response is None:
@@ -310,11 +243,11 @@ def _search_hubble_heritage(object_name: str) -> Optional[str]:
                         largest = max(image_files, key=lambda x: x.get("file_size", 0))
                         image_url = largest.get("file_url")
                         if image_url:
-                            logger.info(f"Found Hubble image: {image_url}")
+                            logger.info("Found Hubble image: %s", image_url)
                             return image_url
         return None
     except Exception as e:
-        logger.error(f"Hubble Heritage search failed: {e}")
+        logger.error("Hubble Heritage search failed: %s", e)
         return None
 
 
@@ -328,11 +261,11 @@ def _generate_sdss_image(ra: Optional[float], dec: Optional[float]) -> Optional[
         url = base_url + "?" + "&".join(f"{k}={v}" for k, v in params.items())
         response = _make_request(url, timeout=120)
         if response and response.status_code == 200:
-            logger.info(f"Generated SDSS image for RA={ra}, Dec={dec}")
+            logger.info("Generated SDSS image for RA=%s, Dec=%s", ra, dec)
             return url
         return None
     except Exception as e:
-        logger.error(f"SDSS image generation failed: {e}")
+        logger.error("SDSS image generation failed: %s", e)
         return None
 
 
@@ -350,7 +283,7 @@ def _search_wikimedia_commons(object_name: str) -> Optional[str]:
             "srlimit": "5"
         }
         
-        logger.info(f"Searching Wikimedia Commons for {search_term}")
+        logger.info("Searching Wikimedia Commons for %s", search_term)
         response = _make_request(url, params=params, timeout=120)
 
         if response is None:
@@ -380,11 +313,11 @@ def _search_wikimedia_commons(object_name: str) -> Optional[str]:
                     if imageinfo and len(imageinfo) > 0:
                         image_url = imageinfo[0].get("url")
                         if image_url:
-                            logger.info(f"Found Wikimedia image: {image_url}")
+                            logger.info("Found Wikimedia image: %s", image_url)
                             return image_url
         return None
     except Exception as e:
-        logger.error(f"Wikimedia Commons search failed: {e}")
+        logger.error("Wikimedia Commons search failed: %s", e)
         return None
 
 
@@ -399,7 +332,7 @@ def get_object_image(
     if cached is not None:
         return cached
 
-    logger.info(f"Searching for image of {object_name}")
+    logger.info("Searching for image of %s", object_name)
 
     image_url = _search_hubble_heritage(object_name)
     if image_url:
@@ -417,7 +350,8 @@ def get_object_image(
         _set_to_cache(cache_key, image_url)
         return image_url
 
-    logger.warning(f"Using fallback image for {object_name}")
+    logger.warning("Using fallback image for %s", object_name)
+    metrics.FALLBACKS.labels(kind="starfield_image").inc()
     _set_to_cache(cache_key, FALLBACK_IMAGE_URL)
     return FALLBACK_IMAGE_URL
 
@@ -466,23 +400,23 @@ def score_celestial_object(
 
     if is_special_event:
         score += SCORING_WEIGHTS["special_event"]
-        logger.info(f"{object_name}: +{SCORING_WEIGHTS['special_event']} (special event)")
+        logger.debug("%s: +%s (special event)", object_name, SCORING_WEIGHTS['special_event'])
 
     if object_type.lower() == "planet" or object_name.capitalize() in ICONIC_PLANETS:
         score += SCORING_WEIGHTS["planet_bonus"]
-        logger.info(f"{object_name}: +{SCORING_WEIGHTS['planet_bonus']} (planet)")
+        logger.debug("%s: +%s (planet)", object_name, SCORING_WEIGHTS['planet_bonus'])
 
     if object_name.capitalize() in ICONIC_PLANETS:
         score += SCORING_WEIGHTS["iconic_bonus"]
-        logger.info(f"{object_name}: +{SCORING_WEIGHTS['iconic_bonus']} (iconic)")
+        logger.debug("%s: +%s (iconic)", object_name, SCORING_WEIGHTS['iconic_bonus'])
 
     if not _is_recently_shown(object_name):
         score += SCORING_WEIGHTS["novelty"]
-        logger.info(f"{object_name}: +{SCORING_WEIGHTS['novelty']} (novel)")
+        logger.debug("%s: +%s (novel)", object_name, SCORING_WEIGHTS['novelty'])
     else:
-        logger.info(f"{object_name}: Recently shown, no novelty bonus")
+        logger.debug("%s: Recently shown, no novelty bonus", object_name)
 
-    logger.info(f"{object_name} total score: {score}")
+    log_sampled(logger, logging.DEBUG, "score.total", "%s total score: %s", object_name, score)
     return score
 
 
@@ -492,7 +426,7 @@ def select_best_object(
     date: Optional[str] = None
 ) -> Optional[Dict[str, Any]]:
     """Select the best celestial object to feature tonight."""
-    logger.info(f"Selecting best object for lat={latitude}, lon={longitude}, date={date}")
+    logger.info("Selecting best object for lat=%s, lon=%s, date=%s", latitude, longitude, date)
 
     planets = get_visible_planets(latitude, longitude, date)
     if not planets:
@@ -524,7 +458,7 @@ def select_best_object(
 
     if scored_objects:
         best_object = scored_objects[0]
-        logger.info(f"Selected: {best_object['name']} (score: {best_object['score']})")
+        logger.info("Selected: %s (score: %s)", best_object['name'], best_object['score'])
         _mark_as_shown(best_object["name"])
         return best_object
 
@@ -535,6 +469,7 @@ def select_best_object(
 # MAIN ORCHESTRATION
 # ============================================================================
 
+@timing.timed()
 def get_tonight_story_data(
     latitude: Optional[float] = None,
     longitude: Optional[float] = None,
@@ -551,11 +486,11 @@ def get_tonight_story_data(
             logger.error("Could not determine user location")
             return None
     else:
-        location = {"latitude": latitude, "longitude": longitude, "city": "Unknown"}
-        for city_name, (lat, lon) in CITIES.items():
-            if abs(lat - latitude) < 0.1 and abs(lon - longitude) < 0.1:
-                location["city"] = city_name
-                break
+        location = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "city": location_index.describe_coordinates(latitude, longitude)
+        }
 
     best_object = select_best_object(latitude, longitude, date)
     if not best_object:
@@ -575,7 +510,7 @@ def get_tonight_story_data(
         "date": date or datetime.now().strftime("%Y-%m-%d")
     }
 
-    logger.info(f"Story data compiled for {best_object['name']}")
+    logger.info("Story data compiled for %s", best_object['name'])
     return story_data
 
 
@@ -16,6 +16,17 @@ load_dotenv(override=True)
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 ARCSECOND_API_KEY = os.getenv("ARCSECOND_API_KEY", "")
+
+# Arcsecond object metadata (src/metadata_service.py): found objects are
+# cached for a day, unknown ones for an hour, failed lookups for a minute
+METADATA_TIMEOUT = float(os.getenv("METADATA_TIMEOUT", "10"))
+# Whole shared lookup (probes + retries); callers wait at most their own deadline
+METADATA_LOOKUP_BUDGET = float(os.getenv("METADATA_LOOKUP_BUDGET", "15"))
+METADATA_CACHE_TTL = int(os.getenv("METADATA_CACHE_TTL", "86400"))
+METADATA_NEGATIVE_TTL = int(os.getenv("METADATA_NEGATIVE_TTL", "3600"))
+METADATA_ERROR_TTL = int(os.getenv("METADATA_ERROR_TTL", "60"))
+METADATA_CACHE_MAX_ENTRIES = int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "2048"))
+
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
 SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY", "")
@@ -401,8 +412,118 @@ CITIES: Dict[str, tuple[float, float]] = {
     "Papeete, French Polynesia": (-17.5334, -149.5671),
 }
 
-# Free geolocation API (no auth needed)
+# Other-language and common names for cities above (alias -> CITIES key).
+# Matching is case- and accent-insensitive, so "Paris"/"París" need no entry
+CITY_ALIASES: Dict[str, str] = {
+    # Italian
+    "Londra": "London, UK",
+    "Parigi": "Paris, France",
+    "Nuova York": "New York, USA",
+    "Berlino": "Berlin, Germany",
+    "Monaco di Baviera": "Munich, Germany",
+    "Amburgo": "Hamburg, Germany",
+    "Francoforte": "Frankfurt, Germany",
+    "Colonia": "Cologne, Germany",
+    "Marsiglia": "Marseille, France",
+    "Nizza": "Nice, France",
+    "Lione": "Lyon, France",
+    "Siviglia": "Sevilla, España",
+    "Lisbona": "Lisbon, Portugal",
+    "Atene": "Athens, Greece",
+    "Varsavia": "Warsaw, Poland",
+    "Cracovia": "Kraków, Poland",
+    "Stoccolma": "Stockholm, Sweden",
+    "Copenaghen": "Copenhagen, Denmark",
+    "Dublino": "Dublin, Ireland",
+    "Edimburgo": "Edinburgh, UK",
+    "Il Cairo": "Cairo, Egypt",
+    "Pechino": "Beijing, China",
+    "Città del Messico": "Mexico City, Mexico",
+    # French
+    "Londres": "London, UK",
+    "Venise": "Venice, Italy",
+    "Gênes": "Genova, Italia",
+    "Vienne": "Vienna, Austria",
+    "Francfort": "Frankfurt, Germany",
+    "Lisbonne": "Lisbon, Portugal",
+    "Athènes": "Athens, Greece",
+    "Varsovie": "Warsaw, Poland",
+    "Copenhague": "Copenhagen, Denmark",
+    "Édimbourg": "Edinburgh, UK",
+    "Séville": "Sevilla, España",
+    "Le Caire": "Cairo, Egypt",
+    "Pékin": "Beijing, China",
+    "La Nouvelle-Orléans": "New Orleans, USA",
+    # Spanish
+    "Nueva York": "New York, USA",
+    "Milán": "Milan, Italy",
+    "Nápoles": "Naples, Italy",
+    "Florencia": "Florence, Italy",
+    "Venecia": "Venice, Italy",
+    "Turín": "Turin, Italy",
+    "Marsella": "Marseille, France",
+    "Niza": "Nice, France",
+    "Múnich": "Munich, Germany",
+    "Viena": "Vienna, Austria",
+    "Lisboa": "Lisbon, Portugal",
+    "Atenas": "Athens, Greece",
+    "Praga": "Prague, Czech Republic",
+    "Estocolmo": "Stockholm, Sweden",
+    "El Cairo": "Cairo, Egypt",
+    "Tokio": "Tokyo, Japan",
+    "Ciudad de México": "Mexico City, Mexico",
+    "Nueva Orleans": "New Orleans, USA",
+    # English and local names
+    "New York City": "New York, USA",
+    "NYC": "New York, USA",
+    "Seville": "Sevilla, España",
+    "Genoa": "Genova, Italia",
+    "München": "Munich, Germany",
+    "Köln": "Cologne, Germany",
+    "Wien": "Vienna, Austria",
+    "Praha": "Prague, Czech Republic",
+    "Warszawa": "Warsaw, Poland",
+    "København": "Copenhagen, Denmark",
+    "Göteborg": "Gothenburg, Sweden",
+    "Peking": "Beijing, China",
+    "Saigon": "Ho Chi Minh City, Vietnam",
+    "Bombay": "Mumbai, India",
+    "Calcutta": "Kolkata, India",
+    "Madras": "Chennai, India",
+    "Bengaluru": "Bangalore, India",
+    "Marrakech": "Marrakesh, Morocco",
+    "Washington D.C.": "Washington DC, USA",
+}
+
+# Free geolocation API (no auth needed). Without a client IP this locates
+# the caller of the API, i.e. the server; GEOLOC_IP_API_URL takes the IP
 GEOLOC_API_URL = "https://ipapi.co/json/"
+GEOLOC_IP_API_URL = "https://ipapi.co/{ip}/json/"
+
+# IP geolocation providers, tried in order: "ipdb" (local IP-range CSV at
+# GEOIP_DB_PATH, e.g. DB-IP "IP to City Lite") and "ipapi" (network call)
+GEOLOCATION_PROVIDERS = os.getenv("GEOLOCATION_PROVIDERS", "ipdb,ipapi")
+GEOIP_DB_PATH = os.getenv("GEOIP_DB_PATH", "")
+GEOLOCATION_TIMEOUT = float(os.getenv("GEOLOCATION_TIMEOUT", "3"))
+
+# Results are cached per network prefix (users behind one /24 share a city);
+# failed lookups are cached briefly so an outage is not hammered
+GEOLOCATION_CACHE_TTL = int(os.getenv("GEOLOCATION_CACHE_TTL", "21600"))
+GEOLOCATION_ERROR_TTL = int(os.getenv("GEOLOCATION_ERROR_TTL", "60"))
+GEOLOCATION_CACHE_MAX_ENTRIES = int(os.getenv("GEOLOCATION_CACHE_MAX_ENTRIES", "10000"))
+GEOLOCATION_PREFIX_V4 = int(os.getenv("GEOLOCATION_PREFIX_V4", "24"))
+GEOLOCATION_PREFIX_V6 = int(os.getenv("GEOLOCATION_PREFIX_V6", "48"))
+
+# Take the client IP from X-Forwarded-For instead of the socket peer. Enable
+# only behind a proxy that appends to the header (e.g. Hugging Face Spaces);
+# the client IP is the entry GEOLOCATION_TRUSTED_PROXY_HOPS from the right
+# (1 = the one appended by the proxy nearest the app)
+GEOLOCATION_TRUST_FORWARDED_FOR = os.getenv("GEOLOCATION_TRUST_FORWARDED_FOR", "false").lower() == "true"
+GEOLOCATION_TRUSTED_PROXY_HOPS = max(1, int(os.getenv("GEOLOCATION_TRUSTED_PROXY_HOPS", "1")))
+
+# Optional offline gazetteer (SQLite, built with `python -m src.gazetteer build`)
+# consulted for places missing from CITIES; empty = curated table only
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", "")
 
 # ============================================================================
 # CONTENT SAFETY
@@ -585,6 +706,119 @@ IMPORTANT:
 - Perfect for bedtime
 """
 
+# Generate every supported language in one Gemini call, so switching the UI
+# language after the first story is instant (opt-in: longer first response)
+MULTI_LANGUAGE_STORIES = os.getenv("MULTI_LANGUAGE_STORIES", "false").lower() == "true"
+
+# Same story in several languages, one marked section per language
+MULTI_LANGUAGE_STORY_PROMPT_TEMPLATE = """
+You are a gentle storyteller creating a bedtime story for young children about a celestial object they can see tonight.
+
+CELESTIAL OBJECT: {object_name}
+TYPE: {object_type}
+VISIBLE FROM: {location}
+SCIENTIFIC FACTS: {scientific_facts}
+
+TARGET LANGUAGES: {languages}
+CRITICAL: Write the SAME story once in EACH target language. Each version must be
+entirely in its language - every word, every title, everything.
+
+STORY STRUCTURE (for every version):
+
+1. OPENING (2-3 sentences)
+   - A child looking at the night sky
+   - The celestial object begins to speak or appears magical
+
+2. MAIN STORY (3-5 paragraphs)
+   - The celestial object shares its story
+   - Weave in 1-2 scientific facts poetically
+   - Express themes: beauty of nature, connection, dreams, patience, wonder
+
+3. CLOSING (1-2 sentences)
+   - Reassuring promise: "I'll be here tomorrow night"
+
+4. HAIKU (3 lines)
+   - Title the section "Goodnight Haiku" (translated)
+   - Italian: 5-7-5 syllables ±1
+   - Other languages: short-long-short rhythm
+
+STYLE:
+- Simple, poetic language for ages 2-8
+- Calm, warm, loving tone
+- NO fear, violence, sadness, or scary elements
+- Readable in 60-90 seconds
+
+FORMAT: start each version with a marker line holding its language code, exactly like this:
+
+=== LANGUAGE: en ===
+# [Beautiful Story Title]
+
+[Story text flowing naturally, without section headers]
+
+### [Goodnight Haiku Title]
+[haiku line 1]
+[haiku line 2]
+[haiku line 3]
+
+Write nothing before the first marker and nothing after the last haiku.
+"""
+
+# Concurrent story generations per process (async, no thread per story)
+STORY_CONCURRENCY_LIMIT = int(os.getenv("STORY_CONCURRENCY_LIMIT", "200"))
+
+# Time budget of one story request (src/deadline.py): every upstream call
+# uses min(its own timeout, time left) and stages fall back when it runs out.
+# Object selection gets at most SELECT_CELESTIAL_BUDGET of it, so the story
+# and image stages always have time left
+STORY_DEADLINE_SECONDS = float(os.getenv("STORY_DEADLINE_SECONDS", "45"))
+SELECT_CELESTIAL_BUDGET = float(os.getenv("SELECT_CELESTIAL_BUDGET", "15"))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "60"))
+
+# Gradio queue sizing (measure with: python -m benchmarks.bench_queue).
+# The queue runs at most GRADIO_MAX_THREADS events at once across all
+# handlers, so the default leaves room for STORY_CONCURRENCY_LIMIT stories
+# plus the sync handlers. Those share one concurrency group limited to
+# QUEUE_DEFAULT_CONCURRENCY_LIMIT (gradio_queue.SYNC_HANDLERS), so no more
+# than that many threads of the GRADIO_MAX_THREADS-sized pool are ever busy.
+QUEUE_DEFAULT_CONCURRENCY_LIMIT = int(os.getenv("QUEUE_DEFAULT_CONCURRENCY_LIMIT", "10"))
+GRADIO_MAX_THREADS = int(os.getenv(
+    "GRADIO_MAX_THREADS", str(STORY_CONCURRENCY_LIMIT + QUEUE_DEFAULT_CONCURRENCY_LIMIT)
+))
+QUEUE_MAX_SIZE = int(os.getenv("QUEUE_MAX_SIZE", "0")) or None  # 0 = unbounded
+
+# Connection pool of the shared async HTTP client (all concurrent stories)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "200"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "50"))
+
+# Send upstream requests for a host to another base URL instead, e.g.
+# "api.visibleplanets.dev=http://127.0.0.1:9001" (offline benchmarks)
+UPSTREAM_HOST_OVERRIDES = os.getenv("UPSTREAM_HOST_OVERRIDES", "")
+
+# Upstream retries (src/retry.py): attempts per request including the first,
+# exponential backoff with full jitter, capped at RETRY_BACKOFF_MAX seconds.
+# A Retry-After longer than RETRY_AFTER_MAX gives up instead of waiting
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BACKOFF_BASE = float(os.getenv("RETRY_BACKOFF_BASE", "0.25"))
+RETRY_BACKOFF_MAX = float(os.getenv("RETRY_BACKOFF_MAX", "4"))
+RETRY_AFTER_MAX = float(os.getenv("RETRY_AFTER_MAX", "10"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Retry budget shared by all hosts: retries may add at most RETRY_BUDGET_RATIO
+# of the request volume (plus RETRY_BUDGET_MIN_PER_SECOND when traffic is
+# low), so an upstream outage is not multiplied by RETRY_MAX_ATTEMPTS
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.1"))
+RETRY_BUDGET_MIN_PER_SECOND = float(os.getenv("RETRY_BUDGET_MIN_PER_SECOND", "1"))
+
+# Per-host overrides of the defaults above (RetryPolicy field -> value)
+RETRY_POLICIES = {
+    # Geolocation is a fallback: one attempt, never worth a wait
+    "ipapi.co": {"max_attempts": 1},
+    # DEMO_KEY answers 429 for the rest of the hour: do not retry it
+    "api.nasa.gov": {"retry_statuses": (500, 502, 503, 504)},
+    # Slow cutout service: one retry on timeouts/5xx is plenty
+    "skyserver.sdss.org": {"max_attempts": 2},
+}
+
 # Haiku syllable ranges (flexible for non-Italian)
 HAIKU_SYLLABLE_RULES = {
     "it": {"line1": (4, 6), "line2": (6, 8), "line3": (4, 6)},  # Strict 5-7-5 ±1
@@ -767,6 +1001,37 @@ POETIC_ERROR_MESSAGES = {
     }
 }
 
+# ============================================================================
+# LOGGING
+# ============================================================================
+
+# Root level and output format ("text" or "json")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+
+# Per-module overrides, e.g. "src.astronomy_api=DEBUG,httpx=WARNING"
+# (httpx logs every request at INFO)
+LOG_MODULE_LEVELS = os.getenv("LOG_MODULE_LEVELS", "httpx=WARNING")
+
+# High-frequency events (cache lookups, scoring) log 1 in N occurrences
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "100"))
+
+# ============================================================================
+# PROFILING
+# ============================================================================
+
+# Profile 1 in N story requests (0 = off, 1 = every request)
+PROFILE_SAMPLE_EVERY = int(os.getenv("PROFILE_SAMPLE_EVERY", "0"))
+
+# Request header that profiles one request when set to 1/true, e.g.
+# "X-Zen-Profile" (empty = header ignored; only enable where clients are trusted)
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "")
+
+# Where collapsed stacks and their JSON sidecars are written, and how often
+# stacks are sampled
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
 # ============================================================================
 # VALIDATION
 # ============================================================================
@@ -0,0 +1,102 @@
+"""
+Deadline - Time budget shared by every upstream call of one story request
+Created once per story flow and passed down explicitly, so each call uses
+min(its own timeout, the time left) and each stage can fall back when the
+budget is gone instead of adding its full timeout to the request.
+"""
+
+import asyncio
+import math
+import time
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget ran out before a call could start or finish."""
+
+
+class Deadline:
+    """
+    Absolute point in time (monotonic clock) a request must finish by.
+
+    Deadline(None) never expires, so callers can pass one unconditionally.
+
+    Example:
+        >>> deadline = Deadline.after(45)
+        >>> http_client.get(url, timeout=deadline.timeout(120))
+    """
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, expires_at: Optional[float]):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: Optional[float]) -> "Deadline":
+        """Deadline seconds from now (None or <= 0: no deadline)."""
+        return cls(time.monotonic() + seconds if seconds and seconds > 0 else None)
+
+    def remaining(self) -> float:
+        """Seconds left (inf without a deadline, never negative)."""
+        if self.expires_at is None:
+            return math.inf
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        """
+        Raises:
+            DeadlineExceeded: If no time is left
+        """
+        if self.expired:
+            raise DeadlineExceeded("Request deadline exceeded")
+
+    def timeout(self, default: float) -> float:
+        """
+        Timeout for one call: min(default, time left).
+
+        Raises:
+            DeadlineExceeded: If no time is left
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("Request deadline exceeded")
+        return min(default, remaining)
+
+    def child(self, seconds: Optional[float]) -> "Deadline":
+        """Sub-budget for one stage: at most seconds, never past this deadline."""
+        if not seconds or seconds <= 0:
+            return self
+        expires_at = time.monotonic() + seconds
+        if self.expires_at is not None:
+            expires_at = min(expires_at, self.expires_at)
+        return Deadline(expires_at)
+
+    async def wait_for(self, awaitable: Awaitable[T], default: float = math.inf) -> T:
+        """
+        Await within min(default, time left).
+
+        Raises:
+            DeadlineExceeded: If the budget runs out first (the awaitable is cancelled)
+        """
+        try:
+            timeout = self.timeout(default)
+        except DeadlineExceeded:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()  # Never started: avoid a "never awaited" warning
+            raise
+        try:
+            return await asyncio.wait_for(awaitable, None if math.isinf(timeout) else timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Request deadline exceeded") from None
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.2f}s)"
+
+
+NO_DEADLINE = Deadline(None)
@@ -0,0 +1,91 @@
+"""
+Fact Store - Immutable, import-time index of celestial object facts
+Loads src/data/facts.json once and serves O(1) lookups keyed by
+(normalized object name, language)
+"""
+
+import json
+import logging
+import os
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FACTS_PATH = os.path.join(os.path.dirname(__file__), "data", "facts.json")
+
+# Key used in the data file for facts that apply to any object
+DEFAULT_KEY = "default"
+
+
+def normalize_name(object_name: str) -> str:
+    """Normalize an object name for index lookups ("  JUPITER " -> "jupiter")."""
+    return object_name.strip().casefold()
+
+
+def _load_facts(path: str) -> Tuple[Mapping, Mapping, Mapping]:
+    """
+    Read the facts data file and build the read-only indexes.
+
+    Returns:
+        (fun_facts, scientific_facts, alternative_names) where fun_facts is keyed
+        by (normalized name, language) and the others by normalized name
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    fun_facts = {
+        (normalize_name(object_name), language): tuple(facts)
+        for object_name, facts_by_language in data["fun_facts"].items()
+        for language, facts in facts_by_language.items()
+    }
+    scientific_facts = {
+        normalize_name(object_name): fact
+        for object_name, fact in data["scientific_facts"].items()
+    }
+    alternative_names = {
+        normalize_name(object_name): tuple(names)
+        for object_name, names in data["alternative_names"].items()
+    }
+
+    logger.info(
+        "Loaded fact store v%s: %s fun fact sets, %s scientific facts",
+        data.get("version"), len(fun_facts), len(scientific_facts)
+    )
+    return (
+        MappingProxyType(fun_facts),
+        MappingProxyType(scientific_facts),
+        MappingProxyType(alternative_names),
+    )
+
+
+_FUN_FACTS, _SCIENTIFIC_FACTS, _ALTERNATIVE_NAMES = _load_facts(FACTS_PATH)
+
+
+def get_fun_facts(object_name: str, language: str = "en") -> Tuple[str, ...]:
+    """
+    Get child-friendly "Did You Know?" facts for an object.
+
+    Falls back to the object's English facts, then to the generic facts.
+
+    Args:
+        object_name: Name of celestial object (case-insensitive)
+        language: Language code ("en", "it", "fr", "es")
+
+    Returns:
+        Tuple of facts (shared, do not mutate)
+    """
+    key = normalize_name(object_name)
+    if (key, "en") not in _FUN_FACTS:
+        key = DEFAULT_KEY
+    return _FUN_FACTS.get((key, language)) or _FUN_FACTS[(key, "en")]
+
+
+def get_scientific_facts(object_name: str) -> Optional[str]:
+    """Get the one-line scientific summary for an object, if known."""
+    return _SCIENTIFIC_FACTS.get(normalize_name(object_name))
+
+
+def get_alternative_names(object_name: str) -> Optional[Tuple[str, ...]]:
+    """Get alternative image-search names for an object, if known."""
+    return _ALTERNATIVE_NAMES.get(normalize_name(object_name))
@@ -0,0 +1,309 @@
+"""
+Gazetteer - Large offline place index in SQLite
+Looks up places (name, alternate names, population, coordinates) in a
+read-only SQLite file built from a GeoNames dump, so locations beyond the
+curated CITIES table resolve without ipapi.co. Nothing is loaded at import:
+queries go through the file's B-tree indexes, so import time and memory do
+not grow with the gazetteer.
+
+Build (GeoNames cities15000.txt / cities500.txt / allCountries.txt):
+    python -m src.gazetteer build cities15000.txt --countries countryInfo.txt \\
+        --output gazetteer.sqlite
+Then set GAZETTEER_PATH=gazetteer.sqlite.
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src import config
+from src.location_index import LocationMatch, normalize
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = "1"
+
+# Prefix matches need this many characters ("san" would sort thousands of rows)
+MIN_PREFIX_LENGTH = 4
+
+# Candidates fetched per name before filtering by a ", country" qualifier
+CANDIDATES_PER_NAME = 20
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE places (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    admin1 TEXT NOT NULL DEFAULT '',
+    admin1_code TEXT NOT NULL DEFAULT '',
+    country_code TEXT NOT NULL DEFAULT '',
+    country TEXT NOT NULL DEFAULT '',
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    population INTEGER NOT NULL DEFAULT 0
+);
+-- Normalized name/alternate name -> place, clustered by key so exact and
+-- prefix lookups are B-tree range scans
+CREATE TABLE names (
+    key TEXT NOT NULL,
+    population INTEGER NOT NULL,
+    place_id INTEGER NOT NULL,
+    PRIMARY KEY (key, population, place_id)
+) WITHOUT ROWID;
+"""
+
+# ============================================================================
+# LOOKUPS
+# ============================================================================
+
+_local = threading.local()
+_missing_logged = False
+
+
+def _connection() -> Optional[sqlite3.Connection]:
+    """This thread's read-only connection to GAZETTEER_PATH (None if unset or missing)."""
+    global _missing_logged
+    path = config.GAZETTEER_PATH
+    if not path:
+        return None
+    connection = getattr(_local, "connection", None)
+    if connection is not None and _local.path == path:
+        return connection
+    if not os.path.exists(path):
+        if not _missing_logged:
+            logger.warning("Gazetteer not found at %s; using the curated city table only", path)
+            _missing_logged = True
+        return None
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    _local.connection, _local.path = connection, path
+    return connection
+
+
+def _next_key(key: str) -> str:
+    """Smallest string greater than every string starting with key."""
+    return key[:-1] + chr(ord(key[-1]) + 1)
+
+
+def _qualifies(row: Tuple, qualifier: str) -> bool:
+    """Does a ", country/region" qualifier match the place's country or region (name or code)?"""
+    _, _, admin1, admin1_code, country_code, country, _, _ = row
+    return (
+        qualifier in (country_code.casefold(), admin1_code.casefold())
+        or any(value and value.startswith(qualifier) for value in (normalize(country), normalize(admin1)))
+    )
+
+
+def _to_match(row: Tuple, kind: str, score: float) -> LocationMatch:
+    _, name, admin1, _, country_code, country, latitude, longitude = row
+    display = ", ".join(part for part in (name, admin1 if admin1 != name else "", country or country_code) if part)
+    return LocationMatch(display, latitude, longitude, kind, round(score, 3))
+
+
+def search(text: str, limit: int = 5) -> List[LocationMatch]:
+    """
+    Ranked gazetteer places for free-text input like "Springfield, Illinois".
+
+    Exact name (or alternate name) matches come first, most populous first;
+    with no exact match, names starting with the input are used. A ", ..."
+    qualifier narrows the result to places in that country or region.
+
+    Args:
+        text: User input
+        limit: Maximum number of candidates
+
+    Returns:
+        Up to limit LocationMatch (empty if the gazetteer is not configured)
+    """
+    connection = _connection()
+    if connection is None:
+        return []
+    name_part, _, qualifier = text.partition(",")
+    key = normalize(name_part)
+    qualifier = normalize(qualifier)
+    if not key:
+        return []
+
+    select = (
+        "SELECT p.id, p.name, p.admin1, p.admin1_code, p.country_code, p.country, p.latitude, p.longitude "
+        "FROM names n JOIN places p ON p.id = n.place_id "
+    )
+    rows = connection.execute(
+        select + "WHERE n.key = ? ORDER BY n.population DESC LIMIT ?", (key, CANDIDATES_PER_NAME)
+    ).fetchall()
+    kind, score = "gazetteer", 0.9
+    if not rows and len(key) >= MIN_PREFIX_LENGTH:
+        rows = connection.execute(
+            select + "WHERE n.key >= ? AND n.key < ? ORDER BY n.population DESC LIMIT ?",
+            (key, _next_key(key), CANDIDATES_PER_NAME)
+        ).fetchall()
+        kind, score = "gazetteer-prefix", 0.6
+
+    if qualifier:
+        # A place with the right name in the wrong country is worse than no match
+        rows = [row for row in rows if _qualifies(row, qualifier)]
+
+    matches, seen = [], set()
+    for row in rows:
+        if row[0] not in seen:
+            seen.add(row[0])
+            matches.append(_to_match(row, kind, score))
+            if len(matches) >= limit:
+                break
+    return matches
+
+
+def best_match(text: str) -> Optional[LocationMatch]:
+    """Best gazetteer place for text, or None."""
+    matches = search(text, limit=1)
+    return matches[0] if matches else None
+
+
+# ============================================================================
+# BUILDER
+# ============================================================================
+
+# GeoNames main table columns (tab-separated, no header)
+_GEONAMES_COLUMNS = {
+    "name": 1, "asciiname": 2, "alternatenames": 3, "latitude": 4, "longitude": 5,
+    "feature_class": 6, "country_code": 8, "admin1": 10, "population": 14,
+}
+
+
+def _read_countries(path: Optional[str]) -> Dict[str, str]:
+    """ISO code -> country name from GeoNames countryInfo.txt."""
+    if not path:
+        return {}
+    countries = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.rstrip("\n").split("\t")
+            countries[fields[0]] = fields[4]
+    return countries
+
+
+def _read_admin1(path: Optional[str]) -> Dict[str, str]:
+    """"CC.code" -> region name from GeoNames admin1CodesASCII.txt."""
+    if not path:
+        return {}
+    regions = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) > 1:
+                regions[fields[0]] = fields[1]
+    return regions
+
+
+def _iter_geonames(path: str, min_population: int) -> Iterable[List[str]]:
+    """Populated places (feature class P) from a GeoNames dump."""
+    c = _GEONAMES_COLUMNS
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) <= c["population"] or fields[c["feature_class"]] != "P":
+                continue
+            if int(fields[c["population"]] or 0) >= min_population:
+                yield fields
+
+
+def build_gazetteer(
+    source_path: str,
+    output_path: str,
+    countries_path: Optional[str] = None,
+    admin1_path: Optional[str] = None,
+    min_population: int = 0,
+    alternate_names: bool = True
+) -> int:
+    """
+    Build the SQLite gazetteer from a GeoNames dump.
+
+    Writes to a temporary file and renames it into place, so running
+    processes keep reading the previous file until they reopen it.
+
+    Args:
+        source_path: GeoNames table (e.g. cities15000.txt)
+        output_path: SQLite file to write
+        countries_path: Optional countryInfo.txt for country names
+        admin1_path: Optional admin1CodesASCII.txt for region names
+        min_population: Skip smaller places
+        alternate_names: Index alternate names (larger file, multilingual matches)
+
+    Returns:
+        Number of places written
+    """
+    c = _GEONAMES_COLUMNS
+    countries = _read_countries(countries_path)
+    regions = _read_admin1(admin1_path)
+    temp_path = f"{output_path}.tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    connection = sqlite3.connect(temp_path)
+    try:
+        connection.executescript(SCHEMA)
+        count = 0
+        for fields in _iter_geonames(source_path, min_population):
+            country_code = fields[c["country_code"]]
+            population = int(fields[c["population"]] or 0)
+            cursor = connection.execute(
+                "INSERT INTO places (name, admin1, admin1_code, country_code, country, latitude, longitude, "
+                "population) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (fields[c["name"]], regions.get(f"{country_code}.{fields[c['admin1']]}", ""), fields[c["admin1"]],
+                 country_code, countries.get(country_code, ""), float(fields[c["latitude"]]),
+                 float(fields[c["longitude"]]), population)
+            )
+            names = {fields[c["name"]], fields[c["asciiname"]]}
+            if alternate_names and fields[c["alternatenames"]]:
+                names.update(fields[c["alternatenames"]].split(","))
+            keys = {normalize(name) for name in names}
+            connection.executemany(
+                "INSERT OR IGNORE INTO names (key, population, place_id) VALUES (?, ?, ?)",
+                [(key, population, cursor.lastrowid) for key in keys if len(key) > 1]
+            )
+            count += 1
+
+        connection.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+            ("schema_version", SCHEMA_VERSION),
+            ("source", os.path.basename(source_path)),
+            ("places", str(count)),
+        ])
+        connection.commit()
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+
+    os.replace(temp_path, output_path)
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline gazetteer tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Build the SQLite gazetteer from a GeoNames dump")
+    build.add_argument("source", help="GeoNames table, e.g. cities15000.txt")
+    build.add_argument("--output", default=config.GAZETTEER_PATH or "gazetteer.sqlite")
+    build.add_argument("--countries", help="GeoNames countryInfo.txt (country names)")
+    build.add_argument("--admin1", help="GeoNames admin1CodesASCII.txt (region names)")
+    build.add_argument("--min-population", type=int, default=0)
+    build.add_argument("--no-alternate-names", action="store_true", help="Index main names only")
+    lookup = commands.add_parser("lookup", help="Query the gazetteer at GAZETTEER_PATH")
+    lookup.add_argument("text")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_gazetteer(args.source, args.output, args.countries, args.admin1,
+                                args.min_population, not args.no_alternate_names)
+        print(f"Wrote {count} places to {args.output}", file=sys.stderr)
+    else:
+        for match in search(args.text):
+            print(match)
+
+
+if __name__ == "__main__":
+    main()
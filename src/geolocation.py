@@ -0,0 +1,358 @@
+"""
+Geolocation - Client IP geolocation with pluggable providers and caching
+Locates the user (not the server) from the client IP of the Gradio request,
+trying providers in order (a local IP-range database, then ipapi.co) and
+caching results per network prefix, so the fallback usually costs a dict
+lookup and no network call.
+"""
+
+import asyncio
+import bisect
+import csv
+import ipaddress
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src import config
+from src import http_client
+from src import location_index
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+IpAddress = Any  # ipaddress.IPv4Address | ipaddress.IPv6Address
+
+
+# ============================================================================
+# RESULTS
+# ============================================================================
+
+def location_result(data: Dict, source: str) -> Dict[str, Any]:
+    """
+    Build the geolocation result from a provider's fields.
+
+    Args:
+        data: latitude, longitude and optionally city, country_name /
+            country_code and timezone (ipapi.co field names)
+        source: Provider name, for logs and metrics
+
+    Returns:
+        Result dict (error=False, or a geolocation_error if coordinates are missing)
+    """
+    latitude = data.get("latitude")
+    longitude = data.get("longitude")
+
+    if latitude is None or longitude is None:
+        return geolocation_error("Could not determine coordinates")
+
+    city = data.get("city")
+    country = data.get("country_name", data.get("country_code"))
+    return {
+        "error": False,
+        "latitude": latitude,
+        "longitude": longitude,
+        "city": city or "Unknown",
+        "country": country or "Unknown",
+        # Providers often omit the city: name the point after the nearest known place
+        "display_name": (
+            f"{city}, {country}" if city and country
+            else location_index.describe_coordinates(latitude, longitude)
+        ),
+        "timezone": data.get("timezone"),
+        "source": source,
+    }
+
+
+def geolocation_error(message: str) -> Dict[str, Any]:
+    return {
+        "error": True,
+        "message": message,
+        "latitude": None,
+        "longitude": None,
+        "city": None,
+        "country": None
+    }
+
+
+# ============================================================================
+# PROVIDERS
+# ============================================================================
+
+class GeolocationProvider(ABC):
+    """
+    Source of IP locations. Subclasses implement locate (and override alocate
+    when they do I/O); both return provider fields for location_result, or None.
+    """
+
+    name = "provider"
+
+    @abstractmethod
+    def locate(self, ip: Optional[IpAddress]) -> Optional[Dict]:
+        """Provider fields for ip, or None if unknown (ip is None when the client address is unknown)."""
+
+    async def alocate(self, ip: Optional[IpAddress]) -> Optional[Dict]:
+        return self.locate(ip)
+
+
+class IpRangeDatabase(GeolocationProvider):
+    """
+    Local IP-range database: sorted range starts searched with bisect.
+
+    Reads a CSV with rows start,end,continent,country,region,city,latitude,
+    longitude (DB-IP "IP to City Lite" layout; start/end may be addresses or
+    integers). The file is loaded on first use, not at import; alocate loads
+    it in a worker thread so the pipeline loop never parses the CSV.
+    """
+
+    name = "ipdb"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        # Per IP version: range starts, range ends, record index per range
+        self._ranges: Dict[int, Tuple[Any, Any, array]] = {}
+        self._records: List[Dict] = []
+
+    def _load(self) -> None:
+        with self._load_lock:
+            if self._loaded:
+                return
+            rows: Dict[int, List[Tuple[int, int, int]]] = {4: [], 6: []}
+            record_ids: Dict[Tuple, int] = {}  # Many ranges share a city: store it once
+            with open(self.path, newline="", encoding="utf-8") as f:
+                for row in csv.reader(f):
+                    try:
+                        start, end = _parse_ip(row[0]), _parse_ip(row[1])
+                        record = (row[3], row[4], row[5], float(row[6]), float(row[7]))
+                    except (ValueError, IndexError):
+                        continue  # Header or malformed row
+                    record_id = record_ids.setdefault(record, len(record_ids))
+                    rows[start.version].append((int(start), int(end), record_id))
+
+            self._records = [
+                {"country_code": country, "region": region, "city": city, "latitude": lat, "longitude": lon}
+                for country, region, city, lat, lon in record_ids
+            ]
+            for version, ranges in rows.items():
+                ranges.sort()
+                # IPv4 fits in fixed-width arrays; IPv6 needs Python ints
+                container = (lambda values: array("L", values)) if version == 4 else list
+                self._ranges[version] = (
+                    container(start for start, _, _ in ranges),
+                    container(end for _, end, _ in ranges),
+                    array("L", (record_id for _, _, record_id in ranges)),
+                )
+            self._loaded = True
+            logger.info("Loaded %d IP ranges (%d locations) from %s",
+                        sum(len(r) for r in rows.values()), len(self._records), self.path)
+
+    def locate(self, ip: Optional[IpAddress]) -> Optional[Dict]:
+        if ip is None:
+            return None
+        if not self._loaded:
+            self._load()
+        starts, ends, record_ids = self._ranges[ip.version]
+        value = int(ip)
+        i = bisect.bisect_right(starts, value) - 1
+        if i >= 0 and value <= ends[i]:
+            return self._records[record_ids[i]]
+        return None
+
+    async def alocate(self, ip: Optional[IpAddress]) -> Optional[Dict]:
+        if ip is not None and not self._loaded:
+            await asyncio.to_thread(self._load)
+        return self.locate(ip)  # Loaded: a bisect, microseconds
+
+
+class IpapiProvider(GeolocationProvider):
+    """ipapi.co over the shared HTTP clients: one attempt, bounded by GEOLOCATION_TIMEOUT."""
+
+    name = "ipapi"
+
+    def _url(self, ip: Optional[IpAddress]) -> str:
+        return config.GEOLOC_IP_API_URL.format(ip=ip) if ip is not None else config.GEOLOC_API_URL
+
+    @staticmethod
+    def _fields(data: Dict) -> Optional[Dict]:
+        # ipapi.co answers 200 with {"error": true, "reason": ...} for reserved IPs and rate limits
+        if data.get("error"):
+            logger.warning("ipapi.co refused lookup: %s", data.get("reason"))
+            return None
+        return data
+
+    def locate(self, ip: Optional[IpAddress]) -> Optional[Dict]:
+        response = http_client.get(self._url(ip), timeout=config.GEOLOCATION_TIMEOUT)
+        response.raise_for_status()
+        return self._fields(response.json())
+
+    async def alocate(self, ip: Optional[IpAddress]) -> Optional[Dict]:
+        response = await http_client.aget(self._url(ip), timeout=config.GEOLOCATION_TIMEOUT)
+        return self._fields(response.json())
+
+
+def _parse_ip(value: str) -> IpAddress:
+    value = value.strip()
+    return ipaddress.ip_address(int(value) if value.isdigit() else value)
+
+
+_providers: Optional[List[GeolocationProvider]] = None
+
+
+def get_providers() -> List[GeolocationProvider]:
+    """Providers from config.GEOLOCATION_PROVIDERS, in order (built once)."""
+    global _providers
+    if _providers is None:
+        providers: List[GeolocationProvider] = []
+        for name in (item.strip() for item in config.GEOLOCATION_PROVIDERS.split(",")):
+            if name == "ipdb" and config.GEOIP_DB_PATH:
+                providers.append(IpRangeDatabase(config.GEOIP_DB_PATH))
+            elif name == "ipapi":
+                providers.append(IpapiProvider())
+        _providers = providers
+    return _providers
+
+
+def set_providers(providers: Optional[List[GeolocationProvider]]) -> None:
+    """Replace the provider chain (None = rebuild from config) and clear the cache."""
+    global _providers
+    _providers = providers
+    clear_cache()
+
+
+# ============================================================================
+# CLIENT IP
+# ============================================================================
+
+def _public_ip(value: str) -> Optional[IpAddress]:
+    try:
+        ip = ipaddress.ip_address(value.strip())
+    except ValueError:
+        return None
+    return ip if ip.is_global else None
+
+
+def client_ip(request: Any) -> Optional[str]:
+    """
+    Public IP of the client behind a gr.Request (or any object with
+    .headers and .client.host), or None for local/private clients.
+    """
+    if request is None:
+        return None
+    if config.GEOLOCATION_TRUST_FORWARDED_FOR:
+        # Only the entries appended by our own proxies can be trusted: the
+        # client controls everything to their left
+        headers = getattr(request, "headers", None) or {}
+        hops = [hop for hop in (headers.get("x-forwarded-for") or "").split(",") if hop.strip()]
+        if len(hops) >= config.GEOLOCATION_TRUSTED_PROXY_HOPS:
+            ip = _public_ip(hops[-config.GEOLOCATION_TRUSTED_PROXY_HOPS])
+            if ip is not None:
+                return str(ip)
+    client = getattr(request, "client", None)
+    host = getattr(client, "host", None)
+    ip = _public_ip(host) if host else None
+    return str(ip) if ip is not None else None
+
+
+# ============================================================================
+# CACHED LOOKUP
+# ============================================================================
+
+_cache: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_key(ip: Optional[IpAddress]) -> str:
+    """Network prefix shared by nearby clients ("server" without a client IP)."""
+    if ip is None:
+        return "server"
+    prefix = config.GEOLOCATION_PREFIX_V4 if ip.version == 4 else config.GEOLOCATION_PREFIX_V6
+    return str(ipaddress.ip_network(f"{ip}/{prefix}", strict=False))
+
+
+def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            _cache.move_to_end(key)
+            result = "hit"
+        else:
+            if entry is not None:
+                del _cache[key]
+            entry = None
+            result = "miss"
+    metrics.CACHE_REQUESTS.labels(namespace="geolocation", result=result).inc()
+    return entry[0] if entry else None
+
+
+def _cache_set(key: str, value: Dict[str, Any]) -> None:
+    ttl = config.GEOLOCATION_ERROR_TTL if value["error"] else config.GEOLOCATION_CACHE_TTL
+    with _cache_lock:
+        _cache[key] = (value, time.monotonic() + ttl)
+        _cache.move_to_end(key)
+        while len(_cache) > config.GEOLOCATION_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def _prepare(ip: Optional[str]) -> Tuple[Optional[IpAddress], str]:
+    address = _public_ip(ip) if ip else None
+    return address, _cache_key(address)
+
+
+def locate(ip: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Locate a client IP (None or a private IP: the server's own location).
+
+    Returns:
+        location_result dict, or geolocation_error if every provider failed
+    """
+    address, key = _prepare(ip)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    result = geolocation_error("Geolocation service unavailable")
+    for provider in get_providers():
+        try:
+            data = provider.locate(address)
+        except Exception as e:
+            logger.warning("Geolocation provider %s failed: %s", provider.name, e)
+            result = geolocation_error(str(e))
+            continue
+        if data:
+            result = location_result(data, provider.name)
+            if not result["error"]:
+                break
+    _cache_set(key, result)
+    return result
+
+
+async def locate_async(ip: Optional[str] = None) -> Dict[str, Any]:
+    """Async version of locate (network providers use the shared async client)."""
+    address, key = _prepare(ip)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    result = geolocation_error("Geolocation service unavailable")
+    for provider in get_providers():
+        try:
+            data = await provider.alocate(address)
+        except Exception as e:
+            logger.warning("Geolocation provider %s failed: %s", provider.name, e)
+            result = geolocation_error(str(e))
+            continue
+        if data:
+            result = location_result(data, provider.name)
+            if not result["error"]:
+                break
+    _cache_set(key, result)
+    return result
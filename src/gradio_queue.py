@@ -0,0 +1,32 @@
+"""
+Gradio Queue - Shared queue setup for the app and MCP server entry points
+Applies the configured sizing (GRADIO_MAX_THREADS, QUEUE_DEFAULT_CONCURRENCY_LIMIT,
+QUEUE_MAX_SIZE) so both servers and the queue load test run the same queue
+"""
+
+import logging
+
+import gradio as gr
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+# Concurrency group of every sync (thread-holding) UI handler: together they
+# run at most QUEUE_DEFAULT_CONCURRENCY_LIMIT events, so raising
+# GRADIO_MAX_THREADS for async stories does not grow the busy thread count
+SYNC_HANDLERS = "sync_handlers"
+
+
+def enable_queue(demo: gr.Blocks) -> gr.Blocks:
+    """Enable the Gradio queue with the configured sizing (config.GRADIO_MAX_THREADS, QUEUE_*)."""
+    # queue() sizes its worker slots from max_threads, so set it first
+    demo.max_threads = config.GRADIO_MAX_THREADS
+    reachable = config.GRADIO_MAX_THREADS - config.QUEUE_DEFAULT_CONCURRENCY_LIMIT
+    if reachable < config.STORY_CONCURRENCY_LIMIT:
+        logger.warning("GRADIO_MAX_THREADS=%s leaves room for %s concurrent stories, not STORY_CONCURRENCY_LIMIT=%s",
+                       config.GRADIO_MAX_THREADS, max(reachable, 0), config.STORY_CONCURRENCY_LIMIT)
+    return demo.queue(
+        default_concurrency_limit=config.QUEUE_DEFAULT_CONCURRENCY_LIMIT,
+        max_size=config.QUEUE_MAX_SIZE
+    )
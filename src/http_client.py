@@ -0,0 +1,313 @@
+"""
+HTTP Client - Shared HTTP clients and event loop for upstream APIs
+All async upstream I/O (astronomy APIs, image APIs, Gemini) runs on one
+dedicated event loop, so pooled connections are reused across requests and
+clients bound to a loop never see a different one. Sync callers use a shared
+requests session. Both record per-host latency and outcome metrics, retry
+GETs per src/retry.py, and honour per-host overrides (used to point
+upstreams at local stand-ins).
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Coroutine, Dict, Iterator, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
+import requests
+
+from src import config
+from src import metrics
+from src import retry
+from src.deadline import Deadline, NO_DEADLINE
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+USER_AGENT = "Zen-IT-Story/1.0 (bedtime astronomy stories)"
+
+# ============================================================================
+# PIPELINE EVENT LOOP
+# ============================================================================
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the pipeline event loop, starting its thread on first use."""
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="pipeline-loop", daemon=True)
+            thread.start()
+            _loop, _loop_thread = loop, thread
+            logger.info("Started pipeline event loop")
+        return _loop
+
+
+def get_loop_thread_id() -> int:
+    """Thread ident of the pipeline loop (starting it if needed)."""
+    get_loop()
+    return _loop_thread.ident
+
+
+def _submit(coro: Coroutine[Any, Any, T], context: Optional[contextvars.Context]):
+    """Schedule coro on the pipeline loop; its task copies context (default: the caller's)."""
+    if context is None:
+        return asyncio.run_coroutine_threadsafe(coro, get_loop())
+    return context.run(asyncio.run_coroutine_threadsafe, coro, get_loop())
+
+
+async def run_on_loop(coro: Coroutine[Any, Any, T], context: Optional[contextvars.Context] = None) -> T:
+    """Await a coroutine on the pipeline loop from any other event loop."""
+    loop = get_loop()
+    if asyncio.get_running_loop() is loop and context is None:
+        return await coro
+    return await asyncio.wrap_future(_submit(coro, context))
+
+
+def run_sync(coro: Coroutine[Any, Any, T], context: Optional[contextvars.Context] = None) -> T:
+    """Run a coroutine on the pipeline loop and block until it finishes."""
+    return _submit(coro, context).result()
+
+
+async def iterate_on_loop(
+    agen: AsyncIterator[T],
+    context: Optional[contextvars.Context] = None
+) -> AsyncIterator[T]:
+    """
+    Drive an async generator on the pipeline loop, yielding into the caller's loop.
+
+    Every step runs as its own task, so context variables set inside the
+    generator do not carry over between steps; pass context to give every
+    step the same starting context instead of the caller's current one.
+    """
+    try:
+        while True:
+            try:
+                yield await run_on_loop(agen.__anext__(), context)
+            except StopAsyncIteration:
+                break
+    finally:
+        await run_on_loop(agen.aclose(), context)
+
+
+def iterate_sync(agen: AsyncIterator[T], context: Optional[contextvars.Context] = None) -> Iterator[T]:
+    """Drive an async generator on the pipeline loop from synchronous code (see iterate_on_loop)."""
+    try:
+        while True:
+            try:
+                yield run_sync(agen.__anext__(), context)
+            except StopAsyncIteration:
+                break
+    finally:
+        run_sync(agen.aclose(), context)
+
+
+# ============================================================================
+# HOST OVERRIDES
+# ============================================================================
+
+def parse_host_overrides(spec: str) -> Dict[str, str]:
+    """Parse "host=base_url,host2=base_url2" into a dict."""
+    overrides = {}
+    for item in spec.split(","):
+        host, _, base_url = item.partition("=")
+        if host.strip() and base_url.strip():
+            overrides[host.strip()] = base_url.strip().rstrip("/")
+    return overrides
+
+
+_host_overrides: Dict[str, str] = parse_host_overrides(config.UPSTREAM_HOST_OVERRIDES)
+
+
+def set_host_overrides(overrides: Dict[str, str]) -> Dict[str, str]:
+    """Replace the host overrides and return the previous ones (empty = real upstreams)."""
+    global _host_overrides
+    previous = _host_overrides
+    _host_overrides = {host: base_url.rstrip("/") for host, base_url in overrides.items()}
+    return previous
+
+
+def resolve_url(url: str) -> str:
+    """Rewrite url to its host override, keeping path and query."""
+    if not _host_overrides:
+        return url
+    parts = urlsplit(url)
+    base_url = _host_overrides.get(parts.hostname or "")
+    if base_url is None:
+        return url
+    base = urlsplit(base_url)
+    return urlunsplit((base.scheme, base.netloc, base.path + parts.path, parts.query, parts.fragment))
+
+
+# ============================================================================
+# UPSTREAM METRICS
+# ============================================================================
+
+@contextmanager
+def _observe(url: str) -> Iterator[Dict[str, str]]:
+    """Record latency and outcome of one request to url's host."""
+    host = urlsplit(url).hostname or "unknown"
+    outcome = {"value": "ok"}
+    start = time.perf_counter()
+    try:
+        yield outcome
+    except (httpx.TimeoutException, requests.exceptions.Timeout):
+        outcome["value"] = "timeout"
+        raise
+    except (httpx.HTTPStatusError, requests.exceptions.HTTPError):
+        outcome["value"] = "http_error"
+        raise
+    except Exception:
+        outcome["value"] = "error"
+        raise
+    finally:
+        metrics.UPSTREAM_LATENCY.labels(host=host).observe(time.perf_counter() - start)
+        metrics.UPSTREAM_REQUESTS.labels(host=host, outcome=outcome["value"]).inc()
+
+
+# ============================================================================
+# SYNC HTTP CLIENT
+# ============================================================================
+
+_session = requests.Session()
+_session.headers["User-Agent"] = USER_AGENT
+
+
+def _failure(error: Exception) -> Tuple[Optional[str], Optional[int], Optional[str]]:
+    """Retry reason ("timeout", "error", "status" or None), status and Retry-After of a failed request."""
+    if isinstance(error, (httpx.TimeoutException, requests.exceptions.Timeout)):
+        return "timeout", None, None
+    if isinstance(error, (httpx.TransportError, requests.exceptions.ConnectionError)):
+        return "error", None, None
+    if isinstance(error, httpx.HTTPStatusError):
+        return "status", error.response.status_code, error.response.headers.get("Retry-After")
+    return None, None, None
+
+
+def get(
+    url: str,
+    params: Optional[Dict] = None,
+    headers: Optional[Dict] = None,
+    timeout: float = 30,
+    policy: Optional[retry.RetryPolicy] = None,
+    deadline: Deadline = NO_DEADLINE
+) -> requests.Response:
+    """
+    Drop-in for requests.get on the shared session (does not raise for HTTP errors).
+
+    Timeouts, connection errors and retryable statuses are retried per the
+    host's RetryPolicy (or policy), within the global retry budget. Each
+    attempt's timeout is capped by the deadline, and no retry starts that
+    could not finish before it.
+
+    Raises:
+        DeadlineExceeded: If the deadline has passed before the first attempt
+    """
+    host = urlsplit(url).hostname or "unknown"
+    policy = policy or retry.policy_for(host)
+    retry.BUDGET.deposit()
+    attempt = 1
+    while True:
+        try:
+            with _observe(url) as outcome:
+                response = _session.get(resolve_url(url), params=params, headers=headers,
+                                        timeout=deadline.timeout(timeout))
+                if response.status_code >= 400:
+                    outcome["value"] = "http_error"
+        except requests.exceptions.RequestException as e:
+            delay = retry.next_delay(policy, host, attempt, *_failure(e), remaining=deadline.remaining())
+            if delay is None:
+                raise
+        else:
+            if response.status_code < 400:
+                return response
+            delay = retry.next_delay(policy, host, attempt, "status", response.status_code,
+                                     response.headers.get("Retry-After"), remaining=deadline.remaining())
+            if delay is None:
+                return response
+            response.close()
+        time.sleep(delay)
+        attempt += 1
+
+
+def head(url: str, timeout: float = 2, deadline: Deadline = NO_DEADLINE) -> requests.Response:
+    """HEAD a URL on the shared session, following redirects."""
+    with _observe(url) as outcome:
+        response = _session.head(resolve_url(url), timeout=deadline.timeout(timeout), allow_redirects=True)
+        if response.status_code >= 400:
+            outcome["value"] = "http_error"
+        return response
+
+
+# ============================================================================
+# ASYNC HTTP CLIENT
+# ============================================================================
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Shared pooled client; must be used from the pipeline loop."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(
+                max_connections=config.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def aget(
+    url: str,
+    params: Optional[Dict] = None,
+    headers: Optional[Dict] = None,
+    timeout: float = 30,
+    policy: Optional[retry.RetryPolicy] = None,
+    deadline: Deadline = NO_DEADLINE
+) -> httpx.Response:
+    """
+    GET a URL and raise for HTTP error statuses (like requests + raise_for_status).
+
+    Retries like get() (within the deadline), waiting with asyncio.sleep so
+    the loop stays free.
+    """
+    host = urlsplit(url).hostname or "unknown"
+    policy = policy or retry.policy_for(host)
+    retry.BUDGET.deposit()
+    attempt = 1
+    while True:
+        try:
+            with _observe(url):
+                response = await get_async_client().get(resolve_url(url), params=params, headers=headers,
+                                                        timeout=deadline.timeout(timeout))
+                response.raise_for_status()
+                return response
+        except httpx.HTTPError as e:
+            delay = retry.next_delay(policy, host, attempt, *_failure(e), remaining=deadline.remaining())
+            if delay is None:
+                raise
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def ahead(url: str, timeout: float = 2, deadline: Deadline = NO_DEADLINE) -> httpx.Response:
+    """HEAD a URL, following redirects. Does not raise for HTTP error statuses."""
+    with _observe(url) as outcome:
+        response = await get_async_client().head(resolve_url(url), timeout=deadline.timeout(timeout))
+        if response.status_code >= 400:
+            outcome["value"] = "http_error"
+        return response
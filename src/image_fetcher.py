@@ -4,13 +4,15 @@ OPZIONE C+: Self-healing resilient fallback chain
 Curated (HEAD check) → NASA Images → Hubble → SDSS/SkyView → Wikimedia → APOD → Starfield
 """
 
-import requests
 import logging
 from typing import Optional, Dict
 from src import config
+from src import http_client
+from src import metrics
+from src import object_catalogue
+from src import timing
+from src.deadline import Deadline, DeadlineExceeded, NO_DEADLINE
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -91,7 +93,25 @@ STAR_IMAGE_MAPPING = {
 }
 
 
-def try_curated_star_image(object_name: str) -> Optional[Dict[str, str]]:
+# Curated entries by Hipparcos number, so any name the catalogue knows for a
+# star ("Alpha Lyrae", "HIP 91262") finds its curated image
+_CURATED_BY_HIP = {
+    identity.hip: object_name
+    for object_name, identity in ((name, object_catalogue.get_object(name)) for name in STAR_IMAGE_MAPPING)
+    if identity is not None and identity.hip is not None
+}
+
+
+def _curated_name(object_name: str) -> Optional[str]:
+    """STAR_IMAGE_MAPPING key for a star's name, alias, Bayer designation or "HIP n"."""
+    if object_name in STAR_IMAGE_MAPPING:
+        return object_name
+    identity = object_catalogue.get_object(object_name)
+    return _CURATED_BY_HIP.get(identity.hip) if identity is not None else None
+
+
+@timing.timed("image.curated")
+def try_curated_star_image(object_name: str, deadline: Deadline = NO_DEADLINE) -> Optional[Dict[str, str]]:
     """
     Try to get curated image from our mapping of common stars.
 
@@ -101,40 +121,47 @@ def try_curated_star_image(object_name: str) -> Optional[Dict[str, str]]:
     - If URL fails (403, timeout) → return None, fallback to NASA Images API
 
     Args:
-        object_name: Star name (e.g., "Vega", "Sirius")
+        object_name: Star name (e.g., "Vega", "Sirius"), alias, Bayer designation or "HIP n"
+        deadline: Request deadline (raises DeadlineExceeded once it has passed)
 
     Returns:
         Dict with image info if URL is accessible, None otherwise
     """
-    if object_name in STAR_IMAGE_MAPPING:
-        star_data = STAR_IMAGE_MAPPING[object_name]
-        url = star_data["url"]
-
+    deadline.check()
+    curated_name = _curated_name(object_name)
+    if curated_name:
         # OPZIONE C+: Quick HEAD check to verify URL is accessible
         try:
-            response = requests.head(url, timeout=2, allow_redirects=True)
-            if response.status_code == 200:
-                logger.info(f"✓ Using curated image for {object_name} (URL verified)")
-                return {
-                    "url": url,
-                    "source": "curated",
-                    "alt_text": star_data["alt_text"],
-                    "credit": star_data["credit"]
-                }
-            else:
-                logger.warning(f"✗ Curated URL for {object_name} returned {response.status_code}, trying fallback APIs")
-                return None
+            response = http_client.head(STAR_IMAGE_MAPPING[curated_name]["url"], timeout=2, deadline=deadline)
+            return _curated_result(curated_name, response.status_code)
         except Exception as e:
-            logger.warning(f"✗ Curated URL for {object_name} failed ({e}), trying fallback APIs")
+            logger.warning("✗ Curated URL for %s failed (%s), trying fallback APIs", object_name, e)
             return None
     return None
 
 
+def _curated_result(object_name: str, status_code: int) -> Optional[Dict[str, str]]:
+    """Curated image info if its HEAD check returned 200, None otherwise."""
+    star_data = STAR_IMAGE_MAPPING[object_name]
+    if status_code == 200:
+        logger.info("✓ Using curated image for %s (URL verified)", object_name)
+        return {
+            "url": star_data["url"],
+            "source": "curated",
+            "alt_text": star_data["alt_text"],
+            "credit": star_data["credit"]
+        }
+    logger.warning("✗ Curated URL for %s returned %s, trying fallback APIs", object_name, status_code)
+    return None
+
+
+@timing.timed("image_fetcher.fetch_image")
 def fetch_image(
     object_name: str,
     object_type: str = "star",
     ra: Optional[float] = None,
-    dec: Optional[float] = None
+    dec: Optional[float] = None,
+    deadline: Deadline = NO_DEADLINE
 ) -> Dict[str, str]:
     """
     Fetch astronomical image using self-healing fallback chain.
@@ -157,6 +184,7 @@ def fetch_image(
         object_type: Type ("planet", "star", "constellation", "nebula")
         ra: Right Ascension in degrees (optional, for SDSS/SkyView)
         dec: Declination in degrees (optional, for SDSS/SkyView)
+        deadline: Request deadline; once it passes the chain stops at the starfield
 
     Returns:
         Dict with keys:
@@ -165,56 +193,64 @@ def fetch_image(
             - alt_text: Alt text for image
             - credit: Image credit/attribution
     """
-    logger.info(f"Fetching image for {object_name} ({object_type})")
-
-    # PRIORITY 1: Try curated mapping (for common stars)
-    curated_result = try_curated_star_image(object_name)
-    if curated_result:
-        logger.info("✓ Image from curated star mapping")
-        return curated_result
-
-    # PRIORITY 2: NASA SkyView - Real astronomical images using coordinates
-    if ra is not None and dec is not None:
-        skyview_result = try_skyview(ra, dec, object_name)
-        if skyview_result:
-            logger.info("✓ Image from NASA SkyView")
-            return skyview_result
-
-    # PRIORITY 3: SDSS SkyServer - Real sky survey images using coordinates
-    if ra is not None and dec is not None:
-        sdss_result = try_sdss(ra, dec, object_name)
-        if sdss_result:
-            logger.info("✓ Image from SDSS SkyServer")
-            return sdss_result
-
-    # PRIORITY 4: Hubble Heritage (searches by name)
-    hubble_result = try_hubble(object_name)
-    if hubble_result:
-        logger.info("✓ Image from Hubble Heritage")
-        return hubble_result
-
-    # PRIORITY 5: NASA Images API - DISABLED (artistic/fake images)
-    # nasa_result = try_nasa_images(object_name)
-    # if nasa_result:
-    #     logger.info("✓ Image from NASA Images API")
-    #     return nasa_result
-
-    # PRIORITY 6: Try Wikimedia Commons (searches by name)
-    wikimedia_result = try_wikimedia(object_name)
-    if wikimedia_result:
-        logger.info("✓ Image from Wikimedia Commons")
-        return wikimedia_result
-
-    # PRIORITY 7: Try NASA APOD (MOVED HERE - last resort API)
-    # NOTE: This returns a random astronomy picture of the day,
-    # NOT necessarily related to the object. Only use as last resort.
-    apod_result = try_nasa_apod(object_name)
-    if apod_result:
-        logger.info("⚠️  Image from NASA APOD (may not match object)")
-        return apod_result
+    logger.info("Fetching image for %s (%s)", object_name, object_type)
+    try:
+        # PRIORITY 1: Try curated mapping (for common stars)
+        curated_result = try_curated_star_image(object_name, deadline)
+        if curated_result:
+            logger.info("✓ Image from curated star mapping")
+            return curated_result
+
+        # PRIORITY 2: NASA SkyView - Real astronomical images using coordinates
+        if ra is not None and dec is not None:
+            skyview_result = try_skyview(ra, dec, object_name, deadline)
+            if skyview_result:
+                logger.info("✓ Image from NASA SkyView")
+                return skyview_result
+
+        # PRIORITY 3: SDSS SkyServer - Real sky survey images using coordinates
+        if ra is not None and dec is not None:
+            sdss_result = try_sdss(ra, dec, object_name, deadline)
+            if sdss_result:
+                logger.info("✓ Image from SDSS SkyServer")
+                return sdss_result
+
+        # PRIORITY 4: Hubble Heritage (searches by name)
+        hubble_result = try_hubble(object_name, deadline)
+        if hubble_result:
+            logger.info("✓ Image from Hubble Heritage")
+            return hubble_result
+
+        # PRIORITY 5: NASA Images API - DISABLED (artistic/fake images)
+        # nasa_result = try_nasa_images(object_name)
+        # if nasa_result:
+        #     logger.info("✓ Image from NASA Images API")
+        #     return nasa_result
+
+        # PRIORITY 6: Try Wikimedia Commons (searches by name)
+        wikimedia_result = try_wikimedia(object_name, deadline)
+        if wikimedia_result:
+            logger.info("✓ Image from Wikimedia Commons")
+            return wikimedia_result
+
+        # PRIORITY 7: Try NASA APOD (MOVED HERE - last resort API)
+        # NOTE: This returns a random astronomy picture of the day,
+        # NOT necessarily related to the object. Only use as last resort.
+        apod_result = try_nasa_apod(object_name, deadline)
+        if apod_result:
+            logger.info("⚠️  Image from NASA APOD (may not match object)")
+            return apod_result
+    except DeadlineExceeded:
+        logger.warning("Deadline reached while fetching image for %s", object_name)
 
     # PRIORITY 8: Fallback to generic starfield
+    return _fallback_result(object_name)
+
+
+def _fallback_result(object_name: str) -> Dict[str, str]:
+    """Generic starfield image, used when every source failed."""
     logger.warning("All sources failed, using fallback starfield")
+    metrics.FALLBACKS.labels(kind="starfield_image").inc()
     return {
         "url": config.FALLBACK_IMAGE_URL,
         "source": "fallback",
@@ -223,16 +259,18 @@ def fetch_image(
     }
 
 
-def try_nasa_images(object_name: str) -> Optional[Dict[str, str]]:
+def try_nasa_images(object_name: str, deadline: Deadline = NO_DEADLINE) -> Optional[Dict[str, str]]:
     """
     Try to fetch image from NASA Images API (no authentication required!).
 
     Args:
         object_name: Object name to search
+        deadline: Request deadline (raises DeadlineExceeded once it has passed)
 
     Returns:
         Dict with image info if found, None otherwise
     """
+    deadline.check()
     try:
         url = "https://images-api.nasa.gov/search"
         params = {
@@ -240,7 +278,7 @@ def try_nasa_images(object_name: str) -> Optional[Dict[str, str]]:
             "media_type": "image"
         }
 
-        response = requests.get(url, params=params, timeout=120)
+        response = http_client.get(url, params=params, timeout=120, deadline=deadline)
         response.raise_for_status()
         data = response.json()
 
@@ -264,90 +302,106 @@ def try_nasa_images(object_name: str) -> Optional[Dict[str, str]]:
                         }
 
     except Exception as e:
-        logger.warning(f"NASA Images API failed: {e}")
+        logger.warning("NASA Images API failed: %s", e)
 
     return None
 
 
-def try_nasa_apod(object_name: str) -> Optional[Dict[str, str]]:
+APOD_URL = "https://api.nasa.gov/planetary/apod"
+APOD_PARAMS = {
+    "api_key": "DEMO_KEY",
+    "count": 1  # Get 1 random image
+}
+
+
+@timing.timed("image.nasa_apod")
+def try_nasa_apod(object_name: str, deadline: Deadline = NO_DEADLINE) -> Optional[Dict[str, str]]:
     """
     Try to fetch image from NASA APOD (Astronomy Picture of the Day).
     Uses DEMO_KEY (no signup required).
 
     Args:
         object_name: Object name (used in alt text)
+        deadline: Request deadline (raises DeadlineExceeded once it has passed)
 
     Returns:
         Dict with image info if successful, None otherwise
     """
+    deadline.check()
     try:
-        url = "https://api.nasa.gov/planetary/apod"
-        params = {
-            "api_key": "DEMO_KEY",
-            "count": 1  # Get 1 random image
-        }
-
-        response = requests.get(url, params=params, timeout=120)
+        response = http_client.get(APOD_URL, params=APOD_PARAMS, timeout=120, deadline=deadline)
         response.raise_for_status()
-        data = response.json()
+        return _apod_result(response.json(), object_name)
 
-        if data and len(data) > 0:
-            apod = data[0]
+    except Exception as e:
+        logger.warning("NASA APOD API failed: %s", e)
 
-            # Only use if it's an image (not video)
-            if apod.get("media_type") == "image":
-                return {
-                    "url": apod["url"],
-                    "source": "nasa_apod",
-                    "alt_text": apod.get("title", f"Astronomy picture related to {object_name}"),
-                    "credit": "NASA APOD"
-                }
+    return None
 
-    except Exception as e:
-        logger.warning(f"NASA APOD API failed: {e}")
 
+def _apod_result(data, object_name: str) -> Optional[Dict[str, str]]:
+    """Image info from an APOD response, None if it is a video or empty."""
+    if data and len(data) > 0:
+        apod = data[0]
+
+        # Only use if it's an image (not video)
+        if apod.get("media_type") == "image":
+            return {
+                "url": apod["url"],
+                "source": "nasa_apod",
+                "alt_text": apod.get("title", f"Astronomy picture related to {object_name}"),
+                "credit": "NASA APOD"
+            }
     return None
 
 
-def try_hubble(object_name: str) -> Optional[Dict[str, str]]:
+@timing.timed("image.hubble")
+def try_hubble(object_name: str, deadline: Deadline = NO_DEADLINE) -> Optional[Dict[str, str]]:
     """
     Try to fetch image from Hubble Heritage API.
 
     Args:
         object_name: Object name to search
+        deadline: Request deadline (raises DeadlineExceeded once it has passed)
 
     Returns:
         Dict with image info if found, None otherwise
     """
+    deadline.check()
     try:
         url = f"{config.IMAGE_SOURCES['hubble']}"
         params = {"name": object_name}
 
-        response = requests.get(url, params=params, timeout=120)
+        response = http_client.get(url, params=params, timeout=120, deadline=deadline)
         response.raise_for_status()
-        data = response.json()
+        return _hubble_result(response.json(), object_name)
 
-        # Check if we got results
-        if data and isinstance(data, list) and len(data) > 0:
-            # Get first result
-            image = data[0]
-            image_url = image.get("image_files", [{}])[0].get("file_url")
+    except Exception as e:
+        logger.warning("Hubble API failed: %s", e)
 
-            if image_url:
-                return {
-                    "url": image_url,
-                    "source": "hubble",
-                    "alt_text": image.get("description", f"{object_name} captured by Hubble Space Telescope"),
-                    "credit": "NASA/ESA Hubble Space Telescope"
-                }
+    return None
 
-    except Exception as e:
-        logger.warning(f"Hubble API failed: {e}")
 
+def _hubble_result(data, object_name: str) -> Optional[Dict[str, str]]:
+    """Image info from the first Hubble search result, if any."""
+    # Check if we got results
+    if data and isinstance(data, list) and len(data) > 0:
+        # Get first result
+        image = data[0]
+        image_url = image.get("image_files", [{}])[0].get("file_url")
+
+        if image_url:
+            return {
+                "url": image_url,
+                "source": "hubble",
+                "alt_text": image.get("description", f"{object_name} captured by Hubble Space Telescope"),
+                "credit": "NASA/ESA Hubble Space Telescope"
+            }
     return None
 
 
-def try_sdss(ra: float, dec: float, object_name: str) -> Optional[Dict[str, str]]:
+@timing.timed("image.sdss")
+def try_sdss(ra: float, dec: float, object_name: str, deadline: Deadline = NO_DEADLINE) -> Optional[Dict[str, str]]:
     """
     Try to fetch image from SDSS SkyServer.
 
@@ -355,42 +409,54 @@ def try_sdss(ra: float, dec: float, object_name: str) -> Optional[Dict[str, str]
         ra: Right Ascension in degrees
         dec: Declination in degrees
         object_name: Object name for alt text
+        deadline: Request deadline (raises DeadlineExceeded once it has passed)
 
     Returns:
         Dict with image info if successful, None otherwise
     """
+    deadline.check()
     try:
-        # SDSS Image Cutout Service
-        # Parameters: ra, dec, scale (arcsec/pixel), width, height
-        params = {
-            "ra": ra,
-            "dec": dec,
-            "scale": 0.2,  # 0.2 arcsec/pixel
-            "width": 512,
-            "height": 512,
-            "opt": "G"  # SDSS g-band (green/visual)
-        }
-
         url = config.IMAGE_SOURCES['sdss']
-        response = requests.get(url, params=params, timeout=120)
+        response = http_client.get(url, params=_sdss_params(ra, dec), timeout=120, deadline=deadline)
         response.raise_for_status()
-
-        # If we got an image (status 200 and content), return it
-        if response.headers.get('content-type', '').startswith('image/'):
-            return {
-                "url": response.url,
-                "source": "sdss",
-                "alt_text": f"Sky view of {object_name} region from SDSS",
-                "credit": "Sloan Digital Sky Survey (SDSS)"
-            }
+        return _sdss_result(response.headers, str(response.url), object_name)
 
     except Exception as e:
-        logger.warning(f"SDSS API failed: {e}")
+        logger.warning("SDSS API failed: %s", e)
+
+    return None
+
 
+def _sdss_params(ra: float, dec: float) -> Dict:
+    """SDSS Image Cutout Service parameters: ra, dec, scale (arcsec/pixel), width, height."""
+    return {
+        "ra": ra,
+        "dec": dec,
+        "scale": 0.2,  # 0.2 arcsec/pixel
+        "width": 512,
+        "height": 512,
+        "opt": "G"  # SDSS g-band (green/visual)
+    }
+
+
+def _sdss_result(headers, image_url: str, object_name: str) -> Optional[Dict[str, str]]:
+    """Image info if the SDSS response is an image (status 200 and content)."""
+    if headers.get('content-type', '').startswith('image/'):
+        return {
+            "url": image_url,
+            "source": "sdss",
+            "alt_text": f"Sky view of {object_name} region from SDSS",
+            "credit": "Sloan Digital Sky Survey (SDSS)"
+        }
     return None
 
 
-def try_arcsecond(ra: float, dec: float, object_name: str) -> Optional[Dict[str, str]]:
+def try_arcsecond(
+    ra: float,
+    dec: float,
+    object_name: str,
+    deadline: Deadline = NO_DEADLINE
+) -> Optional[Dict[str, str]]:
     """
     Try to fetch image from Arcsecond.io API.
 
@@ -398,10 +464,12 @@ def try_arcsecond(ra: float, dec: float, object_name: str) -> Optional[Dict[str,
         ra: Right Ascension in degrees
         dec: Declination in degrees
         object_name: Object name for alt text
+        deadline: Request deadline (raises DeadlineExceeded once it has passed)
 
     Returns:
         Dict with image info if successful, None otherwise
     """
+    deadline.check()
     try:
         # Arcsecond.io search by coordinates
         url = "https://api.arcsecond.io/exoplanets/"
@@ -411,7 +479,7 @@ def try_arcsecond(ra: float, dec: float, object_name: str) -> Optional[Dict[str,
             "radius": 1.0  # 1 degree search radius
         }
 
-        response = requests.get(url, params=params, timeout=120)
+        response = http_client.get(url, params=params, timeout=120, deadline=deadline)
         response.raise_for_status()
         data = response.json()
 
@@ -432,12 +500,13 @@ def try_arcsecond(ra: float, dec: float, object_name: str) -> Optional[Dict[str,
                     }
 
     except Exception as e:
-        logger.warning(f"Arcsecond.io API failed: {e}")
+        logger.warning("Arcsecond.io API failed: %s", e)
 
     return None
 
 
-def try_skyview(ra: float, dec: float, object_name: str) -> Optional[Dict[str, str]]:
+@timing.timed("image.skyview")
+def try_skyview(ra: float, dec: float, object_name: str, deadline: Deadline = NO_DEADLINE) -> Optional[Dict[str, str]]:
     """
     Try to fetch image from NASA SkyView Virtual Observatory.
     Very reliable source with multiple surveys.
@@ -446,10 +515,12 @@ def try_skyview(ra: float, dec: float, object_name: str) -> Optional[Dict[str, s
         ra: Right Ascension in degrees
         dec: Declination in degrees
         object_name: Object name for alt text
+        deadline: Request deadline (raises DeadlineExceeded once it has passed)
 
     Returns:
         Dict with image info if successful, None otherwise
     """
+    deadline.check()
     try:
         # NASA SkyView image cutout service
         # Using DSS (Digitized Sky Survey) - most reliable
@@ -465,98 +536,118 @@ def try_skyview(ra: float, dec: float, object_name: str) -> Optional[Dict[str, s
 
         # Actually, SkyView returns FITS files which need processing
         # Better approach: use SkyView's quicklook feature
-        quicklook_url = f"https://skyview.gsfc.nasa.gov/current/cgi/pskcall?Position={ra},{dec}&Survey=DSS&Pixels=512&Return=GIF"
+        quicklook_url = _skyview_quicklook_url(ra, dec)
 
-        response = requests.get(quicklook_url, timeout=120)
+        response = http_client.get(quicklook_url, timeout=120, deadline=deadline)
         response.raise_for_status()
-
-        # If we got an image (GIF), return the URL
-        if response.headers.get('content-type', '').startswith('image/'):
-            return {
-                "url": quicklook_url,
-                "source": "skyview",
-                "alt_text": f"Sky view of {object_name} region from NASA SkyView",
-                "credit": "NASA SkyView Virtual Observatory (DSS)"
-            }
+        return _skyview_result(response.headers, quicklook_url, object_name)
 
     except Exception as e:
-        logger.warning(f"NASA SkyView API failed: {e}")
+        logger.warning("NASA SkyView API failed: %s", e)
 
     return None
 
 
-def try_wikimedia(object_name: str) -> Optional[Dict[str, str]]:
+def _skyview_quicklook_url(ra: float, dec: float) -> str:
+    """SkyView quicklook GIF URL for a DSS cutout centred on (ra, dec)."""
+    return f"https://skyview.gsfc.nasa.gov/current/cgi/pskcall?Position={ra},{dec}&Survey=DSS&Pixels=512&Return=GIF"
+
+
+def _skyview_result(headers, quicklook_url: str, object_name: str) -> Optional[Dict[str, str]]:
+    """Image info if the SkyView response is an image (GIF)."""
+    if headers.get('content-type', '').startswith('image/'):
+        return {
+            "url": quicklook_url,
+            "source": "skyview",
+            "alt_text": f"Sky view of {object_name} region from NASA SkyView",
+            "credit": "NASA SkyView Virtual Observatory (DSS)"
+        }
+    return None
+
+
+@timing.timed("image.wikimedia")
+def try_wikimedia(object_name: str, deadline: Deadline = NO_DEADLINE) -> Optional[Dict[str, str]]:
     """
     Try to fetch image from Wikimedia Commons.
 
     Args:
         object_name: Object name to search
+        deadline: Request deadline (raises DeadlineExceeded once it has passed)
 
     Returns:
         Dict with image info if found, None otherwise
     """
+    deadline.check()
     try:
-        # Wikimedia Commons API - search for images
-        search_query = f"{object_name} astronomy space telescope"
-        params = {
-            "action": "query",
-            "format": "json",
-            "list": "search",
-            "srsearch": search_query,
-            "srnamespace": 6,  # File namespace
-            "srlimit": 5
-        }
-
         url = config.IMAGE_SOURCES['wikimedia']
-        response = requests.get(url, params=params, timeout=120)
+        response = http_client.get(url, params=_wikimedia_search_params(object_name), timeout=120, deadline=deadline)
         response.raise_for_status()
-        data = response.json()
-
-        # Get search results
-        if "query" in data and "search" in data["query"]:
-            results = data["query"]["search"]
-
-            if results:
-                # Get first result that looks like an image
-                for result in results:
-                    title = result.get("title", "")
-
-                    # Get image info
-                    info_params = {
-                        "action": "query",
-                        "format": "json",
-                        "titles": title,
-                        "prop": "imageinfo",
-                        "iiprop": "url"
-                    }
 
-                    info_response = requests.get(url, params=info_params, timeout=120)
-                    info_response.raise_for_status()
-                    info_data = info_response.json()
-
-                    # Extract image URL
-                    pages = info_data.get("query", {}).get("pages", {})
-                    for page_id, page in pages.items():
-                        imageinfo = page.get("imageinfo", [])
-                        if imageinfo:
-                            image_url = imageinfo[0].get("url")
-                            if image_url:
-                                return {
-                                    "url": image_url,
-                                    "source": "wikimedia",
-                                    "alt_text": f"{object_name} - {title}",
-                                    "credit": "Wikimedia Commons"
-                                }
+        # Get first result that looks like an image
+        for title in _wikimedia_titles(response.json()):
+            info_response = http_client.get(url, params=_wikimedia_info_params(title), timeout=120, deadline=deadline)
+            info_response.raise_for_status()
+            result = _wikimedia_result(info_response.json(), object_name, title)
+            if result:
+                return result
 
     except Exception as e:
-        logger.warning(f"Wikimedia API failed: {e}")
+        logger.warning("Wikimedia API failed: %s", e)
+
+    return None
+
+
+def _wikimedia_search_params(object_name: str) -> Dict:
+    """Wikimedia Commons API - search for images in the File namespace."""
+    return {
+        "action": "query",
+        "format": "json",
+        "list": "search",
+        "srsearch": f"{object_name} astronomy space telescope",
+        "srnamespace": 6,  # File namespace
+        "srlimit": 5
+    }
 
+
+def _wikimedia_titles(data: Dict) -> list:
+    """File titles from a Wikimedia search response, best match first."""
+    if "query" in data and "search" in data["query"]:
+        return [result.get("title", "") for result in data["query"]["search"]]
+    return []
+
+
+def _wikimedia_info_params(title: str) -> Dict:
+    """Wikimedia Commons API - image info (URL) for one file title."""
+    return {
+        "action": "query",
+        "format": "json",
+        "titles": title,
+        "prop": "imageinfo",
+        "iiprop": "url"
+    }
+
+
+def _wikimedia_result(info_data: Dict, object_name: str, title: str) -> Optional[Dict[str, str]]:
+    """Image info from an imageinfo response, if it has a URL."""
+    pages = info_data.get("query", {}).get("pages", {})
+    for page in pages.values():
+        imageinfo = page.get("imageinfo", [])
+        if imageinfo:
+            image_url = imageinfo[0].get("url")
+            if image_url:
+                return {
+                    "url": image_url,
+                    "source": "wikimedia",
+                    "alt_text": f"{object_name} - {title}",
+                    "credit": "Wikimedia Commons"
+                }
     return None
 
 
 def get_image_for_object(
     object_name: str,
-    object_data: Optional[Dict] = None
+    object_data: Optional[Dict] = None,
+    deadline: Deadline = NO_DEADLINE
 ) -> Dict[str, str]:
     """
     Convenience function to fetch image with object data from MCP.
@@ -564,6 +655,7 @@ def get_image_for_object(
     Args:
         object_name: Name of celestial object
         object_data: Optional dict from select_celestial MCP tool
+        deadline: Request deadline (see fetch_image)
 
     Returns:
         Dict with image info
@@ -573,10 +665,176 @@ def get_image_for_object(
             object_name=object_data.get("object_name", object_name),
             object_type=object_data.get("type", "star"),
             ra=object_data.get("ra"),
-            dec=object_data.get("dec")
+            dec=object_data.get("dec"),
+            deadline=deadline
         )
     else:
-        return fetch_image(object_name, "star", None, None)
+        return fetch_image(object_name, "star", None, None, deadline)
+
+
+# ============================================================================
+# ASYNC VARIANTS (shared pipeline event loop, see src/http_client.py)
+# ============================================================================
+
+@timing.timed("image.curated")
+async def try_curated_star_image_async(object_name: str, deadline: Deadline = NO_DEADLINE) -> Optional[Dict[str, str]]:
+    """Async version of try_curated_star_image."""
+    deadline.check()
+    curated_name = _curated_name(object_name)
+    if curated_name:
+        try:
+            response = await http_client.ahead(STAR_IMAGE_MAPPING[curated_name]["url"], timeout=2, deadline=deadline)
+            return _curated_result(curated_name, response.status_code)
+        except Exception as e:
+            logger.warning("✗ Curated URL for %s failed (%s), trying fallback APIs", object_name, e)
+    return None
+
+
+@timing.timed("image.skyview")
+async def try_skyview_async(
+    ra: float,
+    dec: float,
+    object_name: str,
+    deadline: Deadline = NO_DEADLINE
+) -> Optional[Dict[str, str]]:
+    """Async version of try_skyview."""
+    deadline.check()
+    try:
+        quicklook_url = _skyview_quicklook_url(ra, dec)
+        response = await http_client.aget(quicklook_url, timeout=120, deadline=deadline)
+        return _skyview_result(response.headers, quicklook_url, object_name)
+    except Exception as e:
+        logger.warning("NASA SkyView API failed: %s", e)
+    return None
+
+
+@timing.timed("image.sdss")
+async def try_sdss_async(
+    ra: float,
+    dec: float,
+    object_name: str,
+    deadline: Deadline = NO_DEADLINE
+) -> Optional[Dict[str, str]]:
+    """Async version of try_sdss."""
+    deadline.check()
+    try:
+        response = await http_client.aget(config.IMAGE_SOURCES['sdss'], params=_sdss_params(ra, dec), timeout=120,
+                                          deadline=deadline)
+        return _sdss_result(response.headers, str(response.url), object_name)
+    except Exception as e:
+        logger.warning("SDSS API failed: %s", e)
+    return None
+
+
+@timing.timed("image.hubble")
+async def try_hubble_async(object_name: str, deadline: Deadline = NO_DEADLINE) -> Optional[Dict[str, str]]:
+    """Async version of try_hubble."""
+    deadline.check()
+    try:
+        response = await http_client.aget(config.IMAGE_SOURCES['hubble'], params={"name": object_name}, timeout=120,
+                                          deadline=deadline)
+        return _hubble_result(response.json(), object_name)
+    except Exception as e:
+        logger.warning("Hubble API failed: %s", e)
+    return None
+
+
+@timing.timed("image.wikimedia")
+async def try_wikimedia_async(object_name: str, deadline: Deadline = NO_DEADLINE) -> Optional[Dict[str, str]]:
+    """Async version of try_wikimedia."""
+    deadline.check()
+    try:
+        url = config.IMAGE_SOURCES['wikimedia']
+        response = await http_client.aget(url, params=_wikimedia_search_params(object_name), timeout=120,
+                                          deadline=deadline)
+        for title in _wikimedia_titles(response.json()):
+            info_response = await http_client.aget(url, params=_wikimedia_info_params(title), timeout=120,
+                                                   deadline=deadline)
+            result = _wikimedia_result(info_response.json(), object_name, title)
+            if result:
+                return result
+    except Exception as e:
+        logger.warning("Wikimedia API failed: %s", e)
+    return None
+
+
+@timing.timed("image.nasa_apod")
+async def try_nasa_apod_async(object_name: str, deadline: Deadline = NO_DEADLINE) -> Optional[Dict[str, str]]:
+    """Async version of try_nasa_apod."""
+    deadline.check()
+    try:
+        response = await http_client.aget(APOD_URL, params=APOD_PARAMS, timeout=120, deadline=deadline)
+        return _apod_result(response.json(), object_name)
+    except Exception as e:
+        logger.warning("NASA APOD API failed: %s", e)
+    return None
+
+
+@timing.timed("image_fetcher.fetch_image")
+async def fetch_image_async(
+    object_name: str,
+    object_type: str = "star",
+    ra: Optional[float] = None,
+    dec: Optional[float] = None,
+    deadline: Deadline = NO_DEADLINE
+) -> Dict[str, str]:
+    """
+    Async version of fetch_image: same fallback chain, same result shape,
+    but waiting on upstream APIs does not hold a thread.
+    """
+    logger.info("Fetching image for %s (%s)", object_name, object_type)
+    try:
+        curated_result = await try_curated_star_image_async(object_name, deadline)
+        if curated_result:
+            logger.info("✓ Image from curated star mapping")
+            return curated_result
+
+        if ra is not None and dec is not None:
+            skyview_result = await try_skyview_async(ra, dec, object_name, deadline)
+            if skyview_result:
+                logger.info("✓ Image from NASA SkyView")
+                return skyview_result
+
+            sdss_result = await try_sdss_async(ra, dec, object_name, deadline)
+            if sdss_result:
+                logger.info("✓ Image from SDSS SkyServer")
+                return sdss_result
+
+        hubble_result = await try_hubble_async(object_name, deadline)
+        if hubble_result:
+            logger.info("✓ Image from Hubble Heritage")
+            return hubble_result
+
+        wikimedia_result = await try_wikimedia_async(object_name, deadline)
+        if wikimedia_result:
+            logger.info("✓ Image from Wikimedia Commons")
+            return wikimedia_result
+
+        apod_result = await try_nasa_apod_async(object_name, deadline)
+        if apod_result:
+            logger.info("⚠️  Image from NASA APOD (may not match object)")
+            return apod_result
+    except DeadlineExceeded:
+        logger.warning("Deadline reached while fetching image for %s", object_name)
+
+    return _fallback_result(object_name)
+
+
+async def get_image_for_object_async(
+    object_name: str,
+    object_data: Optional[Dict] = None,
+    deadline: Deadline = NO_DEADLINE
+) -> Dict[str, str]:
+    """Async version of get_image_for_object."""
+    if object_data:
+        return await fetch_image_async(
+            object_name=object_data.get("object_name", object_name),
+            object_type=object_data.get("type", "star"),
+            ra=object_data.get("ra"),
+            dec=object_data.get("dec"),
+            deadline=deadline
+        )
+    return await fetch_image_async(object_name, "star", None, None, deadline)
 
 
 # ============================================================================
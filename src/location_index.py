@@ -0,0 +1,339 @@
+"""
+Location Index - Import-time index of known places for location parsing
+Normalized (casefolded, accent-stripped) names, a city-part and alias map, a
+sorted prefix index, a SymSpell-style deletion index for typos and a KD-tree
+for reverse lookups, built once from config.CITIES and config.CITY_ALIASES so
+parse_location_input resolves free text with dictionary lookups and a binary
+search instead of scans, and coordinates get a display name
+"""
+
+import bisect
+import re
+import unicodedata
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from src.config import CITIES, CITY_ALIASES
+from src.spatial_index import SphereKDTree
+
+# Shortest input used for prefix matches ("ro" would match half the table)
+MIN_PREFIX_LENGTH = 3
+
+# Typo tolerance: at most MAX_EDIT_DISTANCE edits, and one edit per 4
+# characters of input ("rma" is not corrected, "pariss" and "nueva yrok" are)
+MAX_EDIT_DISTANCE = 2
+CHARS_PER_EDIT = 4
+
+# Typo matches below this confidence (1 - edits / length) are dropped, so
+# "Atlantis" is not read as "Atlanta" (two edits over eight characters)
+MIN_FUZZY_CONFIDENCE = 0.8
+
+# Deletions are indexed for this many leading characters only, so index size
+# per key is bounded however long names get (SymSpell's prefix length)
+FUZZY_PREFIX_LENGTH = 7
+
+# Reverse lookups: within NEAR_CITY_KM a point is named after the city,
+# within NEARBY_CITY_KM "Near <city>", beyond that by its coordinates
+NEAR_CITY_KM = 25
+NEARBY_CITY_KM = 300
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+class LocationMatch(NamedTuple):
+    """One candidate place for a location query."""
+    name: str          # Canonical name, e.g. "Rome, Italy"
+    latitude: float
+    longitude: float
+    kind: str          # "exact", "city", "contains", "prefix" or "fuzzy"
+    score: float       # 0-1 confidence, higher is better
+
+
+class NearbyPlace(NamedTuple):
+    """A place near a point, with its great-circle distance."""
+    name: str
+    latitude: float
+    longitude: float
+    distance_km: float
+
+
+def normalize(text: str) -> str:
+    """
+    Normalize a place name for index lookups.
+
+    Casefolds, strips accents and collapses punctuation and whitespace,
+    e.g. "  São Paulo,Brazil " -> "sao paulo brazil".
+    """
+    if not text.isascii():
+        decomposed = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(_NON_WORD.sub(" ", text.casefold()).split())
+
+
+def _word_suffixes(key: str) -> Iterable[Tuple[str, int]]:
+    """("new york" ->) ("new york", 0), ("york", 1): suffixes starting at each word."""
+    words = key.split()
+    for i in range(len(words)):
+        yield " ".join(words[i:]), i
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """word and every string reachable from it by up to max_distance deletions."""
+    found = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {item[:i] + item[i + 1:] for item in frontier for i in range(len(item))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """
+    Damerau-Levenshtein (optimal string alignment) distance, bounded.
+
+    Returns:
+        The distance, or None as soon as it must exceed max_distance
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    before_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a[i - 1] != b[j - 1]),
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return None
+        before_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+class LocationIndex:
+    """
+    Read-only index over a {name: (lat, lon)} table and its aliases.
+
+    Candidates are ranked by match kind (exact name, exact city part or
+    alias, city part contained in the query, query is a word prefix of a
+    city part, then typo matches), then by score, then by table order, so
+    results are deterministic.
+    """
+
+    def __init__(self, places: Dict[str, Tuple[float, float]], aliases: Optional[Dict[str, str]] = None):
+        self._places: List[Tuple[str, float, float]] = []
+        self._names: Dict[str, int] = {}
+        self._exact: List[LocationMatch] = []  # Prebuilt exact-match results by place id
+        self._full: Dict[str, int] = {}
+        self._city: Dict[str, List[int]] = {}
+        prefix_entries: List[Tuple[str, int, int, int]] = []
+
+        def add_city_key(key: str, place_id: int) -> None:
+            if place_id not in self._city.setdefault(key, []):
+                self._city[key].append(place_id)
+                for suffix, word_offset in _word_suffixes(key):
+                    prefix_entries.append((suffix, word_offset, len(key), place_id))
+
+        for place_id, (name, (lat, lon)) in enumerate(places.items()):
+            self._places.append((name, lat, lon))
+            self._names[name] = place_id
+            self._exact.append(LocationMatch(name, lat, lon, "exact", 1.0))
+            self._full.setdefault(normalize(name), place_id)
+            add_city_key(normalize(name.split(",")[0]), place_id)
+
+        for alias, name in (aliases or {}).items():
+            if name in self._names:
+                add_city_key(normalize(alias), self._names[name])
+
+        # Sorted (suffix, word offset, key length, place id): all keys
+        # starting with a query are one contiguous run found by bisect
+        prefix_entries.sort()
+        self._prefix_keys = [entry[0] for entry in prefix_entries]
+        self._prefix_entries = prefix_entries
+
+        # Typo index over full names, city parts and aliases: each deletion
+        # (up to MAX_EDIT_DISTANCE) of a key's prefix -> key ids
+        fuzzy_places: Dict[str, List[int]] = {key: [place_id] for key, place_id in self._full.items()}
+        for key, place_ids in self._city.items():
+            fuzzy_places.setdefault(key, []).extend(place_ids)
+        self._fuzzy_keys = sorted(fuzzy_places)
+        self._fuzzy_places = [tuple(sorted(set(fuzzy_places[key]))) for key in self._fuzzy_keys]
+        self._deletions: Dict[str, List[int]] = {}
+        for key_id, key in enumerate(self._fuzzy_keys):
+            for deletion in _deletes(key[:FUZZY_PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+                self._deletions.setdefault(deletion, []).append(key_id)
+
+        # Spatial index over distinct coordinates; places sharing a point
+        # ("Roma, Italia" / "Rome, Italy") are reported by their first name
+        first_at: Dict[Tuple[float, float], int] = {}
+        for place_id, (_, lat, lon) in enumerate(self._places):
+            first_at.setdefault((lat, lon), place_id)
+        self._spatial_places = list(first_at.values())
+        self._spatial = SphereKDTree(list(first_at))
+
+    def __len__(self) -> int:
+        return len(self._places)
+
+    def _match(self, place_id: int, kind: str, score: float) -> LocationMatch:
+        name, lat, lon = self._places[place_id]
+        return LocationMatch(name, lat, lon, kind, round(score, 3))
+
+    def _contained(self, key: str) -> List[Tuple[float, int, int]]:
+        """City parts that appear as whole words in key: (-coverage, position, place id)."""
+        words = key.split()
+        found = []
+        for size in range(len(words), 0, -1):
+            for start in range(len(words) - size + 1):
+                ngram = " ".join(words[start:start + size])
+                for place_id in self._city.get(ngram, ()):
+                    found.append((-len(ngram) / len(key), start, place_id))
+        found.sort()
+        return found
+
+    def _prefixed(self, key: str) -> List[Tuple[int, int, int]]:
+        """City parts with a word starting with key: (word offset, key length, place id)."""
+        start = bisect.bisect_left(self._prefix_keys, key)
+        found = []
+        for suffix, word_offset, length, place_id in self._prefix_entries[start:]:
+            if not suffix.startswith(key):
+                break
+            found.append((word_offset, length, place_id))
+        found.sort()
+        return found
+
+    def _fuzzy(self, key: str) -> List[Tuple[int, int, float]]:
+        """Keys within the allowed edit distance of key: (distance, place id, confidence)."""
+        max_distance = min(MAX_EDIT_DISTANCE, len(key) // CHARS_PER_EDIT)
+        if not max_distance:
+            return []
+        candidates: Set[int] = set()
+        for deletion in _deletes(key[:FUZZY_PREFIX_LENGTH], max_distance):
+            candidates.update(self._deletions.get(deletion, ()))
+
+        found = []
+        for key_id in candidates:
+            candidate = self._fuzzy_keys[key_id]
+            distance = edit_distance(key, candidate, max_distance)
+            if distance is None:
+                continue
+            confidence = 1 - distance / max(len(key), len(candidate))
+            if confidence < MIN_FUZZY_CONFIDENCE:
+                continue
+            for place_id in self._fuzzy_places[key_id]:
+                found.append((distance, place_id, confidence))
+        found.sort()
+        return found
+
+    def search(self, text: str, limit: int = 5) -> List[LocationMatch]:
+        """
+        Ranked candidate places for free-text input.
+
+        Args:
+            text: User input, e.g. "rome", "Zurich", "Nueva York" or "Pariss"
+            limit: Maximum number of candidates
+
+        Returns:
+            Up to limit LocationMatch, best first (empty if nothing matches)
+        """
+        exact = self._names.get(text)
+        if exact is not None and limit == 1:  # Canonical names (dropdown choices) skip normalization
+            return [self._exact[exact]]
+        key = normalize(text)
+        if not key:
+            return []
+
+        results: List[LocationMatch] = []
+        seen = set()
+
+        def add(place_id: int, kind: str, score: float) -> bool:
+            """Add a candidate; True once limit is reached."""
+            if place_id not in seen:
+                seen.add(place_id)
+                results.append(self._match(place_id, kind, score))
+            return len(results) >= limit
+
+        if exact is None:
+            exact = self._full.get(key)
+        if exact is not None and add(exact, "exact", 1.0):
+            return results
+        for place_id in self._city.get(key, ()):
+            if add(place_id, "city", 0.95):
+                return results
+        for negative_coverage, _, place_id in self._contained(key):
+            if add(place_id, "contains", 0.5 + 0.4 * -negative_coverage):
+                return results
+        if len(key) >= MIN_PREFIX_LENGTH:
+            for _, length, place_id in self._prefixed(key):
+                if add(place_id, "prefix", 0.5 * len(key) / length):
+                    return results
+        for _, place_id, confidence in self._fuzzy(key):
+            if add(place_id, "fuzzy", confidence):
+                return results
+        return results
+
+    def best_match(self, text: str) -> Optional[LocationMatch]:
+        """Top-ranked candidate for text, or None."""
+        exact = self._names.get(text)
+        if exact is not None:
+            return self._exact[exact]
+        matches = self.search(text, limit=1)
+        return matches[0] if matches else None
+
+    def _nearby(self, results: List[Tuple[float, int]]) -> List[NearbyPlace]:
+        places = []
+        for distance_km, point in results:
+            name, lat, lon = self._places[self._spatial_places[point]]
+            places.append(NearbyPlace(name, lat, lon, round(distance_km, 1)))
+        return places
+
+    def nearest(self, latitude: float, longitude: float, limit: int = 1) -> List[NearbyPlace]:
+        """The limit places closest to a point, nearest first."""
+        return self._nearby(self._spatial.nearest(latitude, longitude, limit))
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> List[NearbyPlace]:
+        """Places within radius_km (great-circle) of a point, nearest first."""
+        return self._nearby(self._spatial.within(latitude, longitude, radius_km))
+
+    def describe(self, latitude: float, longitude: float) -> str:
+        """
+        Display name for a point: "Rome, Italy", "Near Rome, Italy" or
+        "Location (41.90, 12.50)" depending on the distance to the nearest place.
+        """
+        nearest = self.nearest(latitude, longitude, limit=1)
+        if nearest and nearest[0].distance_km <= NEAR_CITY_KM:
+            return nearest[0].name
+        if nearest and nearest[0].distance_km <= NEARBY_CITY_KM:
+            return f"Near {nearest[0].name}"
+        return f"Location ({latitude:.2f}, {longitude:.2f})"
+
+
+# Built once at import from the curated city and alias tables
+_index = LocationIndex(CITIES, CITY_ALIASES)
+
+
+def search(text: str, limit: int = 5) -> List[LocationMatch]:
+    """Ranked candidates from the city table (see LocationIndex.search)."""
+    return _index.search(text, limit)
+
+
+def best_match(text: str) -> Optional[LocationMatch]:
+    """Best candidate from the city table, or None."""
+    return _index.best_match(text)
+
+
+def nearest(latitude: float, longitude: float, limit: int = 1) -> List[NearbyPlace]:
+    """Closest places from the city table (see LocationIndex.nearest)."""
+    return _index.nearest(latitude, longitude, limit)
+
+
+def within(latitude: float, longitude: float, radius_km: float) -> List[NearbyPlace]:
+    """City table places within radius_km of a point."""
+    return _index.within(latitude, longitude, radius_km)
+
+
+def describe_coordinates(latitude: float, longitude: float) -> str:
+    """Display name for a point (see LocationIndex.describe)."""
+    return _index.describe(latitude, longitude)
@@ -0,0 +1,130 @@
+"""
+Logging Setup - One-time logging configuration for the app and MCP server
+Per-module levels from config, text or JSON output, and sampling for
+high-frequency events (cache lookups, per-object scoring)
+"""
+
+import json
+import logging
+import threading
+from typing import Dict, Hashable, Optional
+
+from src import config
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# LogRecord attributes that are not user-supplied "extra" fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message and any extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def parse_module_levels(spec: str) -> Dict[str, int]:
+    """
+    Parse per-module levels, e.g. "src.astronomy_api=DEBUG,httpx=WARNING".
+
+    Args:
+        spec: Comma-separated logger=LEVEL pairs
+
+    Returns:
+        Dict mapping logger name to numeric level (invalid entries are skipped)
+    """
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        level_value = logging.getLevelName(level.strip().upper())
+        if name.strip() and isinstance(level_value, int):
+            levels[name.strip()] = level_value
+    return levels
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    fmt: Optional[str] = None,
+    module_levels: Optional[str] = None,
+    force: bool = False
+) -> None:
+    """
+    Configure the root logger once per process (later calls are no-ops).
+
+    Args:
+        level: Root level name (default config.LOG_LEVEL)
+        fmt: "text" or "json" (default config.LOG_FORMAT)
+        module_levels: Per-module overrides (default config.LOG_MODULE_LEVELS)
+        force: Reconfigure even if already configured
+    """
+    global _configured
+    with _configure_lock:
+        if _configured and not force:
+            return
+
+        handler = logging.StreamHandler()
+        if (fmt or config.LOG_FORMAT).lower() == "json":
+            handler.setFormatter(JsonFormatter())
+        else:
+            handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+        logging.basicConfig(level=(level or config.LOG_LEVEL).upper(), handlers=[handler], force=True)
+        for name, module_level in parse_module_levels(module_levels or config.LOG_MODULE_LEVELS).items():
+            logging.getLogger(name).setLevel(module_level)
+
+        _configured = True
+
+
+# ============================================================================
+# SAMPLING
+# ============================================================================
+
+_sample_counts: Dict[Hashable, int] = {}
+_sample_lock = threading.Lock()
+
+
+def log_sampled(
+    logger: logging.Logger,
+    level: int,
+    key: Hashable,
+    msg: str,
+    *args,
+    every: Optional[int] = None
+) -> None:
+    """
+    Log the first and then every n-th event for key, lazily formatted.
+
+    Nothing is counted or formatted when level is disabled for logger.
+    The record carries sample_count (events seen for key so far).
+
+    Args:
+        logger: Logger to write to
+        level: Logging level, e.g. logging.DEBUG
+        key: What to count events by, e.g. "cache.hit"
+        msg: %-style message
+        *args: Message arguments
+        every: Sampling interval (default config.LOG_SAMPLE_EVERY)
+    """
+    if not logger.isEnabledFor(level):
+        return
+    every = max(1, every or config.LOG_SAMPLE_EVERY)
+    with _sample_lock:
+        count = _sample_counts.get(key, 0) + 1
+        _sample_counts[key] = count
+    if (count - 1) % every == 0:
+        logger.log(level, msg, *args, extra={"sample_count": count}, stacklevel=2)
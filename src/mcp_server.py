@@ -8,9 +8,11 @@ This MCP server exposes 3 tools:
 3. generate_image_prompt - Get image search strategy for an object
 """
 
+import asyncio
 import gradio as gr
-import requests
 import os
+import uvicorn
+from fastapi import FastAPI
 from datetime import datetime
 from typing import Dict, Optional, List
 import json
@@ -18,12 +20,20 @@ import logging
 
 # Import configuration
 from src import config
+from src import fact_store
+from src import gradio_queue
+from src import http_client
+from src import logging_setup
+from src import metadata_service
+from src import metrics
+from src import object_catalogue
+from src import timing
+from src.deadline import Deadline, NO_DEADLINE
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+@timing.timed("skyfield.visible_stars")
 def get_visible_stars_skyfield(latitude: float, longitude: float, date_str: str = None) -> list:
     """
     Calculate visible bright stars using Skyfield ephemeris library.
@@ -37,7 +47,7 @@ def get_visible_stars_skyfield(latitude: float, longitude: float, date_str: str
         date_str: ISO date string (YYYY-MM-DD), defaults to today
 
     Returns:
-        List of dicts with keys: name, ra, dec, magnitude, altitude, constellation
+        List of dicts with keys: name, hip, bayer, ra, dec, magnitude, altitude, constellation
     """
     try:
         from skyfield.api import load, Star, wgs84
@@ -67,7 +77,7 @@ def get_visible_stars_skyfield(latitude: float, longitude: float, date_str: str
 
         visible_stars = []
 
-        for idx, row in bright_stars.iterrows():
+        for hip, row in bright_stars.iterrows():  # Indexed by Hipparcos number
             try:
                 star = Star.from_dataframe(row)
                 astrometric = observer.at(t).observe(star)
@@ -75,13 +85,17 @@ def get_visible_stars_skyfield(latitude: float, longitude: float, date_str: str
 
                 # Only include stars above 30° altitude (clearly visible)
                 if alt.degrees > 30:
+                    # Hipparcos has no names or constellations: take them from the catalogue
+                    identity = object_catalogue.get_star_by_hip(hip)
                     visible_stars.append({
-                        "name": row.get('hip', f"HIP {idx}"),  # Hipparcos ID
+                        "name": identity.name if identity else f"HIP {hip}",
+                        "hip": int(hip),
+                        "bayer": identity.bayer if identity else None,
                         "ra": row.get('ra_degrees', 0),
                         "dec": row.get('dec_degrees', 0),
                         "magnitude": row.get('magnitude', 5.0),
                         "altitude": alt.degrees,
-                        "constellation": "Unknown",  # Hipparcos doesn't include this
+                        "constellation": identity.constellation if identity else "Unknown",
                         "from_skyfield": True
                     })
             except Exception as e:
@@ -90,11 +104,11 @@ def get_visible_stars_skyfield(latitude: float, longitude: float, date_str: str
         # Sort by brightness (lower magnitude = brighter)
         visible_stars.sort(key=lambda x: x['magnitude'])
 
-        logger.info(f"Skyfield found {len(visible_stars)} visible stars")
+        logger.info("Skyfield found %s visible stars", len(visible_stars))
         return visible_stars[:10]  # Return top 10 brightest
 
     except Exception as e:
-        logger.warning(f"Skyfield calculation failed: {e}, using hemisphere fallback")
+        logger.warning("Skyfield calculation failed: %s, using hemisphere fallback", e)
         return _get_hemisphere_stars(latitude)
 
 
@@ -108,6 +122,7 @@ def _get_hemisphere_stars(latitude: float) -> list:
     Returns:
         List of star dicts for the hemisphere
     """
+    metrics.FALLBACKS.labels(kind="hemisphere_stars").inc()
     if latitude >= 0:  # Northern hemisphere
         stars = [
             {"name": "Polaris", "ra": 37.95, "dec": 89.26, "magnitude": 2.0, "constellation": "Ursa Minor"},
@@ -129,10 +144,13 @@ def _get_hemisphere_stars(latitude: float) -> list:
     for star in stars:
         star["from_skyfield"] = False
 
-    logger.info(f"Using hemisphere fallback: {'North' if latitude >= 0 else 'South'}")
+    logger.info("Using hemisphere fallback: %s", 'North' if latitude >= 0 else 'South')
     return stars
 
 
+VISIBLE_PLANETS_URL = "https://api.visibleplanets.dev/v3"
+
+
 def select_celestial(latitude: float, longitude: float, date: str = None) -> dict:
     """
     Select the best celestial object visible at given coordinates and date.
@@ -156,6 +174,7 @@ def select_celestial(latitude: float, longitude: float, date: str = None) -> dic
             - dec (float): Declination in degrees
             - magnitude (float): Visual magnitude (brightness)
             - constellation (str): Constellation name
+            - hip (int): Hipparcos number (stars only, None if unknown)
             - description (str): Human-readable description
             - score (int): Selection score (higher is better)
 
@@ -163,6 +182,80 @@ def select_celestial(latitude: float, longitude: float, date: str = None) -> dic
         ValueError: If latitude/longitude are out of valid range
         RuntimeError: If all API calls fail
     """
+    date = _prepare_selection(latitude, longitude, date)
+    all_objects = []
+
+    # PRIORITY 1: Try Skyfield for real-time visible stars
+    try:
+        all_objects.extend(_star_candidates(get_visible_stars_skyfield(latitude, longitude, date)))
+    except Exception as e:
+        logger.warning("Skyfield failed: %s", e)
+
+    # PRIORITY 2: Try Visible Planets API (lower priority than stars)
+    try:
+        all_objects.extend(_planet_candidates(_fetch_visible_planets(latitude, longitude)))
+    except Exception as e:
+        logger.warning("Visible Planets API failed: %s", e)
+
+    return _best_or_fallback(all_objects)
+
+
+async def select_celestial_async(
+    latitude: float,
+    longitude: float,
+    date: str = None,
+    deadline: Deadline = NO_DEADLINE
+) -> dict:
+    """
+    Async version of select_celestial.
+
+    The Skyfield calculation (CPU-bound) runs in a worker thread while the
+    Visible Planets API is queried on the shared async HTTP client, so the two
+    sources overlap. Same arguments, result and errors as select_celestial.
+    A source still running when the deadline passes is dropped, so the
+    selection falls back to whatever finished (or the hemisphere stars).
+    """
+    date = _prepare_selection(latitude, longitude, date)
+
+    stars, planets = await asyncio.gather(
+        deadline.wait_for(asyncio.to_thread(get_visible_stars_skyfield, latitude, longitude, date)),
+        _fetch_visible_planets_async(latitude, longitude, deadline),
+        return_exceptions=True
+    )
+
+    all_objects = []
+    if isinstance(stars, Exception):
+        logger.warning("Skyfield failed: %s", stars)
+    else:
+        all_objects.extend(_star_candidates(stars))
+
+    if isinstance(planets, Exception):
+        logger.warning("Visible Planets API failed: %s", planets)
+    else:
+        all_objects.extend(_planet_candidates(planets))
+
+    return _best_or_fallback(all_objects)
+
+
+@timing.timed("visible_planets.api")
+def _fetch_visible_planets(latitude: float, longitude: float, deadline: Deadline = NO_DEADLINE) -> dict:
+    """Query the Visible Planets API for planets above the observer."""
+    response = http_client.get(VISIBLE_PLANETS_URL, params={"latitude": latitude, "longitude": longitude},
+                               timeout=120, deadline=deadline)
+    response.raise_for_status()
+    return response.json()
+
+
+@timing.timed("visible_planets.api")
+async def _fetch_visible_planets_async(latitude: float, longitude: float, deadline: Deadline = NO_DEADLINE) -> dict:
+    """Async version of _fetch_visible_planets."""
+    response = await http_client.aget(VISIBLE_PLANETS_URL, params={"latitude": latitude, "longitude": longitude},
+                                      timeout=120, deadline=deadline)
+    return response.json()
+
+
+def _prepare_selection(latitude: float, longitude: float, date: Optional[str]) -> str:
+    """Validate coordinates and return the date to use (today if not provided)."""
     # Validate inputs
     if not -90 <= latitude <= 90:
         raise ValueError(f"Latitude must be between -90 and 90, got {latitude}")
@@ -173,84 +266,74 @@ def select_celestial(latitude: float, longitude: float, date: str = None) -> dic
     if date is None:
         date = datetime.now().strftime("%Y-%m-%d")
 
-    logger.info(f"select_celestial called: lat={latitude}, lon={longitude}, date={date}")
-
-    all_objects = []
-
-    # PRIORITY 1: Try Skyfield for real-time visible stars
-    try:
-        visible_stars = get_visible_stars_skyfield(latitude, longitude, date)
-
-        if visible_stars:
-            for star_data in visible_stars:
-                # Map star names from Hipparcos IDs to common names (best effort)
-                common_names = {
-                    "HIP 11767": "Polaris",
-                    "HIP 91262": "Vega",
-                    "HIP 69673": "Arcturus",
-                    "HIP 102098": "Deneb",
-                    "HIP 97649": "Altair",
-                    "HIP 32349": "Sirius",
-                    "HIP 30438": "Canopus",
-                }
-
-                star_name = star_data.get("name", "Unknown Star")
-                star_name = common_names.get(star_name, star_name)
-
+    logger.info("select_celestial called: lat=%s, lon=%s, date=%s", latitude, longitude, date)
+    return date
+
+
+def _star_candidates(visible_stars: list) -> list:
+    """Build scored candidate objects from Skyfield visible stars."""
+    candidates = []
+    if visible_stars:
+        for star_data in visible_stars:
+            star_name = star_data.get("name", "Unknown Star")
+            identity = (object_catalogue.get_star_by_hip(star_data.get("hip"))
+                        or object_catalogue.get_object(star_name))
+
+            # Replace "HIP 11767"-style placeholders with the star's proper name
+            if identity and object_catalogue.parse_hip(star_name) is not None:
+                star_name = identity.name
+            constellation = star_data.get("constellation", "Unknown")
+            if identity and constellation == "Unknown":
+                constellation = identity.constellation
+
+            obj = {
+                "object_name": star_name,
+                "type": "star",
+                "hip": identity.hip if identity else None,
+                "ra": star_data.get("ra", 0.0),
+                "dec": star_data.get("dec", 0.0),
+                "magnitude": star_data.get("magnitude", 5.0),
+                "constellation": constellation,
+                "description": (object_catalogue.describe(star_name)
+                                or f"{star_name} is a bright star visible in tonight's sky"),
+                "score": _score_object(star_name, "star", star_data)
+            }
+            candidates.append(obj)
+
+        logger.info("Added %s stars from Skyfield", len(visible_stars))
+    return candidates
+
+
+def _planet_candidates(data: dict) -> list:
+    """Build scored candidate objects from a Visible Planets API response."""
+    candidates = []
+    # Process visible planets (but give them low scores)
+    if "data" in data:
+        for planet_data in data["data"]:
+            if planet_data.get("name"):
                 obj = {
-                    "object_name": star_name,
-                    "type": "star",
-                    "ra": star_data.get("ra", 0.0),
-                    "dec": star_data.get("dec", 0.0),
-                    "magnitude": star_data.get("magnitude", 5.0),
-                    "constellation": star_data.get("constellation", "Unknown"),
-                    "description": f"{star_name} is a bright star visible in tonight's sky",
-                    "score": _score_object(star_name, "star", star_data)
+                    "object_name": planet_data["name"],
+                    "type": "planet",
+                    "ra": planet_data.get("rightAscension", 0.0),
+                    "dec": planet_data.get("declination", 0.0),
+                    "magnitude": planet_data.get("magnitude", 5.0),
+                    "constellation": planet_data.get("constellation", "Unknown"),
+                    "description": (object_catalogue.describe(planet_data["name"])
+                                    or f"{planet_data['name']} is visible tonight"),
+                    "score": _score_object(planet_data["name"], "planet", planet_data)
                 }
-                all_objects.append(obj)
-
-            logger.info(f"Added {len(visible_stars)} stars from Skyfield")
-
-    except Exception as e:
-        logger.warning(f"Skyfield failed: {e}")
-
-    # PRIORITY 2: Try Visible Planets API (lower priority than stars)
-    try:
-        visible_planets_url = f"https://api.visibleplanets.dev/v3"
-        params = {
-            "latitude": latitude,
-            "longitude": longitude,
-        }
+                candidates.append(obj)
 
-        response = requests.get(visible_planets_url, params=params, timeout=120)
-        response.raise_for_status()
-        data = response.json()
-
-        # Process visible planets (but give them low scores)
-        if "data" in data:
-            for planet_data in data["data"]:
-                if planet_data.get("name"):
-                    obj = {
-                        "object_name": planet_data["name"],
-                        "type": "planet",
-                        "ra": planet_data.get("rightAscension", 0.0),
-                        "dec": planet_data.get("declination", 0.0),
-                        "magnitude": planet_data.get("magnitude", 5.0),
-                        "constellation": planet_data.get("constellation", "Unknown"),
-                        "description": f"{planet_data['name']} is visible tonight",
-                        "score": _score_object(planet_data["name"], "planet", planet_data)
-                    }
-                    all_objects.append(obj)
-
-            logger.info(f"Added {len(data['data'])} planets from API")
+        logger.info("Added %s planets from API", len(data['data']))
+    return candidates
 
-    except Exception as e:
-        logger.warning(f"Visible Planets API failed: {e}")
 
+def _best_or_fallback(all_objects: list) -> dict:
+    """Pick the highest scored candidate, or a bright fallback star if there are none."""
     # Return the highest scored object (stars will win due to higher scores)
     if all_objects:
         best = max(all_objects, key=lambda x: x["score"])
-        logger.info(f"Selected object: {best['object_name']} (score: {best['score']})")
+        logger.info("Selected object: %s (score: %s)", best['object_name'], best['score'])
         return best
 
     # Fallback: Arcsecond API for bright stars
@@ -284,7 +367,7 @@ def select_celestial(latitude: float, longitude: float, date: str = None) -> dic
         }
 
     except Exception as e:
-        logger.error(f"Arcsecond fallback failed: {e}")
+        logger.error("Arcsecond fallback failed: %s", e)
 
     # Ultimate fallback: Return Polaris (always visible in Northern Hemisphere)
     logger.warning("All APIs failed, returning fallback: Polaris")
@@ -329,8 +412,9 @@ def get_story_prompt(object_name: str, language: str = "en") -> str:
     """
     Generate a structured narrative prompt for story generation about a celestial object.
 
-    This tool queries astronomy databases for scientific metadata about the object,
-    then formats it into a poetic prompt template suitable for LLM story generation.
+    This tool looks up scientific metadata about the object (bundled catalogue first,
+    astronomy databases for anything else), then formats it into a poetic prompt
+    template suitable for LLM story generation.
 
     Args:
         object_name: Name of the celestial object (e.g., "Jupiter", "Altair", "Orion")
@@ -352,14 +436,14 @@ def get_story_prompt(object_name: str, language: str = "en") -> str:
         TIPO: planet
         ...
     """
-    logger.info(f"get_story_prompt called: object={object_name}, language={language}")
+    logger.info("get_story_prompt called: object=%s, language=%s", object_name, language)
 
     # Validate language
     if language not in config.SUPPORTED_LANGUAGES:
-        logger.warning(f"Unsupported language {language}, defaulting to 'en'")
+        logger.warning("Unsupported language %s, defaulting to 'en'", language)
         language = "en"
 
-    # Query Arcsecond API for object metadata (if available)
+    # Catalogue facts, or Arcsecond API metadata for uncatalogued objects
     scientific_facts = _fetch_object_metadata(object_name)
 
     # Determine object type
@@ -377,23 +461,22 @@ def get_story_prompt(object_name: str, language: str = "en") -> str:
         language=config.SUPPORTED_LANGUAGES[language]
     )
 
-    logger.info(f"Generated story prompt ({len(prompt)} chars)")
+    logger.info("Generated story prompt (%s chars)", len(prompt))
     return prompt
 
 
-def _fetch_object_metadata(object_name: str) -> str:
-    """Fetch scientific metadata from Arcsecond API or use defaults"""
-    try:
-        # Try Arcsecond API
-        url = f"https://api.arcsecond.io/objects/{object_name}/"
-        headers = {}
-        if config.ARCSECOND_API_KEY:
-            headers["Authorization"] = f"Token {config.ARCSECOND_API_KEY}"
+@timing.timed("mcp_server.object_metadata")
+def _fetch_object_metadata(object_name: str, deadline: Deadline = NO_DEADLINE) -> str:
+    """Scientific metadata from the bundled catalogue, else Arcsecond API (shared cache), else defaults"""
+    catalogue_facts = object_catalogue.get_scientific_facts(object_name)
+    if catalogue_facts:
+        return catalogue_facts
 
-        response = requests.get(url, headers=headers, timeout=120)
+    try:
+        metadata = metadata_service.lookup(object_name, deadline)
 
-        if response.status_code == 200:
-            data = response.json()
+        if metadata:
+            data = metadata["facts"]
 
             # Extract interesting facts
             facts = []
@@ -407,7 +490,7 @@ def _fetch_object_metadata(object_name: str) -> str:
             return "; ".join(facts) if facts else _default_facts(object_name)
 
     except Exception as e:
-        logger.warning(f"Arcsecond API failed for {object_name}: {e}")
+        logger.warning("Arcsecond API failed for %s: %s", object_name, e)
 
     # Return default facts
     return _default_facts(object_name)
@@ -415,24 +498,15 @@ def _fetch_object_metadata(object_name: str) -> str:
 
 def _default_facts(object_name: str) -> str:
     """Return default scientific facts for known objects"""
-    facts_db = {
-        "Jupiter": "The largest planet in our solar system, with colorful storms and 95 moons",
-        "Saturn": "Famous for its beautiful rings made of ice and rock",
-        "Mars": "The red planet, with the tallest volcano in the solar system",
-        "Venus": "The brightest planet, covered in thick clouds",
-        "Sirius": "The brightest star in the night sky, 8.6 light-years away",
-        "Vega": "A blue-white star 25 light-years away, very bright and fast-rotating",
-        "Altair": "A rapidly spinning star in the constellation Aquila",
-        "Deneb": "One of the most luminous stars visible, about 2,600 light-years away",
-        "Polaris": "The North Star, used for navigation for thousands of years",
-        "Orion": "A famous constellation with bright stars Betelgeuse and Rigel",
-    }
-
-    return facts_db.get(object_name, f"A beautiful celestial object visible in tonight's sky")
+    return fact_store.get_scientific_facts(object_name) or "A beautiful celestial object visible in tonight's sky"
 
 
 def _determine_object_type(object_name: str) -> str:
     """Determine if object is planet, star, or constellation"""
+    entry = object_catalogue.get_object(object_name)
+    if entry is not None:
+        return entry.object_type
+
     planets = ["Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune"]
     constellations = ["Orion", "Ursa Major", "Ursa Minor", "Cassiopeia", "Andromeda"]
 
@@ -474,7 +548,7 @@ def generate_image_prompt(object_name: str, object_type: str = "star") -> dict:
         >>> print(strategy["hubble_url"])
         https://hubblesite.org/api/v3/images?name=Jupiter
     """
-    logger.info(f"generate_image_prompt called: object={object_name}, type={object_type}")
+    logger.info("generate_image_prompt called: object=%s, type=%s", object_name, object_type)
 
     # Format search query
     search_query = object_name.strip()
@@ -519,24 +593,14 @@ def generate_image_prompt(object_name: str, object_type: str = "star") -> dict:
         )
     }
 
-    logger.info(f"Generated image strategy: {strategy}")
+    logger.info("Generated image strategy: %s", strategy)
     return result
 
 
 def _get_alternative_names(object_name: str) -> List[str]:
     """Get alternative names for better image search"""
-    alternatives = {
-        "Jupiter": ["Jupiter planet", "Giant planet Jupiter"],
-        "Saturn": ["Saturn rings", "Ringed planet Saturn"],
-        "Mars": ["Mars red planet", "Planet Mars"],
-        "Venus": ["Venus planet", "Morning star"],
-        "Sirius": ["Sirius star", "Alpha Canis Majoris"],
-        "Vega": ["Vega star", "Alpha Lyrae"],
-        "Altair": ["Altair star", "Alpha Aquilae"],
-        "Orion": ["Orion constellation", "Orion nebula"],
-    }
-
-    return alternatives.get(object_name, [f"{object_name} astronomy"])
+    alt_names = fact_store.get_alternative_names(object_name)
+    return list(alt_names) if alt_names else [f"{object_name} astronomy"]
 
 
 # ============================================================================
@@ -632,6 +696,8 @@ with gr.Blocks(title="Zen-IT-Story MCP Server") as demo:
 
 
 if __name__ == "__main__":
+    logging_setup.configure_logging()
+
     # Validate configuration
     config.validate_config()
 
@@ -644,11 +710,14 @@ if __name__ == "__main__":
     print("  - SSE: http://localhost:7860/gradio_api/mcp/sse")
     print("  - Schema: http://localhost:7860/gradio_api/mcp/schema")
     print("\nWeb UI: http://localhost:7860")
+    print("Metrics: http://localhost:7860/metrics")
     print("="*80 + "\n")
 
-    demo.launch(
-        mcp_server=True,
-        share=False,  # Set to True for public URL
-        server_name="0.0.0.0",
-        server_port=7860
-    )
+    gradio_queue.enable_queue(demo)
+    metrics.track_queue(demo)
+
+    # Serve Gradio (with MCP enabled) from a FastAPI app so /metrics sits alongside it
+    server = FastAPI()
+    metrics.add_metrics_route(server)
+    server = gr.mount_gradio_app(server, demo, path="/", mcp_server=True)
+    uvicorn.run(server, host="0.0.0.0", port=7860)
@@ -0,0 +1,201 @@
+"""
+Metadata Service - Cached Arcsecond object metadata shared by all callers
+One lookup path for astronomy_api.get_object_metadata and the MCP story
+prompt: names are canonicalized, the spelling variants Arcsecond may know
+an object under are probed concurrently on the pipeline loop, and results
+are cached, including "not found" (for a shorter time) so unknown objects
+do not repeat every probe on every request.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
+
+from src import config
+from src import http_client
+from src import metrics
+from src.deadline import Deadline, DeadlineExceeded, NO_DEADLINE
+
+logger = logging.getLogger(__name__)
+
+ARCSECOND_OBJECTS_URL = "https://api.arcsecond.io/objects/{name}/"
+
+# Cached "no metadata" marker (None means "not cached")
+_NOT_FOUND: Dict[str, Any] = {}
+
+
+def canonical_name(name: str) -> str:
+    """Cache key for an object name: trimmed, single-spaced, case-folded."""
+    return " ".join(name.split()).casefold()
+
+
+def name_variants(name: str) -> List[str]:
+    """Spellings to probe, most likely first, without duplicates."""
+    name = " ".join(name.split())
+    variants = [name, name.title(), name.upper(), name.lower()]
+    return list(dict.fromkeys(variant for variant in variants if variant))
+
+
+def _metadata(data: Dict, object_name: str) -> Dict[str, Any]:
+    """Metadata record from an Arcsecond object response."""
+    coordinates = data.get("coordinates") or {}
+    return {
+        "name": data.get("name", object_name),
+        "ra": coordinates.get("rightascension"),
+        "dec": coordinates.get("declination"),
+        "distance": data.get("distance"),
+        "object_type": data.get("type", "unknown"),
+        "magnitude": data.get("magnitude"),
+        "constellation": data.get("constellation"),
+        "facts": data
+    }
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+_cache: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+    """Cached record, _NOT_FOUND, or None on a miss."""
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[1] <= time.monotonic():
+            del _cache[key]
+            entry = None
+        if entry is not None:
+            _cache.move_to_end(key)
+    if entry is None:
+        result = "miss"
+    else:
+        result = "negative_hit" if entry[0] is _NOT_FOUND else "hit"
+    metrics.CACHE_REQUESTS.labels(namespace="arcsecond", result=result).inc()
+    return entry[0] if entry else None
+
+
+def _cache_set(key: str, value: Dict[str, Any], ttl: float) -> None:
+    with _cache_lock:
+        _cache[key] = (value, time.monotonic() + ttl)
+        _cache.move_to_end(key)
+        while len(_cache) > config.METADATA_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+# ============================================================================
+# LOOKUPS
+# ============================================================================
+
+# Lookups in progress on the pipeline loop, by canonical name: concurrent
+# stories about the same object share one set of probes
+_inflight: Dict[str, "asyncio.Task[Optional[Dict[str, Any]]]"] = {}
+
+
+async def _probe(variant: str, deadline: Deadline) -> Optional[Dict]:
+    """Arcsecond response for one spelling, or None if Arcsecond does not know it."""
+    headers = {}
+    if config.ARCSECOND_API_KEY:
+        headers["Authorization"] = f"Token {config.ARCSECOND_API_KEY}"
+    try:
+        response = await http_client.aget(ARCSECOND_OBJECTS_URL.format(name=quote(variant)), headers=headers,
+                                          timeout=config.METADATA_TIMEOUT, deadline=deadline)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return None
+        raise
+    return response.json()
+
+
+async def _fetch(object_name: str, key: str) -> Optional[Dict[str, Any]]:
+    """
+    Shared lookup behind _join: runs under the service's own budget, not any
+    one caller's deadline, so every outcome is a real answer and is cached.
+
+    The spellings are probed concurrently. The likeliest one Arcsecond knows
+    is returned as soon as every likelier probe has come back empty, and the
+    probes still running are cancelled; "not found" and errors are only
+    cached once every probe has finished.
+    """
+    deadline = Deadline.after(config.METADATA_LOOKUP_BUDGET)
+    variants = name_variants(object_name)
+    probes = [asyncio.ensure_future(_probe(variant, deadline)) for variant in variants]
+    try:
+        pending = set(probes)
+        while pending:
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for variant, probe in zip(variants, probes):
+                if not probe.done():
+                    break  # A likelier spelling may still answer
+                if probe.exception() is None and isinstance(probe.result(), dict):
+                    metadata = _metadata(probe.result(), object_name)
+                    _cache_set(key, metadata, config.METADATA_CACHE_TTL)
+                    logger.info("Fetched metadata for %s from Arcsecond (as %s)", object_name, variant)
+                    return metadata
+    finally:
+        for probe in probes:
+            probe.cancel()  # No-op for finished probes
+
+    errors = [probe.exception() for probe in probes if probe.exception() is not None]
+    if errors:
+        logger.warning("Arcsecond lookup failed for %s: %s", object_name, errors[0])
+        _cache_set(key, _NOT_FOUND, config.METADATA_ERROR_TTL)
+    else:
+        logger.info("Arcsecond does not know %s", object_name)
+        _cache_set(key, _NOT_FOUND, config.METADATA_NEGATIVE_TTL)
+    return None
+
+
+async def _join(object_name: str, key: str, deadline: Deadline) -> Optional[Dict[str, Any]]:
+    """Start the lookup for key, or wait for the one already in progress (up to deadline)."""
+    task = _inflight.get(key)
+    if task is None:
+        task = _inflight[key] = asyncio.ensure_future(_fetch(object_name, key))
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    try:
+        # Shielded: a caller running out of time must not cancel the shared
+        # probes, which finish (and fill the cache) for the next request
+        return await deadline.wait_for(asyncio.shield(task))
+    except DeadlineExceeded:
+        logger.warning("Deadline reached while looking up metadata for %s", object_name)
+        return None
+
+
+def lookup(object_name: str, deadline: Deadline = NO_DEADLINE) -> Optional[Dict[str, Any]]:
+    """
+    Arcsecond metadata for an object. Blocks the calling thread while the
+    lookup runs on the pipeline loop; cache hits return without the hop.
+
+    Args:
+        object_name: Object name in any case/spacing ("vega", "Ursa  Major")
+        deadline: Request deadline; an unfinished lookup returns None
+
+    Returns:
+        Dict with name, ra, dec, distance, object_type, magnitude,
+        constellation and the raw response under "facts"; None if unknown
+
+    Raises:
+        RuntimeError: If called on the pipeline loop thread (it would wait on itself)
+    """
+    key = canonical_name(object_name)
+    if not key:
+        return None
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached or None
+    if threading.get_ident() == http_client.get_loop_thread_id():
+        raise RuntimeError("metadata_service.lookup would deadlock on the pipeline loop; "
+                           "call it from a worker thread (e.g. asyncio.to_thread)")
+    return http_client.run_sync(_join(object_name, key, deadline))
@@ -0,0 +1,307 @@
+"""
+Metrics - Minimal Prometheus-style registry (counters, gauges, histograms)
+Rendered in the Prometheus text exposition format on /metrics, next to the
+Gradio app (app.py) and the MCP server (src/mcp_server.py)
+"""
+
+import bisect
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src import timing
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Default latency buckets in seconds (upstream APIs can take up to 120s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_registry: List["_Metric"] = []
+_collectors: List[Callable[[], List[str]]] = []
+_registry_lock = threading.Lock()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    """Base class: a named metric family with optional labels."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            # Unlabelled metrics are exported as 0 before their first update
+            self._children[()] = self._new_child()
+        with _registry_lock:
+            _registry.append(self)
+
+    def labels(self, **labels: str):
+        """Child metric for one combination of label values."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+            return child
+
+    def _default(self):
+        """The unlabelled child (metrics declared without labels)."""
+        return self.labels()
+
+    @abstractmethod
+    def _new_child(self):
+        """A fresh child holding one label combination's value(s)."""
+
+    @abstractmethod
+    def _render_child(self, key: Tuple[str, ...], child) -> List[str]:
+        """Exposition lines for one child."""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in sorted(children):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "function", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        with self.lock:
+            self.value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from function at scrape time."""
+        self.function = function
+
+    def get(self) -> float:
+        if self.function is not None:
+            try:
+                return float(self.function())
+            except Exception as e:
+                logger.debug("Gauge callback failed: %s", e)
+                return float("nan")
+        return self.value
+
+
+class Counter(_Metric):
+    """Monotonic counter."""
+
+    type_name = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def _render_child(self, key, child):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be read from a callback."""
+
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default().set_function(function)
+
+    def _render_child(self, key, child):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"]
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "lock")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self.lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram (values in seconds by convention)."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def _render_child(self, key, child):
+        with child.lock:
+            counts, total = list(child.counts), child.sum
+        return render_histogram(self.name, self.labelnames, key, self.buckets, counts, total)
+
+
+def render_histogram(name: str, labelnames: Sequence[str], labelvalues: Sequence[str],
+                     buckets: Sequence[float], counts: Sequence[int], total: float) -> List[str]:
+    """Text lines for one histogram series (counts are per bucket, last one open-ended)."""
+    lines = []
+    cumulative = 0
+    for bound, count in zip(tuple(buckets) + (float("inf"),), counts):
+        cumulative += count
+        le = f'le="{_format_value(bound)}"'
+        lines.append(f"{name}_bucket{_format_labels(labelnames, labelvalues, le)} {cumulative}")
+    lines.append(f"{name}_sum{_format_labels(labelnames, labelvalues)} {_format_value(total)}")
+    lines.append(f"{name}_count{_format_labels(labelnames, labelvalues)} {cumulative}")
+    return lines
+
+
+def register_collector(collector: Callable[[], List[str]]) -> None:
+    """Add a function that returns extra exposition lines at scrape time."""
+    with _registry_lock:
+        _collectors.append(collector)
+
+
+def render() -> str:
+    """Render every metric in the Prometheus text exposition format."""
+    with _registry_lock:
+        metrics, collectors = list(_registry), list(_collectors)
+    lines: List[str] = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    for collector in collectors:
+        try:
+            lines.extend(collector())
+        except Exception as e:
+            logger.warning("Metrics collector failed: %s", e)
+    return "\n".join(lines) + "\n"
+
+
+# ============================================================================
+# APPLICATION METRICS
+# ============================================================================
+
+CACHE_REQUESTS = Counter(
+    "zen_cache_requests_total", "Cache lookups by namespace and result (hit, negative_hit, miss, expired)",
+    ["namespace", "result"]
+)
+UPSTREAM_REQUESTS = Counter(
+    "zen_upstream_requests_total", "Upstream HTTP requests by host and outcome (ok, http_error, timeout, error)",
+    ["host", "outcome"]
+)
+UPSTREAM_RETRIES = Counter(
+    "zen_upstream_retries_total", "Upstream retries by host and reason (timeout, error, status)",
+    ["host", "reason"]
+)
+UPSTREAM_RETRIES_DENIED = Counter(
+    "zen_upstream_retries_denied_total", "Retries not attempted by host and cause (budget, retry_after, deadline)",
+    ["host", "cause"]
+)
+UPSTREAM_LATENCY = Histogram(
+    "zen_upstream_request_duration_seconds", "Upstream HTTP request latency by host", ["host"]
+)
+GEMINI_TOKENS = Counter(
+    "zen_gemini_tokens_total", "Gemini tokens used, by kind (prompt, candidates)", ["kind"]
+)
+GEMINI_STREAMS_ABORTED = Counter(
+    "zen_gemini_streams_aborted_total",
+    "Gemini streams closed before the end (token usage not recorded), by reason (unsafe, interrupted)",
+    ["reason"]
+)
+FALLBACKS = Counter(
+    "zen_fallbacks_total", "Fallback usage by kind (story, hemisphere_stars, starfield_image)", ["kind"]
+)
+STORIES_IN_FLIGHT = Gauge(
+    "zen_stories_in_flight", "Story generations currently running"
+)
+QUEUE_DEPTH = Gauge(
+    "zen_queue_depth", "Events waiting in the Gradio queue"
+)
+
+
+def _span_collector() -> List[str]:
+    """Export the src.timing span histograms as zen_stage_duration_seconds."""
+    name = "zen_stage_duration_seconds"
+    lines = [f"# HELP {name} Wall-clock duration of timed stages and calls, by span",
+             f"# TYPE {name} histogram"]
+    buckets_s = [bound / 1000 for bound in timing.BUCKETS_MS]
+    for span_name, summary in timing.snapshot().items():
+        counts = [count for _, count in summary["buckets"]]
+        total_s = summary["mean_ms"] * summary["count"] / 1000
+        lines.extend(render_histogram(name, ("span",), (span_name,), buckets_s, counts, total_s))
+    return lines
+
+
+register_collector(_span_collector)
+
+
+def track_queue(blocks) -> None:
+    """Report the Gradio queue length of blocks as zen_queue_depth."""
+    QUEUE_DEPTH.set_function(lambda: len(blocks._queue))
+
+
+def add_metrics_route(app, path: str = "/metrics") -> None:
+    """Serve render() on path of a FastAPI app (mount Gradio after this)."""
+    from fastapi.responses import PlainTextResponse
+
+    @app.get(path, include_in_schema=False)
+    def metrics_endpoint():
+        return PlainTextResponse(render(), media_type=CONTENT_TYPE)
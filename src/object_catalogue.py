@@ -0,0 +1,193 @@
+"""
+Object Catalogue - Bundled metadata for every object select_celestial can return
+Loads src/data/object_catalogue.json once (bright Hipparcos stars, hemisphere
+fallback stars, planets and the Moon) and serves O(1) lookups by name, alias
+or Bayer designation, so story prompts get scientific facts without a
+network round trip. Stars are also indexed by Hipparcos number, which is
+how Skyfield identifies them
+"""
+
+import json
+import logging
+import os
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple, Optional, Tuple
+
+from src.fact_store import normalize_name
+
+logger = logging.getLogger(__name__)
+
+CATALOGUE_PATH = os.path.join(os.path.dirname(__file__), "data", "object_catalogue.json")
+
+
+class CatalogueObject(NamedTuple):
+    """One catalogue entry (fields that do not apply to the object type are None)."""
+    name: str
+    object_type: str  # "star", "planet" or "moon"
+    hip: Optional[int] = None  # Hipparcos catalogue number
+    bayer: Optional[str] = None  # e.g. "Alpha Lyrae"
+    constellation: Optional[str] = None
+    ra: Optional[float] = None  # Degrees (J2000)
+    dec: Optional[float] = None
+    magnitude: Optional[float] = None  # Apparent visual magnitude
+    distance_ly: Optional[float] = None
+    distance_km: Optional[float] = None
+    spectral_type: Optional[str] = None
+    diameter_km: Optional[float] = None
+    moons: Optional[int] = None
+    aliases: Tuple[str, ...] = ()
+    descriptions: Mapping[str, str] = MappingProxyType({})  # Language -> text
+
+
+def _entry(record: dict) -> CatalogueObject:
+    return CatalogueObject(
+        name=record["name"],
+        object_type=record["type"],
+        hip=record.get("hip"),
+        bayer=record.get("bayer"),
+        constellation=record.get("constellation"),
+        ra=record.get("ra"),
+        dec=record.get("dec"),
+        magnitude=record.get("magnitude"),
+        distance_ly=record.get("distance_ly"),
+        distance_km=record.get("distance_km"),
+        spectral_type=record.get("spectral_type"),
+        diameter_km=record.get("diameter_km"),
+        moons=record.get("moons"),
+        aliases=tuple(record.get("aliases", ())),
+        descriptions=MappingProxyType(dict(record.get("descriptions", {}))),
+    )
+
+
+def _load_catalogue(path: str) -> Tuple[Mapping, Mapping, Mapping, Mapping]:
+    """
+    Read the catalogue data file and build the read-only indexes.
+
+    Returns:
+        (objects, stars_by_hip, star_templates, spectral_colors) where objects
+        is keyed by normalized name, alias and Bayer designation (proper names
+        win over aliases that collide with them) and stars_by_hip by HIP number
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    entries = [_entry(record) for record in data["objects"]]
+    objects = {normalize_name(entry.name): entry for entry in entries}
+    for entry in entries:
+        for alias in entry.aliases + ((entry.bayer,) if entry.bayer else ()):
+            existing = objects.setdefault(normalize_name(alias), entry)
+            if existing is not entry:
+                logger.warning("Catalogue alias %r of %s already names %s", alias, entry.name, existing.name)
+    stars_by_hip = {entry.hip: entry for entry in entries if entry.hip is not None}
+
+    logger.info("Loaded object catalogue v%s: %s objects, %s names", data.get("version"), len(entries), len(objects))
+    return (
+        MappingProxyType(objects),
+        MappingProxyType(stars_by_hip),
+        MappingProxyType(data["star_templates"]),
+        MappingProxyType({language: MappingProxyType(colors)
+                          for language, colors in data["spectral_colors"].items()}),
+    )
+
+
+_OBJECTS, _STARS_BY_HIP, _STAR_TEMPLATES, _SPECTRAL_COLORS = _load_catalogue(CATALOGUE_PATH)
+
+
+def parse_hip(value: Any) -> Optional[int]:
+    """Hipparcos number from 11767, numpy.int64(11767), "11767" or "HIP 11767"; None otherwise."""
+    if isinstance(value, str):
+        value = value.strip()
+        if value[:3].upper() == "HIP":
+            value = value[3:].strip()
+        return int(value) if value.isdigit() else None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_star_by_hip(hip: Any) -> Optional[CatalogueObject]:
+    """
+    Get a star's identity (proper name, Bayer designation, constellation, ...)
+    from its Hipparcos number, in any form parse_hip accepts.
+    """
+    number = parse_hip(hip)
+    return _STARS_BY_HIP.get(number) if number is not None else None
+
+
+def get_object(object_name: str) -> Optional[CatalogueObject]:
+    """Get the catalogue entry for a name, alias, Bayer designation or "HIP n" (case-insensitive)."""
+    entry = _OBJECTS.get(normalize_name(object_name))
+    if entry is None and object_name[:3].upper() == "HIP":
+        entry = get_star_by_hip(object_name)
+    return entry
+
+
+def _format_distance(distance_ly: float) -> str:
+    return f"{distance_ly:g}" if distance_ly < 10 else f"{distance_ly:.0f}"
+
+
+def describe(object_name: str, language: str = "en") -> Optional[str]:
+    """
+    Get a one-paragraph description of an object.
+
+    Uses the object's own description when the catalogue has one, otherwise
+    builds one from its spectral type, constellation and distance.
+
+    Args:
+        object_name: Name, alias or Bayer designation (case-insensitive)
+        language: Language code ("en", "it", "fr", "es"); unknown codes use English
+
+    Returns:
+        Description text, or None if the object is not in the catalogue
+    """
+    entry = get_object(object_name)
+    if entry is None:
+        return None
+    if entry.descriptions:
+        return entry.descriptions.get(language) or entry.descriptions.get("en")
+    if entry.object_type != "star" or not (entry.spectral_type and entry.constellation and entry.distance_ly):
+        return None
+
+    if language not in _STAR_TEMPLATES:
+        language = "en"
+    color = _SPECTRAL_COLORS[language].get(entry.spectral_type[0])
+    if color is None:
+        return None
+    return _STAR_TEMPLATES[language].format(name=entry.name, color=color, constellation=entry.constellation,
+                                            distance=_format_distance(entry.distance_ly))
+
+
+def get_scientific_facts(object_name: str) -> Optional[str]:
+    """
+    Get the scientific facts line used in story prompts.
+
+    Returns:
+        Description followed by "; "-separated facts (constellation, distance,
+        spectral type, brightness, size), or None if the object is not in the catalogue
+    """
+    entry = get_object(object_name)
+    if entry is None:
+        return None
+
+    facts = []
+    description = describe(object_name)
+    if description:
+        facts.append(description.rstrip("."))
+    if entry.bayer and normalize_name(entry.bayer) != normalize_name(entry.name):
+        facts.append(f"Also known as {entry.bayer}")
+    if entry.constellation:
+        facts.append(f"Constellation: {entry.constellation}")
+    if entry.distance_ly is not None:
+        facts.append(f"Distance: {_format_distance(entry.distance_ly)} light-years")
+    if entry.distance_km is not None:
+        facts.append(f"Distance: {entry.distance_km:,.0f} km")
+    if entry.spectral_type:
+        facts.append(f"Spectral type: {entry.spectral_type}")
+    if entry.magnitude is not None:
+        facts.append(f"Brightness: Magnitude {entry.magnitude}")
+    if entry.diameter_km is not None:
+        facts.append(f"Diameter: {entry.diameter_km:,.0f} km")
+    if entry.moons is not None:
+        facts.append(f"Moons: {entry.moons}")
+    return "; ".join(facts)
@@ -0,0 +1,94 @@
+"""
+Story Pipeline - Small asyncio DAG executor for independent story stages
+Runs every stage as soon as its dependencies have finished, so independent
+stages (Gemini story, image search, fun facts) overlap instead of adding up
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from src import timing
+
+logger = logging.getLogger(__name__)
+
+# A stage is (coroutine function, dependency names). The function receives a
+# dict with the results of its dependencies, keyed by stage name.
+Stage = Tuple[Callable[[Dict[str, Any]], Awaitable[Any]], List[str]]
+
+
+class StageResult(NamedTuple):
+    """Outcome of one stage, yielded in completion order."""
+    name: str
+    value: Any
+    error: Optional[BaseException]
+    elapsed: float  # seconds, from stage start to finish
+
+
+async def run_stages(stages: Dict[str, Stage]) -> AsyncIterator[StageResult]:
+    """
+    Run a DAG of stages concurrently and yield each result as it finishes.
+
+    A stage whose dependency failed is not run; it is reported with the
+    dependency's error instead. Stages still running when the caller stops
+    iterating are cancelled.
+
+    Args:
+        stages: Mapping of stage name to (coroutine function, dependency names)
+
+    Yields:
+        StageResult for every stage, in completion order
+
+    Raises:
+        ValueError: If a dependency is unknown or the stages contain a cycle
+    """
+    for name, (_, deps) in stages.items():
+        unknown = [dep for dep in deps if dep not in stages]
+        if unknown:
+            raise ValueError(f"Stage '{name}' depends on unknown stage(s): {', '.join(unknown)}")
+
+    pending = dict(stages)
+    results: Dict[str, StageResult] = {}
+    running: Dict[asyncio.Task, Tuple[str, float]] = {}
+
+    try:
+        while pending or running:
+            # Start (or skip) every stage whose dependencies are all done,
+            # repeating while skips unblock further stages
+            progressed = True
+            while progressed:
+                progressed = False
+                for name, (fn, deps) in list(pending.items()):
+                    if not all(dep in results for dep in deps):
+                        continue
+                    del pending[name]
+                    progressed = True
+                    failed = next((results[dep] for dep in deps if results[dep].error is not None), None)
+                    if failed is not None:
+                        results[name] = StageResult(name, None, failed.error, 0.0)
+                        yield results[name]
+                        continue
+                    inputs = {dep: results[dep].value for dep in deps}
+                    task = asyncio.ensure_future(fn(inputs))
+                    running[task] = (name, time.perf_counter())
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Stage dependency cycle: {', '.join(pending)}")
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name, start = running.pop(task)
+                elapsed = time.perf_counter() - start
+                timing.record(f"pipeline.{name}", elapsed * 1000)
+                try:
+                    results[name] = StageResult(name, task.result(), None, elapsed)
+                except Exception as e:
+                    logger.warning("Stage '%s' failed: %s", name, e)
+                    results[name] = StageResult(name, None, e, elapsed)
+                yield results[name]
+    finally:
+        for task in running:
+            task.cancel()
@@ -0,0 +1,273 @@
+"""
+Profiling - Opt-in stack sampling of individual story requests
+A profiled request (1 in PROFILE_SAMPLE_EVERY, or the PROFILE_HEADER header)
+has its stacks sampled every PROFILE_INTERVAL_MS and written to PROFILE_DIR as
+collapsed stacks (flamegraph.pl / speedscope input), next to a JSON sidecar
+with the request's span timings.
+
+Other requests share the pipeline loop, so samples are attributed by task:
+the loop thread is only sampled while one of the request's tasks is running
+on it (on-loop time), and worker threads only while they run one of the
+request's timed spans (wall-clock time, e.g. Skyfield in asyncio.to_thread).
+The request's tasks are found through a context variable that the pipeline
+loop's task factory checks when each task is created.
+"""
+
+import asyncio
+import collections
+import contextvars
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from src import config
+from src import http_client
+from src import timing
+
+logger = logging.getLogger(__name__)
+
+_session: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar(
+    "zen_profile_session", default=None
+)
+
+
+class ProfileSession:
+    """Samples and span timings collected for one profiled request."""
+
+    def __init__(self, name: str, reason: str, tags: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.reason = reason
+        self.tags = tags or {}
+        self.id = f"{datetime.now():%Y%m%d-%H%M%S}-{name}-{uuid.uuid4().hex[:8]}"
+        self.started_at = datetime.now(timezone.utc)
+        self.tasks: "weakref.WeakSet[asyncio.Task]" = weakref.WeakSet()
+        self.threads: Dict[int, int] = {}  # Thread ident -> open span count
+        self.stacks: collections.Counter = collections.Counter()
+        self.samples = 0
+        self.spans: List[Dict[str, Any]] = []
+        self._wall_start = time.perf_counter()
+        self._lock = threading.Lock()
+
+        # Context the request runs in: a copy of the caller's, plus this session
+        self.context = contextvars.copy_context()
+        self.context.run(_session.set, self)
+
+    def add_stack(self, stack: str) -> None:
+        with self._lock:
+            self.stacks[stack] += 1
+            self.samples += 1
+
+    def write(self, directory: str) -> str:
+        """Write <id>.collapsed and <id>.json to directory; returns the .collapsed path."""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, self.id)
+        with self._lock:
+            stacks = sorted(self.stacks.items())
+            sidecar = {
+                "id": self.id,
+                "name": self.name,
+                "reason": self.reason,
+                "tags": self.tags,
+                "started_at": self.started_at.isoformat(timespec="milliseconds"),
+                "wall_ms": round((time.perf_counter() - self._wall_start) * 1000, 1),
+                "interval_ms": config.PROFILE_INTERVAL_MS,
+                "samples": self.samples,
+                "spans": list(self.spans),
+            }
+        with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in stacks)
+        with open(f"{base}.json", "w", encoding="utf-8") as f:
+            json.dump(sidecar, f, indent=2, default=str)
+            f.write("\n")
+        return f"{base}.collapsed"
+
+
+# ============================================================================
+# ATTRIBUTION HOOKS
+# ============================================================================
+
+def _task_factory(loop: asyncio.AbstractEventLoop, coro, **kwargs) -> asyncio.Task:
+    """Pipeline loop task factory: tasks created in a profiled context join its session."""
+    task = asyncio.Task(coro, loop=loop, **kwargs)
+    context = kwargs.get("context")
+    session = context.get(_session) if context is not None else _session.get()
+    if session is not None:
+        session.tasks.add(task)
+    return task
+
+
+def _on_span(event: str, name: str, wall_ms: Optional[float], cpu_ms: Optional[float]) -> None:
+    """timing observer: track worker threads and collect span timings for the sidecar."""
+    session = _session.get()
+    if session is None:
+        return
+    ident = threading.get_ident()
+    on_worker = ident != http_client.get_loop_thread_id()
+    with session._lock:
+        if event == "start":
+            if on_worker:
+                session.threads[ident] = session.threads.get(ident, 0) + 1
+            return
+        if on_worker and ident in session.threads:
+            session.threads[ident] -= 1
+            if not session.threads[ident]:
+                del session.threads[ident]
+        session.spans.append({
+            "name": name,
+            "wall_ms": round(wall_ms, 2),
+            "cpu_ms": round(cpu_ms, 2) if cpu_ms is not None else None,
+            "thread": "pipeline-loop" if not on_worker else threading.current_thread().name,
+        })
+
+
+_hooks_installed = False
+_hooks_lock = threading.Lock()
+
+
+def _install_hooks() -> None:
+    global _hooks_installed
+    with _hooks_lock:
+        if _hooks_installed:
+            return
+        loop = http_client.get_loop()
+        if loop.get_task_factory() is not None:
+            logger.warning("Pipeline loop already has a task factory; profiles will miss loop samples")
+        else:
+            loop.set_task_factory(_task_factory)
+        timing.add_observer(_on_span)
+        _hooks_installed = True
+
+
+# ============================================================================
+# SAMPLER
+# ============================================================================
+
+_active: List[ProfileSession] = []
+_active_lock = threading.Lock()
+_sampler: Optional[threading.Thread] = None
+_labels: Dict[Any, str] = {}
+
+
+def _frame_label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        label = _labels[code] = f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return label
+
+
+def _collapse(frame) -> str:
+    """Stack of frame as "outermost;...;innermost"."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def _sample_forever() -> None:
+    """Sample attributed stacks until no session is active."""
+    global _sampler
+    loop = http_client.get_loop()
+    loop_ident = http_client.get_loop_thread_id()
+    interval = max(config.PROFILE_INTERVAL_MS, 0.5) / 1000
+    while True:
+        with _active_lock:
+            if not _active:
+                _sampler = None
+                return
+            sessions = list(_active)
+
+        frames = sys._current_frames()
+        running = asyncio.tasks._current_tasks.get(loop)
+        for session in sessions:
+            with session._lock:
+                idents = list(session.threads)
+            if running is not None and running in session.tasks:
+                idents.append(loop_ident)
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is not None:
+                    session.add_stack(_collapse(frame))
+        del frames
+        time.sleep(interval)
+
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+
+def _header_requested(request: Any) -> bool:
+    if not config.PROFILE_HEADER or request is None:
+        return False
+    headers = getattr(request, "headers", None) or {}
+    return str(headers.get(config.PROFILE_HEADER, "")).strip().lower() in ("1", "true", "yes")
+
+
+def should_profile(request: Any = None) -> Optional[str]:
+    """
+    Decide whether to profile a request.
+
+    Args:
+        request: gr.Request (or anything with .headers), if available
+
+    Returns:
+        Reason ("header" or "sampled"), or None to skip profiling
+    """
+    if _header_requested(request):
+        return "header"
+    every = config.PROFILE_SAMPLE_EVERY
+    if every > 0 and random.randrange(every) == 0:
+        return "sampled"
+    return None
+
+
+@contextmanager
+def maybe_profile(
+    name: str,
+    request: Any = None,
+    tags: Optional[Dict[str, Any]] = None
+) -> Iterator[Optional[contextvars.Context]]:
+    """
+    Profile the enclosed request if should_profile() picks it.
+
+    Yields the context to run the request's pipeline-loop work in (pass it
+    to http_client.iterate_sync / iterate_on_loop), or None when the request
+    is not profiled. Output is written when the block exits.
+
+    Example:
+        >>> with profiling.maybe_profile("story_flow", request) as context:
+        ...     for update in http_client.iterate_sync(flow(), context):
+        ...         ...
+    """
+    reason = should_profile(request)
+    if reason is None:
+        yield None
+        return
+
+    global _sampler
+    _install_hooks()
+    session = ProfileSession(name, reason, tags)
+    with _active_lock:
+        _active.append(session)
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_forever, name="profile-sampler", daemon=True)
+            _sampler.start()
+    try:
+        yield session.context
+    finally:
+        with _active_lock:
+            _active.remove(session)
+        try:
+            path = session.write(config.PROFILE_DIR)
+            logger.info("Profile %s (%s, %d samples) written to %s", session.id, reason, session.samples, path)
+        except OSError as e:
+            logger.warning("Could not write profile %s: %s", session.id, e)
@@ -0,0 +1,88 @@
+"""
+Progress Events - Append-only progress channel for the story flow
+The flow emits one structured event per activity-log line; consumers receive
+only the events added since their last update instead of the whole log, and
+can summarize each stage's status and duration once the flow ends
+"""
+
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+# Event statuses
+STARTED = "started"
+OK = "ok"
+WARNING = "warning"
+ERROR = "error"
+
+_STATUS_ICONS = {STARTED: "⏳", OK: "✅", WARNING: "⚠️", ERROR: "❌"}
+
+
+class ProgressEvent(NamedTuple):
+    """One activity-log line with the stage it belongs to."""
+    stage: str                    # e.g. "location", "select_celestial", "story"
+    status: str                   # STARTED, OK, WARNING or ERROR
+    elapsed_ms: Optional[float]   # stage duration, None for STARTED/informational events
+    line: str                     # formatted log line ("21:03:04 ⭐ ...")
+
+
+class ProgressChannel:
+    """Collects events for one flow run and hands out the new ones."""
+
+    def __init__(self):
+        self._pending: List[ProgressEvent] = []
+
+    def start(self, stage: str, icon: str, message: str) -> ProgressEvent:
+        """Emit a STARTED event for a stage (time it with src.timing)."""
+        return self.emit(stage, STARTED, icon, message)
+
+    def emit(
+        self,
+        stage: str,
+        status: str,
+        icon: str,
+        message: str,
+        elapsed_ms: Optional[float] = None
+    ) -> ProgressEvent:
+        """Emit an event; the line is "HH:MM:SS <icon> <message>"."""
+        line = f"{datetime.now().strftime('%H:%M:%S')} {icon} {message}"
+        event = ProgressEvent(stage, status, elapsed_ms, line)
+        self._pending.append(event)
+        return event
+
+    def drain(self) -> List[ProgressEvent]:
+        """Return the events emitted since the previous drain."""
+        events, self._pending = self._pending, []
+        return events
+
+
+def _format_elapsed(elapsed_ms: Optional[float]) -> str:
+    if elapsed_ms is None:
+        return ""
+    return f"{elapsed_ms:.0f}ms" if elapsed_ms < 1000 else f"{elapsed_ms / 1000:.1f}s"
+
+
+def stage_summary(events: List[ProgressEvent]) -> str:
+    """
+    Summarize a finished flow run, one line per stage in the order the stages
+    first appeared: its latest status and its elapsed time.
+
+    Args:
+        events: Every event of the run (the concatenated drains)
+
+    Returns:
+        Summary text, e.g. "✅ story  2.3s"; a stage that never finished keeps
+        its STARTED icon
+    """
+    statuses: Dict[str, str] = {}
+    elapsed: Dict[str, Optional[float]] = {}
+    for event in events:
+        if event.status != STARTED or event.stage not in statuses:
+            statuses[event.stage] = event.status
+        if event.elapsed_ms is not None:
+            elapsed[event.stage] = event.elapsed_ms
+
+    width = max((len(stage) for stage in statuses), default=0)
+    return "\n".join(
+        f"{_STATUS_ICONS.get(status, '•')} {stage.ljust(width)}  {_format_elapsed(elapsed.get(stage))}".rstrip()
+        for stage, status in statuses.items()
+    )
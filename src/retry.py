@@ -0,0 +1,191 @@
+"""
+Retry - Upstream retry policies, backoff and a global retry budget
+Decides whether a failed upstream request is retried and how long to wait:
+exponential backoff with full jitter, Retry-After honoured up to a cap, and
+a token-bucket budget shared by all hosts so retries cannot multiply the
+load on an upstream that is already failing. The retry loops themselves
+live in src/http_client.py, which knows the transports.
+"""
+
+import logging
+import math
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from src import config
+from src import metrics
+from src.logging_setup import log_sampled
+
+logger = logging.getLogger(__name__)
+
+# Retry tokens the budget can bank during quiet periods
+BUDGET_CAPACITY = 10.0
+
+
+class RetryPolicy(NamedTuple):
+    """How requests to one host are retried."""
+    max_attempts: int = config.RETRY_MAX_ATTEMPTS  # Including the first attempt
+    backoff_base: float = config.RETRY_BACKOFF_BASE  # Seconds before the first retry (upper bound)
+    backoff_max: float = config.RETRY_BACKOFF_MAX
+    jitter: bool = True  # Full jitter: wait uniformly in [0, backoff]
+    retry_statuses: Tuple[int, ...] = config.RETRY_STATUSES
+    respect_retry_after: bool = True
+    retry_after_max: float = config.RETRY_AFTER_MAX
+
+
+DEFAULT_POLICY = RetryPolicy()
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+_policies: Dict[str, RetryPolicy] = {}
+
+
+def policy_for(host: str) -> RetryPolicy:
+    """Policy for a host: DEFAULT_POLICY with its RETRY_POLICIES overrides."""
+    policy = _policies.get(host)
+    if policy is None:
+        overrides = config.RETRY_POLICIES.get(host, {})
+        policy = _policies[host] = DEFAULT_POLICY._replace(**overrides) if overrides else DEFAULT_POLICY
+    return policy
+
+
+def set_policy(host: str, policy: Optional[RetryPolicy]) -> None:
+    """Override the policy for a host (None = back to config)."""
+    if policy is None:
+        _policies.pop(host, None)
+    else:
+        _policies[host] = policy
+
+
+# ============================================================================
+# RETRY BUDGET
+# ============================================================================
+
+class RetryBudget:
+    """
+    Token bucket of retries: every request deposits ratio tokens, time adds
+    min_per_second tokens, and each retry spends one.
+
+    With ratio 0.1 retries add at most ~10% to steady-state traffic, however
+    many requests fail, while a quiet process can still retry occasionally.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, capacity: float = BUDGET_CAPACITY):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = capacity
+        self._balance = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._balance = min(self.capacity, self._balance + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def deposit(self) -> None:
+        """Record a new (first-attempt) request."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._balance = min(self.capacity, self._balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Spend one retry; False if the budget is exhausted."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+    @property
+    def balance(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._balance
+
+
+BUDGET = RetryBudget(config.RETRY_BUDGET_RATIO, config.RETRY_BUDGET_MIN_PER_SECOND)
+
+
+# ============================================================================
+# DECISIONS
+# ============================================================================
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff(policy: RetryPolicy, attempt: int) -> float:
+    """Wait before retrying after the given (1-based) failed attempt."""
+    ceiling = min(policy.backoff_max, policy.backoff_base * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling) if policy.jitter else ceiling
+
+
+def next_delay(
+    policy: RetryPolicy,
+    host: str,
+    attempt: int,
+    reason: Optional[str],
+    status: Optional[int] = None,
+    retry_after: Optional[str] = None,
+    remaining: float = math.inf
+) -> Optional[float]:
+    """
+    Decide whether to retry a failed attempt.
+
+    Args:
+        policy: The host's RetryPolicy
+        host: Upstream host (metrics label)
+        attempt: Attempts made so far (1 after the first failure)
+        reason: "timeout", "error" (connection) or "status"; None = not retryable
+        status: HTTP status for reason "status"
+        retry_after: Retry-After header of the response, if any
+        remaining: Seconds left in the request's deadline
+
+    Returns:
+        Seconds to wait before the next attempt, or None to give up
+    """
+    if reason is None or attempt >= policy.max_attempts:
+        return None
+    if reason == "status" and status not in policy.retry_statuses:
+        return None
+
+    delay = backoff(policy, attempt)
+    if policy.respect_retry_after:
+        requested = parse_retry_after(retry_after)
+        if requested is not None:
+            if requested > policy.retry_after_max:
+                metrics.UPSTREAM_RETRIES_DENIED.labels(host=host, cause="retry_after").inc()
+                return None
+            delay = max(delay, requested)
+
+    if delay >= remaining:
+        # The retry could not even start before the deadline
+        metrics.UPSTREAM_RETRIES_DENIED.labels(host=host, cause="deadline").inc()
+        return None
+
+    if not BUDGET.withdraw():
+        metrics.UPSTREAM_RETRIES_DENIED.labels(host=host, cause="budget").inc()
+        log_sampled(logger, logging.WARNING, ("retry.budget", host),
+                    "Retry budget exhausted; not retrying %s (%s)", host, reason)
+        return None
+
+    metrics.UPSTREAM_RETRIES.labels(host=host, reason=reason).inc()
+    logger.info("Retrying %s in %.2fs (attempt %d/%d, %s%s)", host, delay, attempt + 1, policy.max_attempts,
+                reason, f" {status}" if status else "")
+    return delay
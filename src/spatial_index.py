@@ -0,0 +1,131 @@
+"""
+Spatial Index - KD-tree over points on the Earth's surface
+Points are stored as 3-D unit vectors, so straight-line (chord) distance
+orders points exactly like great-circle distance, with no special cases at
+the poles or the antimeridian. Nearest-N and within-radius queries take
+logarithmic time on average.
+"""
+
+import heapq
+import math
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0088  # Mean Earth radius
+
+Vector = Tuple[float, float, float]
+
+
+class _Node(NamedTuple):
+    index: int
+    axis: int
+    left: Optional["_Node"]
+    right: Optional["_Node"]
+
+
+def to_vector(latitude: float, longitude: float) -> Vector:
+    """Unit vector for a latitude/longitude in degrees."""
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def chord_to_km(chord: float) -> float:
+    """Great-circle distance for a chord between two unit vectors."""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def km_to_chord(distance_km: float) -> float:
+    """Chord between two unit vectors distance_km apart along the surface."""
+    return 2 * math.sin(min(math.pi, distance_km / EARTH_RADIUS_KM) / 2)
+
+
+def great_circle_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in km between two latitude/longitude points."""
+    a, b = to_vector(lat1, lon1), to_vector(lat2, lon2)
+    return chord_to_km(math.dist(a, b))
+
+
+class SphereKDTree:
+    """
+    Static KD-tree over (latitude, longitude) points.
+
+    Results are (distance_km, point index) pairs, nearest first, with ties
+    broken by point index so queries are deterministic.
+    """
+
+    def __init__(self, coordinates: Sequence[Tuple[float, float]]):
+        self._vectors: List[Vector] = [to_vector(lat, lon) for lat, lon in coordinates]
+        self._root = self._build(list(range(len(self._vectors))))
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def _build(self, indices: List[int]) -> Optional[_Node]:
+        if not indices:
+            return None
+        # Split on the axis with the largest spread, at the median point
+        spreads = [
+            max(self._vectors[i][axis] for i in indices) - min(self._vectors[i][axis] for i in indices)
+            for axis in range(3)
+        ]
+        axis = spreads.index(max(spreads))
+        indices.sort(key=lambda i: (self._vectors[i][axis], i))
+        middle = len(indices) // 2
+        return _Node(indices[middle], axis, self._build(indices[:middle]), self._build(indices[middle + 1:]))
+
+    def nearest(self, latitude: float, longitude: float, limit: int = 1) -> List[Tuple[float, int]]:
+        """
+        The limit points closest to a location.
+
+        Returns:
+            Up to limit (distance_km, index) pairs, nearest first
+        """
+        target = to_vector(latitude, longitude)
+        best: List[Tuple[float, int]] = []  # Max-heap of (-squared chord, -index)
+
+        def visit(node: Optional[_Node]) -> None:
+            if node is None:
+                return
+            point = self._vectors[node.index]
+            squared = sum((t - p) ** 2 for t, p in zip(target, point))
+            entry = (-squared, -node.index)
+            if len(best) < limit:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+            difference = target[node.axis] - point[node.axis]
+            near, far = (node.left, node.right) if difference < 0 else (node.right, node.left)
+            visit(near)
+            if len(best) < limit or difference * difference <= -best[0][0]:
+                visit(far)
+
+        if limit > 0:
+            visit(self._root)
+        return sorted((chord_to_km(math.sqrt(-squared)), -negative_index) for squared, negative_index in best)
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[float, int]]:
+        """
+        All points within radius_km of a location.
+
+        Returns:
+            (distance_km, index) pairs, nearest first
+        """
+        target = to_vector(latitude, longitude)
+        radius = km_to_chord(radius_km)
+        limit = radius * radius
+        found: List[Tuple[float, int]] = []
+
+        def visit(node: Optional[_Node]) -> None:
+            if node is None:
+                return
+            point = self._vectors[node.index]
+            squared = sum((t - p) ** 2 for t, p in zip(target, point))
+            if squared <= limit:
+                found.append((chord_to_km(math.sqrt(squared)), node.index))
+            difference = target[node.axis] - point[node.axis]
+            if difference - radius <= 0:
+                visit(node.left)
+            if difference + radius >= 0:
+                visit(node.right)
+
+        visit(self._root)
+        return sorted(found)
@@ -10,9 +10,11 @@ import re
 import syllables
 from typing import Dict, Tuple, Optional, List
 from src import config
+from src import fact_store
+from src import metrics
+from src import timing
+from src.deadline import Deadline, NO_DEADLINE
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Configure Gemini API
@@ -22,12 +24,14 @@ else:
     logger.warning("GEMINI_API_KEY not set! Story generation will fail.")
 
 
+@timing.timed("gemini.generate_story")
 def generate_story(
     object_name: str,
     object_type: str,
     location: str,
     scientific_facts: str,
-    language: str = "en"
+    language: str = "en",
+    deadline: Deadline = NO_DEADLINE
 ) -> Dict[str, str]:
     """
     Generate a bedtime astronomy story using Gemini API.
@@ -38,6 +42,7 @@ def generate_story(
         location: User's location (city name)
         scientific_facts: Scientific facts about the object
         language: Target language code ("en", "it", "fr", "es")
+        deadline: Request deadline; the fallback story is used once it passes
 
     Returns:
         Dict with keys:
@@ -45,15 +50,112 @@ def generate_story(
             - story: Full story text (3 acts)
             - haiku: Extracted haiku (3 lines)
             - haiku_title: Title for haiku section
+            - paragraphs: Story body paragraphs (structured, for display)
+            - haiku_lines: Haiku lines (structured, for display)
             - full_text: Complete formatted output
             - success: Boolean indicating if generation succeeded
             - error: Error message if failed
     """
-    logger.info(f"Generating story: {object_name} ({object_type}) in {language}")
+    language, prompt = _build_story_prompt(object_name, object_type, location, scientific_facts, language)
+
+    try:
+        # Generate story, streaming so unsafe content cancels the call early
+        response = _create_model().generate_content(
+            prompt, stream=True, request_options=_request_options(deadline)
+        )
+
+        scanner = StreamingSafetyScanner()
+        chunks = []
+        chunk = None
+        completed = False
+        try:
+            for chunk in response:
+                deadline.check()
+                chunks.append(chunk.text)
+                if not scanner.feed(chunk.text):
+                    break
+            else:
+                completed = True
+        finally:
+            if not completed:
+                _abort_stream(response, "interrupted" if scanner.is_safe else "unsafe")
+        scanner.finish()
+        if completed:
+            _record_token_usage(chunk)  # Final chunk: usage of the whole generation
+
+        return _streamed_story_result(chunks, scanner, object_name, language)
+
+    except Exception as e:
+        logger.error("Story generation failed: %s", e)
+        # Log detailed error but return graceful fallback
+        logger.debug("Full exception: %s", e, exc_info=True)
+        return get_fallback_story(object_name, language)
+
+
+@timing.timed("gemini.generate_story")
+async def generate_story_async(
+    object_name: str,
+    object_type: str,
+    location: str,
+    scientific_facts: str,
+    language: str = "en",
+    deadline: Deadline = NO_DEADLINE
+) -> Dict[str, str]:
+    """
+    Async version of generate_story (same arguments and result).
+
+    Streams the Gemini response on the event loop instead of blocking a thread;
+    the stream is cancelled when the deadline passes.
+    """
+    language, prompt = _build_story_prompt(object_name, object_type, location, scientific_facts, language)
+
+    try:
+        return await deadline.wait_for(_stream_story_async(prompt, object_name, language), config.GEMINI_TIMEOUT)
+    except Exception as e:
+        logger.error("Story generation failed: %s", e)
+        logger.debug("Full exception: %s", e, exc_info=True)
+        return get_fallback_story(object_name, language)
+
+
+async def _stream_story_async(prompt: str, object_name: str, language: str) -> Dict[str, str]:
+    """Stream one story from Gemini, stopping early on unsafe content."""
+    response = await _create_model().generate_content_async(prompt, stream=True)
+
+    scanner = StreamingSafetyScanner()
+    chunks = []
+    chunk = None
+    completed = False
+    try:
+        async for chunk in response:
+            chunks.append(chunk.text)
+            if not scanner.feed(chunk.text):
+                break
+        else:
+            completed = True
+    finally:
+        # Also runs when deadline.wait_for cancels this coroutine
+        if not completed:
+            await _aabort_stream(response, "interrupted" if scanner.is_safe else "unsafe")
+    scanner.finish()
+    if completed:
+        _record_token_usage(chunk)  # Final chunk: usage of the whole generation
+
+    return _streamed_story_result(chunks, scanner, object_name, language)
+
+
+def _build_story_prompt(
+    object_name: str,
+    object_type: str,
+    location: str,
+    scientific_facts: str,
+    language: str
+) -> Tuple[str, str]:
+    """Validate the language and build the story prompt. Returns (language, prompt)."""
+    logger.info("Generating story: %s (%s) in %s", object_name, object_type, language)
 
     # Validate language
     if language not in config.SUPPORTED_LANGUAGES:
-        logger.warning(f"Unsupported language {language}, defaulting to 'en'")
+        logger.warning("Unsupported language %s, defaulting to 'en'", language)
         language = "en"
 
     # Build the prompt using config template
@@ -64,125 +166,349 @@ def generate_story(
         scientific_facts=scientific_facts,
         language=config.SUPPORTED_LANGUAGES[language]
     )
+    return language, prompt
 
-    try:
-        # Initialize Gemini model
-        model = genai.GenerativeModel(
-            model_name=config.GEMINI_MODEL,
-            safety_settings=config.GEMINI_SAFETY_SETTINGS
+
+def _streamed_story_result(
+    chunks: List[str],
+    scanner: "StreamingSafetyScanner",
+    object_name: str,
+    language: str
+) -> Dict[str, str]:
+    """Turn the streamed chunks into a story, or the fallback if the scanner flagged them."""
+    if not scanner.is_safe:
+        logger.error(
+            "Story contains unsafe content (%s)! Cancelled after %s chars, returning fallback.",
+            ", ".join(scanner.unsafe_words), sum(len(c) for c in chunks)
         )
+        return get_fallback_story(object_name, language)
+
+    story_text = "".join(chunks)
+
+    if not story_text:
+        raise ValueError("Empty response from Gemini API")
+
+    parsed = _finalize_story(story_text, object_name, language)
+    logger.info("Story generated successfully (%s chars)", len(story_text))
+    return parsed
+
 
-        # Generate story
-        response = model.generate_content(prompt)
+# Marker line that introduces each language in a multi-language response
+_LANGUAGE_MARKER_PATTERN = re.compile(r'^\s*=+\s*LANGUAGE:\s*([a-zA-Z]{2})\s*=+\s*$', re.MULTILINE)
 
-        if not response.text:
+
+@timing.timed("gemini.generate_story_all_languages")
+def generate_story_all_languages(
+    object_name: str,
+    object_type: str,
+    location: str,
+    scientific_facts: str,
+    languages: Optional[List[str]] = None,
+    deadline: Deadline = NO_DEADLINE
+) -> Dict[str, Dict[str, str]]:
+    """
+    Generate the same bedtime story in several languages with one Gemini call.
+
+    The response is split on its "=== LANGUAGE: xx ===" markers and every
+    language is parsed and safety-checked on its own: a missing or unsafe
+    version is replaced by the fallback story for that language only.
+
+    Args:
+        object_name: Name of celestial object (e.g., "Jupiter", "Altair")
+        object_type: Type of object ("planet", "star", "constellation")
+        location: User's location (city name)
+        scientific_facts: Scientific facts about the object
+        languages: Language codes to generate, defaults to all supported languages
+        deadline: Request deadline; fallback stories are used once it passes
+
+    Returns:
+        Dict mapping language code to a story dict (same keys as generate_story)
+    """
+    languages, prompt = _build_multi_language_prompt(object_name, object_type, location, scientific_facts, languages)
+
+    try:
+        response = _create_model().generate_content(prompt, request_options=_request_options(deadline))
+        _record_token_usage(response)
+        response_text = response.text
+        if not response_text:
             raise ValueError("Empty response from Gemini API")
+    except Exception as e:
+        logger.error("Multi-language story generation failed: %s", e)
+        return {lang: get_fallback_story(object_name, lang) for lang in languages}
+
+    return _split_language_stories(response_text, languages, object_name)
 
-        story_text = response.text
-
-        # Parse and validate the story
-        parsed = parse_story(story_text, language)
-
-        if not parsed["success"]:
-            logger.warning(f"Story parsing failed: {parsed['error']}")
-            # Still return the raw story even if parsing failed
-            return {
-                "title": f"The Tale of {object_name}",
-                "story": story_text,
-                "haiku": "",
-                "haiku_title": "",
-                "full_text": story_text,
-                "success": True,
-                "error": None
-            }
-
-        # Validate haiku (if present)
-        if parsed["haiku"]:
-            haiku_valid = validate_haiku(parsed["haiku"], language)
-            if not haiku_valid:
-                logger.warning(f"Haiku validation failed for language {language}")
-
-        # Apply safety filter
-        if not safety_filter(parsed["full_text"]):
-            logger.error("Story contains unsafe content! Returning fallback.")
-            return get_fallback_story(object_name, language)
-
-        logger.info(f"Story generated successfully ({len(story_text)} chars)")
-        return parsed
 
+@timing.timed("gemini.generate_story_all_languages")
+async def generate_story_all_languages_async(
+    object_name: str,
+    object_type: str,
+    location: str,
+    scientific_facts: str,
+    languages: Optional[List[str]] = None,
+    deadline: Deadline = NO_DEADLINE
+) -> Dict[str, Dict[str, str]]:
+    """Async version of generate_story_all_languages (same arguments and result)."""
+    languages, prompt = _build_multi_language_prompt(object_name, object_type, location, scientific_facts, languages)
+
+    try:
+        response = await deadline.wait_for(_create_model().generate_content_async(prompt), config.GEMINI_TIMEOUT)
+        _record_token_usage(response)
+        response_text = response.text
+        if not response_text:
+            raise ValueError("Empty response from Gemini API")
     except Exception as e:
-        logger.error(f"Story generation failed: {e}")
-        # Log detailed error but return graceful fallback
-        logger.debug(f"Full exception: {str(e)}", exc_info=True)
-        return get_fallback_story(object_name, language)
+        logger.error("Multi-language story generation failed: %s", e)
+        return {lang: get_fallback_story(object_name, lang) for lang in languages}
+
+    return _split_language_stories(response_text, languages, object_name)
+
+
+def _build_multi_language_prompt(
+    object_name: str,
+    object_type: str,
+    location: str,
+    scientific_facts: str,
+    languages: Optional[List[str]]
+) -> Tuple[List[str], str]:
+    """Validate the languages and build the multi-language prompt. Returns (languages, prompt)."""
+    languages = [lang for lang in (languages or config.SUPPORTED_LANGUAGES) if lang in config.SUPPORTED_LANGUAGES]
+    if not languages:
+        languages = ["en"]
+
+    logger.info("Generating story: %s (%s) in %s (single call)", object_name, object_type, ', '.join(languages))
+
+    prompt = config.MULTI_LANGUAGE_STORY_PROMPT_TEMPLATE.format(
+        object_name=object_name,
+        object_type=object_type,
+        location=location,
+        scientific_facts=scientific_facts,
+        languages=", ".join(f"{config.SUPPORTED_LANGUAGES[lang]} ({lang})" for lang in languages)
+    )
+    return languages, prompt
+
+
+def _split_language_stories(
+    response_text: str,
+    languages: List[str],
+    object_name: str
+) -> Dict[str, Dict[str, str]]:
+    """Split a multi-language response into per-language stories, with per-language fallbacks."""
+    # re.split with one group yields [preamble, code1, text1, code2, text2, ...]
+    parts = _LANGUAGE_MARKER_PATTERN.split(response_text)
+    sections = {code.lower(): text.strip() for code, text in zip(parts[1::2], parts[2::2])}
+
+    stories = {}
+    for lang in languages:
+        story_text = sections.get(lang)
+        if not story_text:
+            logger.warning("No %s section in multi-language response, using fallback", lang)
+            stories[lang] = get_fallback_story(object_name, lang)
+            continue
+
+        unsafe_words = find_unsafe_words(story_text)
+        if unsafe_words:
+            logger.error("%s story contains unsafe content (%s)! Using fallback.", lang, ', '.join(unsafe_words))
+            stories[lang] = get_fallback_story(object_name, lang)
+            continue
+
+        stories[lang] = _finalize_story(story_text, object_name, lang)
+
+    logger.info("Multi-language story generated (%s chars, %s languages)", len(response_text), len(stories))
+    return stories
+
+
+def _create_model() -> "genai.GenerativeModel":
+    """Create the Gemini model with the child-safety settings."""
+    return genai.GenerativeModel(
+        model_name=config.GEMINI_MODEL,
+        safety_settings=config.GEMINI_SAFETY_SETTINGS
+    )
+
 
+def _request_options(deadline: Deadline) -> Dict[str, float]:
+    """Gemini request options: timeout of min(GEMINI_TIMEOUT, time left)."""
+    return {"timeout": deadline.timeout(config.GEMINI_TIMEOUT)}
 
+
+def _stream_handles(response) -> tuple:
+    """
+    The response and its transport stream: the SDK wrapper has no close of
+    its own, the gRPC call under it has cancel(), REST/fake generators close().
+    """
+    return (response, getattr(response, "_iterator", None))
+
+
+def _abort_stream(response, reason: str) -> None:
+    """Close a streaming response that was not read to the end, so Gemini stops generating (and billing)."""
+    metrics.GEMINI_STREAMS_ABORTED.labels(reason=reason).inc()
+    for handle in _stream_handles(response):
+        stop = getattr(handle, "cancel", None) or getattr(handle, "close", None)
+        if callable(stop):
+            try:
+                stop()
+            except Exception as e:
+                logger.debug("Closing Gemini stream failed: %s", e)
+            return
+
+
+async def _aabort_stream(response, reason: str) -> None:
+    """Async version of _abort_stream (async generators need aclose())."""
+    metrics.GEMINI_STREAMS_ABORTED.labels(reason=reason).inc()
+    for handle in _stream_handles(response):
+        cancel, aclose = getattr(handle, "cancel", None), getattr(handle, "aclose", None)
+        if callable(cancel) or callable(aclose):
+            try:
+                if callable(cancel):
+                    cancel()
+                else:
+                    await aclose()
+            except Exception as e:
+                logger.debug("Closing Gemini stream failed: %s", e)
+            return
+
+
+def _record_token_usage(response) -> None:
+    """Count prompt and candidate tokens from a Gemini response (or last stream chunk)."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        metrics.GEMINI_TOKENS.labels(kind="prompt").inc(getattr(usage, "prompt_token_count", 0) or 0)
+        metrics.GEMINI_TOKENS.labels(kind="candidates").inc(getattr(usage, "candidates_token_count", 0) or 0)
+
+
+def _finalize_story(story_text: str, object_name: str, language: str) -> Dict[str, str]:
+    """Parse a safety-checked story and validate its haiku."""
+    parsed = parse_story(story_text, language)
+
+    if not parsed["success"]:
+        logger.warning("Story parsing failed: %s", parsed['error'])
+        # Still return the raw story even if parsing failed
+        return {
+            "title": f"The Tale of {object_name}",
+            "story": story_text,
+            "haiku": "",
+            "haiku_title": "",
+            "full_text": story_text,
+            "success": True,
+            "error": None
+        }
+
+    # Validate haiku (if present)
+    if parsed["haiku"]:
+        haiku_valid = validate_haiku(parsed["haiku"], language)
+        if not haiku_valid:
+            logger.warning("Haiku validation failed for language %s", language)
+
+    return parsed
+
+
+# Markdown patterns used by the single-pass story parser (compiled once)
+_TITLE_PATTERN = re.compile(r'^#\s+(.+?)\s*$')
+_HAIKU_HEADING_PATTERN = re.compile(r'^#{2,3}\s*(.*?ha[iï]ku.*?)\s*$', re.IGNORECASE)
+_HEADING_PATTERN = re.compile(r'^#{1,6}\s')
+
+
+def _split_one_line_haiku(haiku_text: str) -> List[str]:
+    """Split a haiku that Gemini wrote on a single line into its three lines."""
+    if '/' in haiku_text:
+        return [line.strip() for line in haiku_text.split('/') if line.strip()]
+    if haiku_text.count(',') >= 2:
+        # Split by commas but keep last part together
+        parts = haiku_text.split(',')
+        return [parts[0].strip(), parts[1].strip(), ','.join(parts[2:]).strip()]
+    return [haiku_text]
+
+
+def _parse_sections(story_text: str) -> Dict:
+    """
+    Split Markdown story text into its sections in a single pass over the lines.
+
+    Returns:
+        Dict with keys:
+            - title: First "# " heading (None if missing)
+            - paragraphs: Story body paragraphs, without any headings
+            - haiku_title: Title of the haiku section ("" if missing)
+            - haiku_lines: Up to three haiku lines
+    """
+    title = None
+    haiku_title = ""
+    haiku_lines: List[str] = []
+    paragraphs: List[str] = []
+    current: List[str] = []
+    in_haiku = False
+
+    for raw_line in story_text.splitlines():
+        line = raw_line.strip()
+
+        if in_haiku:
+            # Blank lines around/between haiku lines are tolerated
+            if line and not _HEADING_PATTERN.match(line):
+                haiku_lines.append(line)
+                in_haiku = len(haiku_lines) < 3
+                continue
+            if not line:
+                if haiku_lines:
+                    in_haiku = False
+                continue
+            in_haiku = False
+
+        if not line:
+            if current:
+                paragraphs.append("\n".join(current))
+                current = []
+            continue
+
+        if title is None and _TITLE_PATTERN.match(line):
+            title = _TITLE_PATTERN.match(line).group(1)
+            continue
+
+        haiku_heading = _HAIKU_HEADING_PATTERN.match(line)
+        if haiku_heading and not haiku_title:
+            haiku_title = haiku_heading.group(1).strip()
+            in_haiku = True
+            continue
+
+        if _HEADING_PATTERN.match(line):
+            continue
+
+        current.append(line)
+
+    if current:
+        paragraphs.append("\n".join(current))
+
+    if len(haiku_lines) == 1:
+        haiku_lines = _split_one_line_haiku(haiku_lines[0])
+
+    return {
+        "title": title,
+        "paragraphs": paragraphs,
+        "haiku_title": haiku_title,
+        "haiku_lines": haiku_lines[:3],
+    }
+
+
+@timing.timed()
 def parse_story(story_text: str, language: str) -> Dict[str, str]:
     """
     Parse story text to extract title, acts, and haiku.
 
+    The text is parsed once; the structured sections ("paragraphs",
+    "haiku_lines") are kept in the result so format_story_for_display
+    does not need to parse the story again.
+
     Returns:
         Dict with parsed components or error information
     """
     try:
-        # Extract title (first markdown heading)
-        title_match = re.search(r'^#\s+(.+)$', story_text, re.MULTILINE)
-        title = title_match.group(1) if title_match else f"A Celestial Tale"
-
-        # Extract haiku section - improved pattern to handle various formats
-        # Try multiple patterns for flexibility
-        haiku_title = ""
-        haiku = ""
-
-        # Pattern 1: Three lines after "Haiku" heading
-        haiku_pattern1 = r'###?\s+(.+?[Hh]aiku.*?)\s*\n\s*(.+?)\s*\n\s*(.+?)\s*\n\s*(.+?)(?:\s*\n\n|\s*$)'
-        haiku_match = re.search(haiku_pattern1, story_text, re.DOTALL)
-
-        if haiku_match:
-            haiku_title = haiku_match.group(1).strip()
-            haiku = f"{haiku_match.group(2).strip()}\n{haiku_match.group(3).strip()}\n{haiku_match.group(4).strip()}"
-        else:
-            # Pattern 2: Haiku all on one line (Gemini sometimes does this)
-            haiku_pattern2 = r'###?\s+(.+?[Hh]aiku.*?)\s*\n\s*(.+?)(?:\s*\n\n|\s*$)'
-            haiku_match = re.search(haiku_pattern2, story_text, re.DOTALL)
-
-            if haiku_match:
-                haiku_title = haiku_match.group(1).strip()
-                haiku_text = haiku_match.group(2).strip()
-
-                # Try to split by common delimiters
-                if '/' in haiku_text:
-                    haiku_lines = [line.strip() for line in haiku_text.split('/')]
-                elif ',' in haiku_text and haiku_text.count(',') >= 2:
-                    # Split by commas but keep last part together
-                    parts = haiku_text.split(',')
-                    if len(parts) >= 3:
-                        haiku_lines = [parts[0].strip(), parts[1].strip(), ','.join(parts[2:]).strip()]
-                    else:
-                        haiku_lines = [p.strip() for p in parts]
-                else:
-                    # Assume it's already formatted with line breaks
-                    haiku_lines = [line.strip() for line in haiku_text.split('\n') if line.strip()]
-
-                if len(haiku_lines) >= 3:
-                    haiku = '\n'.join(haiku_lines[:3])
-                else:
-                    haiku = haiku_text
-
-        # Remove title and haiku to get just the story
-        story = story_text
-        if title_match:
-            story = story.replace(title_match.group(0), "", 1)
-        if haiku_match:
-            story = story.replace(haiku_match.group(0), "")
-
-        story = story.strip()
+        sections = _parse_sections(story_text)
 
         return {
-            "title": title,
-            "story": story,
-            "haiku": haiku,
-            "haiku_title": haiku_title,
+            "title": sections["title"] or "A Celestial Tale",
+            "story": "\n\n".join(sections["paragraphs"]),
+            "haiku": "\n".join(sections["haiku_lines"]),
+            "haiku_title": sections["haiku_title"],
+            "paragraphs": sections["paragraphs"],
+            "haiku_lines": sections["haiku_lines"],
             "full_text": story_text,
             "success": True,
             "error": None
@@ -215,7 +541,7 @@ def validate_haiku(haiku: str, language: str) -> bool:
         lines = [line.strip() for line in haiku.split('\n') if line.strip()]
 
         if len(lines) != 3:
-            logger.warning(f"Haiku must have 3 lines, got {len(lines)}")
+            logger.warning("Haiku must have 3 lines, got %s", len(lines))
             return False
 
         # Get syllable rules for language
@@ -230,39 +556,130 @@ def validate_haiku(haiku: str, language: str) -> bool:
             try:
                 syl_count = syllables.estimate(line)
                 if not (min_syl <= syl_count <= max_syl):
-                    logger.warning(f"Haiku line {i+1}: {syl_count} syllables (expected {min_syl}-{max_syl})")
+                    logger.warning("Haiku line %s: %s syllables (expected %s-%s)", i+1, syl_count, min_syl, max_syl)
                     # Don't fail, just warn - syllable counting isn't perfect for all languages
             except Exception as e:
-                logger.warning(f"Syllable counting failed: {e}")
+                logger.warning("Syllable counting failed: %s", e)
 
         return True
 
     except Exception as e:
-        logger.warning(f"Haiku validation error: {e}")
+        logger.warning("Haiku validation error: %s", e)
         return False
 
 
+def _compile_unsafe_pattern(words: List[str]) -> "re.Pattern[str]":
+    """
+    Build a single word-boundary alternation regex for the unsafe word list.
+
+    Duplicates are dropped and longer words come first so that overlapping
+    entries ("mort" / "morte") always report the full word.
+    """
+    unique_words = sorted({word.lower() for word in words}, key=lambda w: (-len(w), w))
+    return re.compile(r'\b(?:' + '|'.join(re.escape(word) for word in unique_words) + r')\b')
+
+
+# Compiled once at import: one pass over the story instead of one per word
+_UNSAFE_WORDS_PATTERN = _compile_unsafe_pattern(config.UNSAFE_WORDS)
+
+
+def find_unsafe_words(text: str) -> List[str]:
+    """
+    Find every unsafe word contained in the text in a single pass.
+
+    Args:
+        text: Story text to check
+
+    Returns:
+        Unsafe words found, in order of first appearance (no duplicates)
+    """
+    found = []
+    for match in _UNSAFE_WORDS_PATTERN.finditer(text.lower()):
+        word = match.group(0)
+        if word not in found:
+            found.append(word)
+    return found
+
+
 def safety_filter(text: str) -> bool:
     """
     Check if story text contains unsafe words.
 
+    Uses word boundaries to avoid false positives
+    (e.g., "hell" should not match "hello" or "shell").
+
     Returns:
         True if safe, False if contains unsafe content
     """
-    text_lower = text.lower()
-
-    # Use word boundaries to avoid false positives
-    # (e.g., "hell" should not match "hello" or "shell")
-    for unsafe_word in config.UNSAFE_WORDS:
-        # Create pattern with word boundaries \b
-        pattern = r'\b' + re.escape(unsafe_word) + r'\b'
-        if re.search(pattern, text_lower):
-            logger.warning(f"Unsafe word detected: {unsafe_word}")
-            return False
+    unsafe_words = find_unsafe_words(text)
+    if unsafe_words:
+        logger.warning("Unsafe words detected: %s", ', '.join(unsafe_words))
+        return False
 
     return True
 
 
+# Trailing run of word characters: may still continue in the next chunk
+_TRAILING_WORD_PATTERN = re.compile(r'\w*\Z')
+
+
+class StreamingSafetyScanner:
+    """
+    Incremental safety filter for text that arrives in chunks.
+
+    Each chunk is scanned as soon as it arrives, except for a trailing partial
+    word that is held back until the next chunk (or finish()) tells us where it
+    ends. A blocked word split across two chunks ("mon" + "ster") is therefore
+    still caught, and "hell" + "o" is not a false positive.
+
+    Usage:
+        scanner = StreamingSafetyScanner()
+        for chunk in stream:
+            if not scanner.feed(chunk):
+                break  # cancel generation
+        scanner.finish()
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self.unsafe_words: List[str] = []
+
+    @property
+    def is_safe(self) -> bool:
+        """True while no unsafe word has been seen."""
+        return not self.unsafe_words
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Scan the next chunk of text.
+
+        Returns:
+            True if the text so far is safe, False as soon as an unsafe word appears
+        """
+        text = self._pending + chunk
+        cut = _TRAILING_WORD_PATTERN.search(text).start()
+        self._pending = text[cut:]
+        self._scan(text[:cut])
+        return self.is_safe
+
+    def finish(self) -> bool:
+        """
+        Scan the held-back tail once the stream has ended.
+
+        Returns:
+            True if the whole text was safe
+        """
+        self._scan(self._pending)
+        self._pending = ""
+        return self.is_safe
+
+    def _scan(self, text: str) -> None:
+        for word in find_unsafe_words(text):
+            if word not in self.unsafe_words:
+                logger.warning("Unsafe word detected in stream: %s", word)
+                self.unsafe_words.append(word)
+
+
 def get_fallback_story(object_name: str, language: str) -> Dict[str, str]:
     """
     Return a pre-written fallback story if generation fails.
@@ -274,7 +691,8 @@ def get_fallback_story(object_name: str, language: str) -> Dict[str, str]:
     Returns:
         Dict with fallback story components
     """
-    logger.info(f"Using fallback story for {object_name} in {language}")
+    metrics.FALLBACKS.labels(kind="story").inc()
+    logger.info("Using fallback story for %s in %s", object_name, language)
 
     # Multilingual fallback stories
     fallback_stories = {
@@ -336,12 +754,15 @@ Esta noche, al cerrar los ojos, recuerda que {object_name} está allá arriba, b
         "story": fallback["story"],
         "haiku": fallback["haiku"],
         "haiku_title": fallback["haiku_title"],
+        "paragraphs": fallback["story"].split("\n\n"),
+        "haiku_lines": fallback["haiku"].split("\n"),
         "full_text": f"# {fallback['title']}\n\n{fallback['story']}\n\n### {fallback['haiku_title']}\n\n{fallback['haiku']}",
         "success": True,
         "error": None
     }
 
 
+@timing.timed()
 def format_story_for_display(story_dict: Dict[str, str], language: str = "en") -> str:
     """
     Format parsed story for beautiful display in Gradio UI as HTML.
@@ -356,45 +777,32 @@ def format_story_for_display(story_dict: Dict[str, str], language: str = "en") -
     # Convert story to HTML
     title_html = f"<h1 style='color: #fbbf24; font-size: 2.5em; margin-bottom: 20px;'>{story_dict['title']}</h1>\n\n"
 
-    # If haiku wasn't parsed but exists in story text, extract it here
-    story_text = story_dict['story']
+    paragraphs = story_dict.get('paragraphs')
+    haiku_lines = story_dict.get('haiku_lines')
     haiku_title = story_dict.get('haiku_title', '')
-    haiku = story_dict.get('haiku', '')
-
-    if not haiku:
-        # Try to extract haiku from story text as fallback
-        haiku_pattern = r'###?\s*(.+?[Hh]aiku.*?)\s*\n\s*(.+?)(?:\n\n|$)'
-        haiku_match = re.search(haiku_pattern, story_text, re.DOTALL)
-
-        if haiku_match:
-            haiku_title = haiku_match.group(1).strip()
-            haiku_content = haiku_match.group(2).strip()
-
-            # Split into lines
-            haiku_lines = [line.strip() for line in haiku_content.split('\n') if line.strip()]
-            if len(haiku_lines) >= 3:
-                haiku = '\n'.join(haiku_lines[:3])
-            else:
-                haiku = haiku_content
 
-            # Remove haiku from story text
-            story_text = story_text.replace(haiku_match.group(0), '').strip()
+    if paragraphs is None or haiku_lines is None:
+        # Story dict not produced by parse_story (e.g. raw text when parsing
+        # failed): parse it once here, picking up a haiku left in the text
+        sections = _parse_sections(story_dict['story'])
+        paragraphs = sections['paragraphs']
+        if story_dict.get('haiku'):
+            haiku_lines = [line for line in story_dict['haiku'].split('\n') if line.strip()]
+        else:
+            haiku_lines = sections['haiku_lines']
+            haiku_title = haiku_title or sections['haiku_title']
 
     # Convert story paragraphs to HTML
-    story_paragraphs = story_text.split('\n\n')
     story_html = ""
-    for para in story_paragraphs:
-        if para.strip() and not para.strip().startswith('#'):  # Skip any remaining headers
-            story_html += f"<p style='font-size: 1.1em; line-height: 1.8; margin-bottom: 16px; color: #e2e8f0;'>{para.strip()}</p>\n\n"
+    for para in paragraphs:
+        story_html += f"<p style='font-size: 1.1em; line-height: 1.8; margin-bottom: 16px; color: #e2e8f0;'>{para}</p>\n\n"
 
     # Format haiku in a beautiful colored box
     haiku_html = ""
-    if haiku:
+    if haiku_lines:
         if not haiku_title:
             haiku_title = "Goodnight Haiku"
 
-        haiku_lines = haiku.split('\n')
-
         # Create elegant haiku box with gradient background
         haiku_html = f"""
 <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 24px; border-radius: 12px; margin: 30px 0; text-align: center; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);'>
@@ -442,6 +850,7 @@ def format_story_for_sharing(story_dict: Dict[str, str], object_name: str, locat
     return share_text
 
 
+@timing.timed()
 def generate_fun_facts(
     object_name: str,
     object_type: str,
@@ -458,153 +867,13 @@ def generate_fun_facts(
     Returns:
         List of 3 fun facts in the selected language
     """
-    logger.info(f"Generating fun facts for {object_name} in {language}")
-
-    # Facts database - organized by object and language
-    facts_db = {
-        "Jupiter": {
-            "en": [
-                "Jupiter is SO big that 1,300 Earths could fit inside it! It's like a giant cosmic playground.",
-                "Jupiter has a storm called the Great Red Spot that has been raging for over 400 years!",
-                "Jupiter spins super fast - a day on Jupiter is only 10 hours long, even though it's huge!"
-            ],
-            "it": [
-                "Giove è così grande che dentro potrebbe stare 1.300 volte la Terra! È come un immenso parco giochi cosmico.",
-                "Giove ha una tempesta chiamata la Grande Macchia Rossa che infuria da oltre 400 anni!",
-                "Giove gira velocissimo - un giorno su Giove dura solo 10 ore, anche se è gigantesco!"
-            ],
-            "fr": [
-                "Jupiter est si grande que 1 300 Terres pourraient y tenir! C'est comme une immense cour de récréation cosmique.",
-                "Jupiter a une tempête appelée la Grande Tache Rouge qui fait rage depuis plus de 400 ans!",
-                "Jupiter tourne très vite - une journée sur Jupiter ne dure que 10 heures, même si elle est énorme!"
-            ],
-            "es": [
-                "¡Júpiter es tan grande que dentro cabrían 1.300 Tierras! Es como un gigantesco patio de juegos cósmico.",
-                "¡Júpiter tiene una tormenta llamada la Gran Mancha Roja que ha estado rugiendo durante más de 400 años!",
-                "¡Júpiter gira muy rápido - un día en Júpiter dura solo 10 horas, aunque sea gigantesco!"
-            ]
-        },
-        "Mars": {
-            "en": [
-                "Mars is called the Red Planet because its soil is covered in rusty iron! It looks like a giant red ball in the sky.",
-                "Mars has the biggest volcano in our whole solar system - it's called Olympus Mons!",
-                "A year on Mars is almost twice as long as a year on Earth - imagine waiting that long for your birthday!"
-            ],
-            "it": [
-                "Marte si chiama il Pianeta Rosso perché il suo terreno è coperto di ferro arrugginito! Sembra una gigantesca palla rossa nel cielo.",
-                "Marte ha il vulcano più grande di tutto il nostro sistema solare - si chiama Olympus Mons!",
-                "Un anno su Marte è quasi il doppio di un anno sulla Terra - immagina aspettare così a lungo il tuo compleanno!"
-            ],
-            "fr": [
-                "Mars s'appelle la Planète Rouge parce que son sol est couvert de fer rouillé! Elle ressemble à une gigantesque boule rouge dans le ciel.",
-                "Mars a le plus grand volcan de tout notre système solaire - il s'appelle Olympus Mons!",
-                "Une année sur Mars est presque deux fois plus longue qu'une année sur Terre - imagine d'attendre si longtemps ton anniversaire!"
-            ],
-            "es": [
-                "¡Marte se llama el Planeta Rojo porque su suelo está cubierto de hierro oxidado! Se ve como una gigantesca bola roja en el cielo.",
-                "¡Marte tiene el volcán más grande de todo nuestro sistema solar - se llama Olympus Mons!",
-                "¡Un año en Marte es casi el doble de un año en la Tierra - imagina esperar tanto tiempo para tu cumpleaños!"
-            ]
-        },
-        "Saturn": {
-            "en": [
-                "Saturn has beautiful rings made of billions of pieces of ice and rock! They sparkle like a cosmic necklace.",
-                "Saturn is so light that it would float in water if you could find a bathtub big enough!",
-                "Saturn has 82 moons orbiting around it - that's like having 82 little friends spinning in space!"
-            ],
-            "it": [
-                "Saturno ha bellissimi anelli fatti di miliardi di pezzi di ghiaccio e roccia! Brillano come una collana cosmica.",
-                "Saturno è così leggero che galleggerebbe nell'acqua se potessi trovare una vasca abbastanza grande!",
-                "Saturno ha 82 lune che gli orbitano intorno - è come avere 82 piccoli amici che girano nello spazio!"
-            ],
-            "fr": [
-                "Saturne a de beaux anneaux faits de milliards de morceaux de glace et de roche! Ils brillent comme un collier cosmique.",
-                "Saturne est si légère qu'elle flotterait dans l'eau si vous pouviez trouver une baignoire assez grande!",
-                "Saturne a 82 lunes qui tournent autour d'elle - c'est comme avoir 82 petits amis qui tournoient dans l'espace!"
-            ],
-            "es": [
-                "¡Saturno tiene hermosos anillos hechos de miles de millones de piezas de hielo y roca! Brillan como un collar cósmico.",
-                "¡Saturno es tan ligero que flotaría en el agua si pudieras encontrar una bañera lo suficientemente grande!",
-                "¡Saturno tiene 82 lunas orbitando alrededor - es como tener 82 pequeños amigos girando en el espacio!"
-            ]
-        },
-        "Venus": {
-            "en": [
-                "Venus is the hottest planet in our solar system - hotter than Mercury, even though it's farther from the Sun!",
-                "Venus shines so brightly that sometimes you can see it in the daytime! It's called the Morning or Evening Star.",
-                "A day on Venus is longer than a year on Venus - time works in a very strange way there!"
-            ],
-            "it": [
-                "Venere è il pianeta più caldo del nostro sistema solare - più caldo di Mercurio, anche se è più lontano dal Sole!",
-                "Venere brilla così tanto che a volte puoi vederla durante il giorno! Si chiama la Stella del Mattino o della Sera.",
-                "Un giorno su Venere è più lungo di un anno su Venere - il tempo funziona in modo molto strano lì!"
-            ],
-            "fr": [
-                "Vénus est la planète la plus chaude de notre système solaire - plus chaude que Mercure, même si elle est plus loin du Soleil!",
-                "Vénus brille si intensément que parfois on peut la voir pendant la journée! On l'appelle l'Étoile du Matin ou du Soir.",
-                "Un jour sur Vénus est plus long qu'une année sur Vénus - le temps fonctionne de façon très étrange là-bas!"
-            ],
-            "es": [
-                "¡Venus es el planeta más caliente de nuestro sistema solar - más caliente que Mercurio, aunque esté más lejos del Sol!",
-                "¡Venus brilla tan intensamente que a veces puedes verla durante el día! Se llama la Estrella de la Mañana o de la Tarde.",
-                "¡Un día en Venus es más largo que un año en Venus - ¡el tiempo funciona de manera muy extraña allí!"
-            ]
-        },
-        "Mercury": {
-            "en": [
-                "Mercury is the closest planet to the Sun and also the fastest - it zooms around the Sun like a cosmic speedster!",
-                "Mercury has no atmosphere, so there's nothing to protect it from space rocks - it's all covered in craters!",
-                "Mercury is tiny - you could fit it inside the Sun over 6 million times!"
-            ],
-            "it": [
-                "Mercurio è il pianeta più vicino al Sole ed è anche il più veloce - gira intorno al Sole come un corridore cosmico!",
-                "Mercurio non ha atmosfera, quindi non c'è niente a proteggerlo dalle rocce spaziali - è tutto coperto di crateri!",
-                "Mercurio è minuscolo - potresti far stare il Sole dentro di esso oltre 6 milioni di volte!"
-            ],
-            "fr": [
-                "Mercure est la planète la plus proche du Soleil et aussi la plus rapide - elle fonce autour du Soleil comme un coureur cosmique!",
-                "Mercure n'a pas d'atmosphère, donc rien ne la protège des roches spatiales - elle est entièrement couverte de cratères!",
-                "Mercure est minuscule - vous pourriez faire tenir le Soleil à l'intérieur plus de 6 millions de fois!"
-            ],
-            "es": [
-                "¡Mercurio es el planeta más cercano al Sol y también el más rápido - ¡se dispara alrededor del Sol como un velocista cósmico!",
-                "¡Mercurio no tiene atmósfera, así que nada lo protege de las rocas espaciales - ¡está completamente cubierto de cráteres!",
-                "¡Mercurio es diminuto - ¡podrías meter el Sol dentro más de 6 millones de veces!"
-            ]
-        },
-        "default": {
-            "en": [
-                "Every star you see at night is actually a sun, just like ours! Some are much bigger and brighter.",
-                "The light from distant stars takes many years to reach your eyes - you're looking at the past when you see them!",
-                "Our universe is so big that we've only discovered a tiny fraction of all the stars and planets that exist!"
-            ],
-            "it": [
-                "Ogni stella che vedi di notte è in realtà un sole, proprio come il nostro! Alcuni sono molto più grandi e luminosi.",
-                "La luce dalle stelle lontane impiega molti anni per raggiungere i tuoi occhi - stai guardando il passato quando le vedi!",
-                "L'universo è così grande che abbiamo scoperto solo una piccola frazione di tutte le stelle e i pianeti che esistono!"
-            ],
-            "fr": [
-                "Chaque étoile que vous voyez la nuit est en fait un soleil, comme le nôtre! Certains sont beaucoup plus grands et plus brillants.",
-                "La lumière des étoiles lointaines prend de nombreuses années pour atteindre vos yeux - vous regardez le passé quand vous les voyez!",
-                "Notre univers est si grand que nous n'avons découvert qu'une infime partie de toutes les étoiles et planètes qui existent!"
-            ],
-            "es": [
-                "¡Cada estrella que ves de noche es en realidad un sol, como el nuestro! Algunos son mucho más grandes y brillantes.",
-                "¡La luz de las estrellas lejanas tarda muchos años en llegar a tus ojos - ¡estás mirando el pasado cuando las ves!",
-                "¡Nuestro universo es tan grande que solo hemos descubierto una pequeña fracción de todas las estrellas y planetas que existen!"
-            ]
-        }
-    }
-
-    # Get facts for the object, fallback to default
-    normalized_name = object_name.capitalize()
-    object_facts = facts_db.get(normalized_name, facts_db["default"])
+    logger.info("Generating fun facts for %s in %s", object_name, language)
 
-    # Get language-specific facts, fallback to English
-    lang_facts = object_facts.get(language, object_facts.get("en", facts_db["default"]["en"]))
+    # Facts come from the import-time fact store (src/data/facts.json)
+    lang_facts = fact_store.get_fun_facts(object_name, language)
 
     # Return 3 facts
-    return lang_facts[:3]
+    return list(lang_facts[:3])
 
 
 # ============================================================================
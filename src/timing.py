@@ -0,0 +1,193 @@
+"""
+Timing - Lightweight spans and in-process latency histograms
+A span measures one piece of work (wall-clock and CPU time) and feeds a
+histogram per span name, so slow stages (Skyfield, Gemini, an image
+provider) show up in the p95 of their own histogram
+"""
+
+import bisect
+import functools
+import inspect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# Callbacks fn(event, name, wall_ms, cpu_ms), called in the measuring thread
+# with event "start" (span opened, no timings) or "finish" (measurement recorded)
+_observers: List[Callable[[str, str, Optional[float], Optional[float]], None]] = []
+
+
+def add_observer(fn: Callable[[str, str, Optional[float], Optional[float]], None]) -> None:
+    """Register a span start/finish callback (idempotent; used by src.profiling)."""
+    if fn not in _observers:
+        _observers.append(fn)
+
+
+class Span:
+    """
+    Timing of one unit of work.
+
+    wall_ms and cpu_ms are filled in when the span ends. CPU time is the
+    thread's CPU time, so for spans around awaits it also counts other tasks
+    that ran on the event loop meanwhile.
+    """
+
+    __slots__ = ("name", "wall_ms", "cpu_ms", "_wall_start", "_cpu_start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_ms: Optional[float] = None
+        self.cpu_ms: Optional[float] = None
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+        for observer in _observers:
+            observer("start", name, None, None)
+
+    def finish(self) -> "Span":
+        """End the span and record it (idempotent)."""
+        if self.wall_ms is None:
+            self.wall_ms = (time.perf_counter() - self._wall_start) * 1000
+            self.cpu_ms = (time.thread_time() - self._cpu_start) * 1000
+            record(self.name, self.wall_ms, self.cpu_ms)
+        return self
+
+    def describe(self) -> str:
+        """Short duration text for log lines, e.g. "1.2s, cpu 35ms"."""
+        wall = f"{self.wall_ms / 1000:.1f}s" if self.wall_ms >= 1000 else f"{self.wall_ms:.0f}ms"
+        return f"{wall}, cpu {self.cpu_ms:.0f}ms"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (milliseconds)."""
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.cpu_total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, wall_ms: float, cpu_ms: Optional[float] = None) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, wall_ms)] += 1
+        self.count += 1
+        self.total_ms += wall_ms
+        self.cpu_total_ms += cpu_ms or 0.0
+        self.max_ms = max(self.max_ms, wall_ms)
+
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th percentile, interpolating inside its bucket (capped at the max)."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = BUCKETS_MS[i - 1] if i > 0 else 0.0
+                upper = BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(estimate, self.max_ms)
+            seen += bucket_count
+        return self.max_ms
+
+
+_histograms: Dict[str, Histogram] = {}
+_lock = threading.Lock()
+
+
+def record(name: str, wall_ms: float, cpu_ms: Optional[float] = None) -> None:
+    """Add one measurement to the histogram for name."""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(wall_ms, cpu_ms)
+    for observer in _observers:
+        observer("finish", name, wall_ms, cpu_ms)
+
+
+@contextmanager
+def span(name: str) -> Iterator[Span]:
+    """
+    Time the enclosed block and record it under name.
+
+    Example:
+        >>> with timing.span("skyfield.visible_stars") as s:
+        ...     stars = compute()
+        >>> s.wall_ms, s.cpu_ms
+    """
+    current = Span(name)
+    try:
+        yield current
+    finally:
+        current.finish()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s took %s", name, current.describe())
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Decorator: record every call of a function (sync or async) as a span."""
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot() -> Dict[str, Dict]:
+    """
+    Summary of every histogram.
+
+    Returns:
+        Dict mapping span name to count, mean_ms, cpu_mean_ms, p50_ms,
+        p95_ms, p99_ms, max_ms and buckets (list of (upper bound, count))
+    """
+    with _lock:
+        return {
+            name: {
+                "count": h.count,
+                "mean_ms": h.total_ms / h.count,
+                "cpu_mean_ms": h.cpu_total_ms / h.count,
+                "p50_ms": h.percentile(50),
+                "p95_ms": h.percentile(95),
+                "p99_ms": h.percentile(99),
+                "max_ms": h.max_ms,
+                "buckets": list(zip(BUCKETS_MS + (float("inf"),), h.counts)),
+            }
+            for name, h in sorted(_histograms.items())
+        }
+
+
+def format_summary() -> str:
+    """Text table of all histograms, slowest p95 first."""
+    rows = sorted(snapshot().items(), key=lambda item: item[1]["p95_ms"], reverse=True)
+    lines = [f"{'span':40} {'count':>6} {'mean':>9} {'cpu':>9} {'p50':>8} {'p95':>8} {'p99':>8}"]
+    for name, s in rows:
+        lines.append(
+            f"{name:40} {s['count']:6d} {s['mean_ms']:8.1f}ms {s['cpu_mean_ms']:7.1f}ms "
+            f"{s['p50_ms']:7.0f}ms {s['p95_ms']:7.0f}ms {s['p99_ms']:7.0f}ms"
+        )
+    return "\n".join(lines)
+
+
+def reset() -> None:
+    """Drop all recorded measurements."""
+    with _lock:
+        _histograms.clear()